@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+"""
+Executa os benchmarks sem depender do asv.
+
+    python -m benchmarks                # todos
+    python -m benchmarks cotizacao      # apenas classes/métodos que contenham o texto
+
+As classes seguem a convenção do asv: params, param_names, setup, teardown e métodos time_*, peakmem_*
+e timeraw_* (que retornam código a ser medido em um interpretador novo, como o tempo de importação).
+Um método que levanta NotImplementedError é ignorado para aquela combinação de parâmetros.
+"""
+
+import importlib
+import itertools
+import os
+import pkgutil
+import subprocess
+import sys
+import timeit
+import tracemalloc
+
+import benchmarks
+
+
+def _formata_tempo(segundos: float) -> str:
+    for unidade, escala in (("s", 1), ("ms", 1e-3), ("µs", 1e-6)):
+        if segundos >= escala:
+            return f"{segundos / escala:8.2f} {unidade}"
+    return f"{segundos / 1e-9:8.2f} ns"
+
+
+def _mede_tempo(funcao, repeticoes: int = 3) -> float:
+    timer = timeit.Timer(funcao)
+    numero, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeticoes, number=numero)) / numero
+
+
+def _mede_memoria(funcao) -> int:
+    tracemalloc.start()
+    try:
+        funcao()
+        _, pico = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return pico
+
+
+def _mede_tempo_processo(codigo: str, repeticoes: int = 5) -> float:
+    # o código roda em um interpretador novo, a partir da raiz do repositório; mede apenas a execução do código
+    script = (
+        "import time\n"
+        "inicio = time.perf_counter()\n"
+        f"exec(compile({codigo!r}, '<timeraw>', 'exec'))\n"
+        "print(time.perf_counter() - inicio)\n"
+    )
+    raiz = os.path.dirname(os.path.dirname(os.path.abspath(benchmarks.__file__)))
+    tempos = [
+        float(subprocess.run([sys.executable, "-c", script], cwd=raiz, check=True, capture_output=True, text=True).stdout)
+        for _ in range(repeticoes)
+    ]
+    return min(tempos)
+
+
+def _classes_benchmark():
+    for modulo in pkgutil.iter_modules(benchmarks.__path__):
+        if not modulo.name.startswith("bench_"):
+            continue
+        mod = importlib.import_module(f"benchmarks.{modulo.name}")
+        for nome, classe in vars(mod).items():
+            if isinstance(classe, type) and classe.__module__ == mod.__name__ and not nome.startswith("_"):
+                yield f"{modulo.name}.{nome}", classe
+
+
+def main(filtro: str = "") -> None:
+    for nome_classe, classe in _classes_benchmark():
+        metodos = [
+            m
+            for m in dir(classe)
+            if m.startswith(("time_", "peakmem_", "timeraw_")) and filtro in f"{nome_classe}.{m}"
+        ]
+        if not metodos:
+            continue
+        params = getattr(classe, "params", [()])
+        if params and not isinstance(params[0], (list, tuple)):
+            params = [params]
+        for combinacao in itertools.product(*params) if params != [()] else [()]:
+            instancia = classe()
+            if hasattr(instancia, "setup"):
+                instancia.setup(*combinacao)
+            try:
+                for metodo in metodos:
+                    funcao = getattr(instancia, metodo)
+                    rotulo = f"{nome_classe}.{metodo}{combinacao if combinacao else ''}"
+                    try:
+                        retorno = funcao(*combinacao)
+                    except NotImplementedError:  # convenção do asv para combinações não aplicáveis
+                        print(f"{rotulo:<80} {'n/a':>11}")
+                        continue
+                    if metodo.startswith("timeraw_"):
+                        print(f"{rotulo:<80} {_formata_tempo(_mede_tempo_processo(retorno))}")
+                    elif metodo.startswith("time_"):
+                        print(f"{rotulo:<80} {_formata_tempo(_mede_tempo(lambda: funcao(*combinacao)))}")
+                    else:
+                        pico = _mede_memoria(lambda: funcao(*combinacao))
+                        print(f"{rotulo:<80} {pico / 2**20:8.2f} MiB")
+            finally:
+                if hasattr(instancia, "teardown"):
+                    instancia.teardown(*combinacao)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1] if len(sys.argv) > 1 else "")
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""
+Ambiente offline para os benchmarks da API pública: arquivos sintéticos do Tesouro Transparente servidos
+por um servidor HTTP local, URLS_TESOURO apontando para ele e cache em diretório temporário.
+"""
+
+import os
+import shutil
+import tempfile
+
+from src.tesouro_direto_br import tesouro_direto_br as td
+from src.tesouro_direto_br.cache import VARIAVEL_DIRETORIO_CACHE
+from tests.dados_sinteticos import gera_resgates, gera_taxa, gera_vendas, para_csv
+from tests.servidor_local import ServidorTesouro
+
+ARQUIVOS = {
+    "venda": "VendasTesouroDireto.csv",
+    "taxa": "PrecoTaxaTesouroDireto.csv",
+    "resgate": "RecomprasTesouroDireto.csv",
+}
+
+# (dias de pregão, títulos na tabela de preços, operações de venda por dia)
+TAMANHOS = {
+    "pequeno": (500, 8, 20),
+    "medio": (2500, 20, 100),
+    "grande": (5000, 40, 400),
+}
+
+
+class AmbienteTesouro:
+    def __init__(self, tamanho: str = "medio"):
+        n_dias, n_titulos, operacoes_por_dia = TAMANHOS[tamanho]
+        arquivos = {
+            ARQUIVOS["taxa"]: para_csv(gera_taxa(n_dias=n_dias, n_titulos=n_titulos)),
+            ARQUIVOS["venda"]: para_csv(
+                gera_vendas(n_dias=n_dias, n_titulos=n_titulos, operacoes_por_dia=operacoes_por_dia)
+            ),
+            ARQUIVOS["resgate"]: para_csv(
+                gera_resgates(n_dias=n_dias, n_titulos=n_titulos, operacoes_por_dia=operacoes_por_dia // 2)
+            ),
+        }
+        self.servidor = ServidorTesouro(arquivos).__enter__()
+        self._urls = dict(td.URLS_TESOURO)
+        for tipo, nome in ARQUIVOS.items():
+            td.URLS_TESOURO[tipo] = self.servidor.url(nome)
+        self._cache = os.environ.get(VARIAVEL_DIRETORIO_CACHE)
+        self.diretorio_cache = tempfile.mkdtemp(prefix="tesouro_direto_br_bench_")
+        os.environ[VARIAVEL_DIRETORIO_CACHE] = self.diretorio_cache
+
+    def encerra(self) -> None:
+        td.URLS_TESOURO.update(self._urls)
+        if self._cache is None:
+            os.environ.pop(VARIAVEL_DIRETORIO_CACHE, None)
+        else:
+            os.environ[VARIAVEL_DIRETORIO_CACHE] = self._cache
+        shutil.rmtree(self.diretorio_cache, ignore_errors=True)
+        self.servidor.__exit__()
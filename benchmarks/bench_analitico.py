@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""Cotação, duration e DV01 de toda a base de taxas: laço por título e data x calcula_analitico em lote."""
+
+import pandas as pd
+
+from src.tesouro_direto_br import calcula_analitico, calendario
+from tests.dados_sinteticos import gera_taxa
+
+CUPONS = {
+    "Tesouro Prefixado com Juros Semestrais": 1.10**0.5 - 1,
+    "Tesouro IPCA+ com Juros Semestrais": 1.06**0.5 - 1,
+}
+
+
+def _por_titulo(taxa):
+    # um título de cada vez, um pagamento de cada vez
+    resultados = []
+    for (tipo, vencimento), df in taxa.groupby(["Tipo Titulo", "Data Vencimento"]):
+        if tipo in ("Tesouro Educa+", "Tesouro RendA+"):
+            continue
+        cupom = CUPONS.get(tipo, 0.0)
+        pagamentos = [vencimento]
+        while cupom and pagamentos[-1] - pd.DateOffset(months=6) > df["Data Base"].min():
+            pagamentos.append(pagamentos[-1] - pd.DateOffset(months=6))
+        taxas = df["Taxa Venda Manha"].to_numpy() / 100
+        cotacao = prazo = 0.0
+        for pagamento in pagamentos:
+            anos = calendario.conta_dias_uteis(df["Data Base"], pagamento, inclusivo=False) / 252
+            valor = (100 * cupom + (100 if pagamento == vencimento else 0)) / (1 + taxas) ** anos
+            valor[anos <= 0] = 0
+            cotacao = cotacao + valor
+            prazo = prazo + valor * anos
+        resultados.append(pd.DataFrame({"Cotação": cotacao, "Duration Macaulay": prazo / cotacao}, index=df.index))
+    return pd.concat(resultados)
+
+
+class Analitico:
+    params = [2_500, 5_000]
+    param_names = ["dias"]
+    timeout = 600
+
+    def setup(self, n_dias):
+        self.taxa = gera_taxa(n_dias=n_dias, n_titulos=40, inicio="2005-01-03")
+
+    def time_por_titulo(self, n_dias):
+        _por_titulo(self.taxa)
+
+    def time_calcula_analitico(self, n_dias):
+        calcula_analitico(self.taxa)
+
+    def peakmem_calcula_analitico(self, n_dias):
+        calcula_analitico(self.taxa)
@@ -0,0 +1,147 @@
+# -*- coding: utf-8 -*-
+"""
+Funções públicas de ponta a ponta sobre o servidor local (ver ambiente.py), em três tamanhos de base,
+para acompanhar tempo e pico de memória entre versões.
+"""
+
+import contextlib
+import io
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.ambiente import TAMANHOS, AmbienteTesouro
+from src.tesouro_direto_br import (
+    Carteira,
+    PrecosTesouro,
+    Titulo,
+    busca_tesouro_direto,
+    calcula_retorno_carteira,
+    calcula_retorno_titulo,
+    calcula_taxa_b3,
+    get_custos,
+    movimentacoes_titulos_publicos,
+)
+from tests.dados_sinteticos import datas_pregao
+
+CARTEIRA = [
+    ("Tesouro IPCA+", "2026-08-15", "2020-01-02", 1_000.0),
+    ("Tesouro Selic", "2029-03-01", "2020-03-10", 2_500.0),
+    ("Tesouro Prefixado com Juros Semestrais", "2031-01-01", "2020-06-01", 800.0),
+    ("Tesouro IPCA+ com Juros Semestrais", "2035-05-15", "2021-02-01", 1_200.0),
+]
+
+
+class _ComAmbiente:
+    params = list(TAMANHOS)
+    param_names = ["tamanho"]
+    timeout = 600
+
+    def setup(self, tamanho):
+        self.ambiente = AmbienteTesouro(tamanho)
+
+    def teardown(self, tamanho):
+        self.ambiente.encerra()
+
+
+class BuscaTesouroDireto(_ComAmbiente):
+    params = (list(TAMANHOS), ["taxa", "venda", "resgate"])
+    param_names = ["tamanho", "tipo"]
+
+    def setup(self, tamanho, tipo):
+        super().setup(tamanho)
+        busca_tesouro_direto(tipo, agrupar=False)
+
+    def teardown(self, tamanho, tipo):
+        super().teardown(tamanho)
+
+    def time_sem_cache(self, tamanho, tipo):
+        busca_tesouro_direto(tipo, agrupar=False, cache=False)
+
+    def peakmem_sem_cache(self, tamanho, tipo):
+        busca_tesouro_direto(tipo, agrupar=False, cache=False)
+
+    def time_cache_revalidado(self, tamanho, tipo):
+        # validade zero: uma requisição condicional respondida com 304 e leitura do cache
+        busca_tesouro_direto(tipo, agrupar=False, validade_cache=timedelta(0))
+
+    def time_cache_valido(self, tamanho, tipo):
+        busca_tesouro_direto(tipo, agrupar=True)
+
+
+class RetornoTitulo(_ComAmbiente):
+    def setup(self, tamanho):
+        super().setup(tamanho)
+        self.precos = PrecosTesouro.busca()
+
+    def time_calcula_retorno_titulo(self, tamanho):
+        calcula_retorno_titulo(*CARTEIRA[1])
+
+    def time_calcula_retorno_titulo_precos(self, tamanho):
+        calcula_retorno_titulo(*CARTEIRA[1], precos=self.precos)
+
+    def peakmem_calcula_retorno_titulo(self, tamanho):
+        calcula_retorno_titulo(*CARTEIRA[1])
+
+
+class RetornoCarteira(_ComAmbiente):
+    def setup(self, tamanho):
+        super().setup(tamanho)
+        self.precos = PrecosTesouro.busca()
+        self.carteira = Carteira(Titulo())
+        for titulo in CARTEIRA:
+            self.carteira.add(Titulo(*titulo))
+
+    def time_calcula_retorno_carteira(self, tamanho):
+        calcula_retorno_carteira(self.carteira)
+
+    def time_calcula_retorno_carteira_precos(self, tamanho):
+        calcula_retorno_carteira(self.carteira, precos=self.precos)
+
+    def peakmem_calcula_retorno_carteira(self, tamanho):
+        calcula_retorno_carteira(self.carteira)
+
+
+class Movimentacoes(_ComAmbiente):
+    params = (list(TAMANHOS), ["venda", "resgate"])
+    param_names = ["tamanho", "tipo"]
+
+    def setup(self, tamanho, tipo):
+        super().setup(tamanho)
+        busca_tesouro_direto(tipo, agrupar=False)
+
+    def teardown(self, tamanho, tipo):
+        super().teardown(tamanho)
+
+    def time_movimentacoes_titulos_publicos(self, tamanho, tipo):
+        movimentacoes_titulos_publicos(tipo)
+
+    def time_movimentacoes_mensal(self, tamanho, tipo):
+        movimentacoes_titulos_publicos(tipo, frequencia="mensal")
+
+    def peakmem_movimentacoes_titulos_publicos(self, tamanho, tipo):
+        movimentacoes_titulos_publicos(tipo)
+
+
+class Custos:
+    params = [20, 250, 1500, 5000]
+    param_names = ["dias"]
+
+    def setup(self, n_dias):
+        datas = datas_pregao("2004-03-01", n_dias)
+        rng = np.random.RandomState(0)
+        self.serie_mtm = pd.DataFrame(
+            {"MTM": 10_000 * np.cumprod(1 + rng.normal(0.0004, 0.002, n_dias))}, index=datas
+        )
+
+    def time_calcula_taxa_b3(self, n_dias):
+        calcula_taxa_b3(self.serie_mtm)
+
+    def time_get_custos(self, n_dias):
+        with contextlib.redirect_stdout(io.StringIO()):
+            get_custos(self.serie_mtm, custo_b3=True)
+
+    def peakmem_get_custos(self, n_dias):
+        with contextlib.redirect_stdout(io.StringIO()):
+            get_custos(self.serie_mtm, custo_b3=True)
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+"""Abertura da base de preços: cache em pickle (cópia por processo) x arquivo colunar mapeado em memória."""
+
+import shutil
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+from src.tesouro_direto_br import PrecosTesouro, carrega_arquivo_colunar, exporta_arquivo_colunar
+from tests.dados_sinteticos import gera_taxa
+
+
+class AberturaPrecos:
+    params = [2_500, 10_000]
+    param_names = ["dias"]
+
+    def setup(self, n_dias):
+        self.diretorio = Path(tempfile.mkdtemp())
+        taxa = gera_taxa(n_dias=n_dias, n_titulos=40)
+        taxa.to_pickle(self.diretorio / "taxa.pkl")
+        exporta_arquivo_colunar(self.diretorio / "colunar", tipos=("taxa",), dados={"taxa": taxa})
+
+    def teardown(self, n_dias):
+        shutil.rmtree(self.diretorio, ignore_errors=True)
+
+    def time_le_pickle(self, n_dias):
+        pd.read_pickle(self.diretorio / "taxa.pkl")
+
+    def time_carrega_arquivo_colunar(self, n_dias):
+        carrega_arquivo_colunar(self.diretorio / "colunar", "taxa")
+
+    def time_precos_pickle(self, n_dias):
+        PrecosTesouro(pd.read_pickle(self.diretorio / "taxa.pkl"))
+
+    def time_precos_arquivo_colunar(self, n_dias):
+        PrecosTesouro.de_arquivo_colunar(self.diretorio / "colunar")
+
+    def peakmem_precos_pickle(self, n_dias):
+        return PrecosTesouro(pd.read_pickle(self.diretorio / "taxa.pkl"))
+
+    def peakmem_precos_arquivo_colunar(self, n_dias):
+        return PrecosTesouro.de_arquivo_colunar(self.diretorio / "colunar")
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""Taxa de custódia da B3 com o calendário do pyettj x calendario.conta_dias_uteis e ajuste de datas em lote."""
+
+import numpy as np
+import pandas as pd
+
+from src.tesouro_direto_br import calendario
+from src.tesouro_direto_br.tesouro_direto_br import calcula_taxa_b3
+from tests.dados_sinteticos import datas_pregao
+from tests.legado import _get_valid_date, calcula_taxa_b3_legado
+
+
+class TaxaB3:
+    params = [10, 100]
+    param_names = ["posicoes"]
+    timeout = 600
+
+    def setup(self, n_posicoes):
+        rng = np.random.RandomState(0)
+        self.series = []
+        while len(self.series) < n_posicoes:
+            inicio = rng.choice(pd.date_range("2018-01-01", "2023-01-01", freq="B"))
+            datas = datas_pregao(inicio, int(rng.randint(150, 1500)))
+            serie = pd.DataFrame({"MTM": np.linspace(1_000, 2_000, len(datas))}, index=datas)
+            try:
+                calcula_taxa_b3_legado(serie)
+            except Exception:  # a versão original falha em algumas datas de início; ficam fora da comparação
+                continue
+            self.series.append(serie)
+        calendario.conta_dias_uteis("2020-01-01", "2020-01-01")
+
+    def time_pyettj(self, n_posicoes):
+        for serie in self.series:
+            calcula_taxa_b3_legado(serie)
+
+    def time_calendario(self, n_posicoes):
+        for serie in self.series:
+            calcula_taxa_b3(serie)
+
+
+class ContagemDiasUteis:
+    def setup(self):
+        rng = np.random.RandomState(0)
+        dias = pd.date_range("2002-01-01", "2040-12-31")
+        self.inicios = dias[rng.randint(0, len(dias) // 2, 100_000)]
+        self.fins = dias[rng.randint(len(dias) // 2, len(dias), 100_000)]
+
+    def time_conta_dias_uteis(self):
+        calendario.conta_dias_uteis(self.inicios, self.fins)
+
+    def time_busday_count(self):
+        np.busday_count(
+            self.inicios.values.astype("datetime64[D]"),
+            self.fins.values.astype("datetime64[D]"),
+            holidays=calendario.feriados_nacionais(),
+        )
+
+
+class AjusteDatas:
+    params = [100, 2_000]
+    param_names = ["aplicacoes"]
+
+    def setup(self, n_aplicacoes):
+        datas = datas_pregao("2015-01-02", 2_500)
+        self.carteira = pd.DataFrame({"MTM": np.arange(len(datas), dtype=float)}, index=datas)
+        rng = np.random.RandomState(0)
+        self.pedidas = pd.DatetimeIndex(rng.choice(pd.date_range(datas[0], datas[-1]), n_aplicacoes))
+
+    def time_dia_a_dia(self, n_aplicacoes):
+        for data in self.pedidas:
+            _get_valid_date(data, self.carteira)
+
+    def time_ajusta_datas(self, n_aplicacoes):
+        calendario.ajusta_datas(self.pedidas, self.carteira.index)
+
+    def time_ajusta_dias_uteis(self, n_aplicacoes):
+        calendario.ajusta_datas(self.pedidas)
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""Montagem de carteiras com muitas aplicações: lista de dicionários x colunas ordenadas."""
+
+from src.tesouro_direto_br import Carteira, Titulo
+from tests.legado import CarteiraLegado, TituloLegado
+from tests.test_carteira import _operacoes
+
+
+class MontagemCarteira:
+    params = [1_000, 20_000]
+    param_names = ["aplicacoes"]
+
+    def setup(self, n):
+        self.operacoes = _operacoes(n)
+        self.linhas = list(self.operacoes.itertuples(index=False))
+        self.carteira = Carteira.de_dataframe(self.operacoes)
+
+    def time_add_legado(self, n):
+        carteira = CarteiraLegado(TituloLegado())
+        for linha in self.linhas:
+            carteira.add(TituloLegado(*linha))
+        sorted(carteira.titulos, key=lambda d: d["Data Investimento"])
+
+    def time_add(self, n):
+        carteira = Carteira(Titulo())
+        for linha in self.linhas:
+            carteira.add(Titulo(*linha))
+        carteira._consolida()
+
+    def time_de_dataframe(self, n):
+        Carteira.de_dataframe(self.operacoes)
+
+    def time_titulos(self, n):
+        self.carteira.titulos
+
+    def peakmem_titulos_legado(self, n):
+        [TituloLegado(*linha) for linha in self.linhas]
+
+    def peakmem_titulos(self, n):
+        [Titulo(*linha) for linha in self.linhas]
+
+    def peakmem_carteira_legado(self, n):
+        carteira = CarteiraLegado(TituloLegado())
+        for linha in self.linhas:
+            carteira.add(TituloLegado(*linha))
+
+    def peakmem_carteira(self, n):
+        carteira = Carteira(Titulo())
+        for linha in self.linhas:
+            carteira.add(Titulo(*linha))
+        carteira._consolida()
@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+"""Cotização de carteira: laço original por data x cálculo vetorizado por eventos."""
+
+from src.tesouro_direto_br.tesouro_direto_br import _cotiza_tabela_carteira
+from tests.dados_sinteticos import gera_series_carteira
+from tests.legado import cotiza_carteira_legado
+
+
+class Cotizacao:
+    params = ([1, 10, 50], [250, 2500])
+    param_names = ["titulos", "dias"]
+
+    def setup(self, n_titulos, n_dias):
+        self.titulos, self.tabela = gera_series_carteira(n_titulos, n_dias)
+
+    def time_vetorizada(self, n_titulos, n_dias):
+        _cotiza_tabela_carteira(self.tabela.copy())
+
+    def time_laco_original(self, n_titulos, n_dias):
+        cotiza_carteira_legado(self.titulos, self.tabela)
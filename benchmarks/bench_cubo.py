@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+"""Consultas de fluxo de vendas e resgates: agregação das duas bases a cada pergunta x CuboMovimentacoes."""
+
+from src.tesouro_direto_br import CuboMovimentacoes
+from src.tesouro_direto_br.tesouro_direto_br import _agrega_movimentacoes
+from tests.dados_sinteticos import gera_resgates, gera_vendas
+
+IPCA = ["Tesouro IPCA+", "Tesouro IPCA+ com Juros Semestrais"]
+
+
+def _perguntas_agregando(vendas, resgates):
+    # fluxo líquido mensal por título e vendas x recompras de IPCA+ desde 2020, alinhando as colunas à mão
+    venda = _agrega_movimentacoes(vendas, "venda", [], None, "mensal").fillna(0)
+    resgate = _agrega_movimentacoes(resgates, "resgate", [], None, "mensal").fillna(0)
+    liquido = venda.sub(resgate, fill_value=0)
+    ipca = [c for c in venda.columns if c.rsplit("_", 1)[0] in IPCA]
+    desde = "2020-01-01"
+    return liquido, venda.loc[desde:, ipca].sum(), resgate.loc[desde:, resgate.columns.intersection(ipca)].sum()
+
+
+def _perguntas_cubo(cubo):
+    return (
+        cubo.consulta("liquido", frequencia="mensal"),
+        cubo.consulta("venda", inicio="2020-01-01", tipos_titulo=IPCA),
+        cubo.consulta("resgate", inicio="2020-01-01", tipos_titulo=IPCA),
+    )
+
+
+class CuboFluxos:
+    params = [250_000, 1_000_000]
+    param_names = ["linhas"]
+    timeout = 600
+
+    def setup(self, n_linhas):
+        self.vendas = gera_vendas(n_dias=5000, n_titulos=60, operacoes_por_dia=n_linhas // 5000, inicio="2005-01-03")
+        self.resgates = gera_resgates(
+            n_dias=5000, n_titulos=60, operacoes_por_dia=n_linhas // 10000, inicio="2005-01-03"
+        )
+        self.cubo = CuboMovimentacoes(self.vendas, self.resgates)
+
+    def time_agregando_a_cada_pergunta(self, n_linhas):
+        _perguntas_agregando(self.vendas, self.resgates)
+
+    def time_consultas_cubo(self, n_linhas):
+        _perguntas_cubo(self.cubo)
+
+    def time_monta_cubo(self, n_linhas):
+        CuboMovimentacoes(self.vendas, self.resgates)
+
+    def peakmem_monta_cubo(self, n_linhas):
+        return CuboMovimentacoes(self.vendas, self.resgates)
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""Custos de várias posições: get_custos posição a posição x calcula_custos_lote."""
+
+import contextlib
+import io
+
+import numpy as np
+import pandas as pd
+
+from src.tesouro_direto_br.tesouro_direto_br import calcula_custos_lote, get_custos
+from tests.dados_sinteticos import datas_pregao
+
+
+class CustosPosicoes:
+    params = [100, 1_000, 10_000]
+    param_names = ["posicoes"]
+    timeout = 600
+
+    def setup(self, n_posicoes):
+        rng = np.random.RandomState(0)
+        datas = datas_pregao("2019-01-02", 1500)
+        inicio = rng.randint(0, 1000, n_posicoes)
+        fim = inicio + rng.randint(40, 500, n_posicoes)
+        dias = np.arange(len(datas))[:, None]
+        valores = 1_000 * np.cumprod(1 + rng.normal(0.0004, 0.002, (len(datas), n_posicoes)), axis=0)
+        self.tabela = pd.DataFrame(
+            np.where((dias >= inicio) & (dias < fim), valores, np.nan),
+            index=datas,
+            columns=[f"posicao_{i}" for i in range(n_posicoes)],
+        )
+
+    def time_get_custos(self, n_posicoes):
+        if n_posicoes > 1_000:
+            raise NotImplementedError
+        with contextlib.redirect_stdout(io.StringIO()):
+            for coluna in self.tabela.columns:
+                serie = self.tabela[[coluna]].dropna()
+                serie.columns = ["MTM"]
+                get_custos(serie, custo_b3=True)
+
+    def time_lote(self, n_posicoes):
+        calcula_custos_lote(self.tabela, custo_b3=True)
+
+    def peakmem_lote(self, n_posicoes):
+        calcula_custos_lote(self.tabela, custo_b3=True)
+
+
+class CustosCurtoPrazo:
+    """Posições com menos de 30 dias, que dependem da tabela de IOF."""
+
+    def setup(self):
+        datas = datas_pregao("2024-03-01", 20)
+        self.serie = pd.DataFrame({"MTM": np.linspace(1_000, 1_010, len(datas))}, index=datas)
+
+    def time_get_custos(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            get_custos(self.serie)
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+"""Conversão das colunas de data: pd.to_datetime em todas as linhas x interpretação de cada texto distinto uma vez."""
+
+import io
+
+import pandas as pd
+
+from src.tesouro_direto_br.tesouro_direto_br import _converte_colunas_datas
+from tests.dados_sinteticos import gera_resgates, gera_taxa, gera_vendas, para_csv
+
+GERADORES = {
+    "taxa": lambda: gera_taxa(n_dias=2500, n_titulos=40),
+    "venda": lambda: gera_vendas(n_dias=2500, operacoes_por_dia=200),
+    "resgate": lambda: gera_resgates(n_dias=2500, operacoes_por_dia=100),
+}
+
+
+class ConversaoDatas:
+    params = list(GERADORES)
+    param_names = ["tipo"]
+    timeout = 300
+
+    def setup(self, tipo):
+        self.texto = pd.read_csv(io.BytesIO(para_csv(GERADORES[tipo]())), sep=";", decimal=",")
+        self.colunas = [c for c in self.texto.columns if c.startswith("Data") or c.startswith("Vencimento")]
+
+    def time_to_datetime(self, tipo):
+        df = self.texto.copy()
+        for col in self.colunas:
+            df[col] = pd.to_datetime(df[col], format="%d/%m/%Y")
+
+    def time_valores_distintos(self, tipo):
+        _converte_colunas_datas(self.texto.copy())
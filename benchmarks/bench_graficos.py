@@ -0,0 +1,31 @@
+# -*- coding: utf-8 -*-
+"""Gráfico das taxas de vários títulos gravado em arquivo: séries completas x séries reduzidas à resolução da tela."""
+
+import shutil
+import tempfile
+from pathlib import Path
+
+from src.tesouro_direto_br import PrecosTesouro, plota_taxas_titulos
+from tests.dados_sinteticos import gera_taxa
+
+
+class GraficoTaxas:
+    params = [2_500, 6_000]
+    param_names = ["dias"]
+    timeout = 600
+
+    def setup(self, n_dias):
+        self.titulos = [("Tesouro Prefixado", f"{2040 + i}-01-01") for i in range(12)]
+        self.precos = PrecosTesouro(gera_taxa(n_dias=n_dias, titulos=self.titulos, inicio="2002-01-02"))
+        self.diretorio = Path(tempfile.mkdtemp())
+
+    def teardown(self, n_dias):
+        shutil.rmtree(self.diretorio, ignore_errors=True)
+
+    def time_series_completas(self, n_dias):
+        plota_taxas_titulos(
+            self.titulos, arquivo=self.diretorio / "completo.png", pontos=10**9, precos=self.precos
+        )
+
+    def time_series_reduzidas(self, n_dias):
+        plota_taxas_titulos(self.titulos, arquivo=self.diretorio / "reduzido.png", precos=self.precos)
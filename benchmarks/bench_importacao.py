@@ -0,0 +1,15 @@
+# -*- coding: utf-8 -*-
+"""Tempo de importação do pacote em um interpretador novo (início de processos de lote e de linha de comando)."""
+
+
+class Importacao:
+    def timeraw_pandas(self):
+        # piso: o pacote depende do pandas
+        return "import pandas"
+
+    def timeraw_tesouro_direto_br(self):
+        return "import src.tesouro_direto_br"
+
+    def timeraw_tesouro_direto_br_e_requests(self):
+        # custo adicional da primeira chamada que faz download
+        return "import src.tesouro_direto_br\nimport requests"
@@ -0,0 +1,45 @@
+# -*- coding: utf-8 -*-
+"""Custo dos pontos de medição com a instrumentação desativada e ativada."""
+
+from src.tesouro_direto_br import instrumenta, instrumentacao
+from src.tesouro_direto_br.tesouro_direto_br import _cotiza_tabela_carteira
+from tests.dados_sinteticos import gera_series_carteira
+
+
+class PontoMedicao:
+    params = [False, True]
+    param_names = ["ativa"]
+
+    def setup(self, ativa):
+        self.medicao = instrumenta() if ativa else None
+        if self.medicao is not None:
+            self.medicao.__enter__()
+
+    def teardown(self, ativa):
+        if self.medicao is not None:
+            self.medicao.__exit__(None, None, None)
+
+    def time_etapa(self, ativa):
+        with instrumentacao.etapa("etapa"):
+            pass
+
+    def time_conta(self, ativa):
+        instrumentacao.conta("contador")
+
+
+class Cotizacao:
+    params = [False, True]
+    param_names = ["ativa"]
+
+    def setup(self, ativa):
+        _, self.tabela = gera_series_carteira(6, 250)
+        self.medicao = instrumenta() if ativa else None
+        if self.medicao is not None:
+            self.medicao.__enter__()
+
+    def teardown(self, ativa):
+        if self.medicao is not None:
+            self.medicao.__exit__(None, None, None)
+
+    def time_cotiza_tabela_carteira(self, ativa):
+        _cotiza_tabela_carteira(self.tabela.copy())
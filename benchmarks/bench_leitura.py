@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+"""Leitura do CSV de vendas: texto completo em memória (original) x leitura em fluxo x leitura em blocos compactos."""
+
+from src.tesouro_direto_br import tesouro_direto_br as td
+from tests.dados_sinteticos import gera_vendas, para_csv
+from tests.legado import busca_tesouro_direto_legado
+from tests.servidor_local import ServidorTesouro
+
+
+class LeituraVendas:
+    params = [100, 400]
+    param_names = ["operacoes_por_dia"]
+    timeout = 300
+
+    def setup(self, operacoes_por_dia):
+        conteudo = para_csv(gera_vendas(n_dias=2500, operacoes_por_dia=operacoes_por_dia))
+        self.servidor = ServidorTesouro({"VendasTesouroDireto.csv": conteudo}).__enter__()
+        self.url_original = td.URLS_TESOURO["venda"]
+        td.URLS_TESOURO["venda"] = self.url = self.servidor.url("VendasTesouroDireto.csv")
+
+    def teardown(self, operacoes_por_dia):
+        td.URLS_TESOURO["venda"] = self.url_original
+        self.servidor.__exit__()
+
+    def time_original(self, operacoes_por_dia):
+        busca_tesouro_direto_legado(self.url)
+
+    def peakmem_original(self, operacoes_por_dia):
+        busca_tesouro_direto_legado(self.url)
+
+    def time_fluxo(self, operacoes_por_dia):
+        td.busca_tesouro_direto("venda", agrupar=False, cache=False)
+
+    def peakmem_fluxo(self, operacoes_por_dia):
+        td.busca_tesouro_direto("venda", agrupar=False, cache=False)
+
+    def time_blocos_compacto(self, operacoes_por_dia):
+        td.busca_tesouro_direto_em_blocos("venda")
+
+    def peakmem_blocos_compacto(self, operacoes_por_dia):
+        td.busca_tesouro_direto_em_blocos("venda")
+
+    def time_blocos_filtrado(self, operacoes_por_dia):
+        td.busca_tesouro_direto_em_blocos("venda", tipos_titulo=["Tesouro Selic"], inicio="2025-01-01")
+
+    def peakmem_blocos_filtrado(self, operacoes_por_dia):
+        td.busca_tesouro_direto_em_blocos("venda", tipos_titulo=["Tesouro Selic"], inicio="2025-01-01")
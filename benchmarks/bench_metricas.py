@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+"""Métricas de risco de muitas carteiras: pandas rolling por métrica e por carteira x calcula_metricas."""
+
+import numpy as np
+import pandas as pd
+
+from src.tesouro_direto_br import calcula_metricas
+from tests.dados_sinteticos import datas_pregao
+
+SELIC_DIARIA = 1.1 ** (1 / 252) - 1
+
+
+def _por_carteira(cotas):
+    resumos = {}
+    for carteira, cota in cotas.items():
+        cota = cota.dropna()
+        retorno = cota.pct_change()
+        excesso = retorno - SELIC_DIARIA
+        resumo = {
+            "Volatilidade Anualizada": retorno.std() * np.sqrt(252),
+            "Drawdown Máximo": (cota / cota.cummax() - 1).min(),
+            "Sharpe": excesso.mean() / excesso.std() * np.sqrt(252),
+        }
+        for j in (21, 63, 252):
+            resumo[f"Retorno {j}d"] = (cota / cota.shift(j) - 1).iloc[-1]
+            resumo[f"Volatilidade {j}d"] = (retorno.rolling(j).std() * np.sqrt(252)).iloc[-1]
+            resumo[f"Sharpe {j}d"] = (excesso.rolling(j).mean() / excesso.rolling(j).std()).iloc[-1] * np.sqrt(252)
+        resumos[carteira] = resumo
+    return pd.DataFrame.from_dict(resumos, orient="index")
+
+
+class Metricas:
+    params = [100, 1_000]
+    param_names = ["carteiras"]
+    timeout = 600
+
+    def setup(self, n_carteiras):
+        rng = np.random.RandomState(0)
+        cotas = np.cumprod(1 + rng.normal(0.0004, 0.003, (2_500, n_carteiras)), axis=0)
+        self.cotas = pd.DataFrame(cotas, index=datas_pregao("2014-01-02", 2_500))
+
+    def time_pandas_rolling(self, n_carteiras):
+        _por_carteira(self.cotas)
+
+    def time_calcula_metricas(self, n_carteiras):
+        calcula_metricas(self.cotas, selic=0.1)
+
+    def time_calcula_metricas_com_series(self, n_carteiras):
+        calcula_metricas(self.cotas, selic=0.1, series_moveis=True)
+
+    def peakmem_calcula_metricas(self, n_carteiras):
+        calcula_metricas(self.cotas, selic=0.1)
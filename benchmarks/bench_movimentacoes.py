@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+"""Agregação de movimentacoes_titulos_publicos: filtros por tipo + pivot_table x códigos inteiros + unstack denso."""
+
+import pandas as pd
+
+from src.tesouro_direto_br.tesouro_direto_br import _agrega_movimentacoes
+from tests.dados_sinteticos import gera_vendas
+from tests.legado import movimentacoes_legado
+
+EXCLUIR = ["Juros Semestrais", "Educa+", "RendA+"]
+
+
+class AgregaMovimentacoes:
+    params = [100_000, 1_000_000]
+    param_names = ["linhas"]
+    timeout = 600
+
+    def setup(self, n_linhas):
+        self.vendas = gera_vendas(n_dias=2500, n_titulos=60, operacoes_por_dia=n_linhas // 2500)
+        self.agrupada = self.vendas.set_index(pd.MultiIndex.from_frame(self.vendas.iloc[:, :2])).iloc[:, 2:]
+
+    def time_original(self, n_linhas):
+        movimentacoes_legado(self.agrupada, "venda", EXCLUIR)
+
+    def time_codigos(self, n_linhas):
+        _agrega_movimentacoes(self.vendas, "venda", EXCLUIR, None)
+
+    def time_codigos_mensal(self, n_linhas):
+        _agrega_movimentacoes(self.vendas, "venda", EXCLUIR, None, "mensal")
+
+    def peakmem_original(self, n_linhas):
+        movimentacoes_legado(self.agrupada, "venda", EXCLUIR)
+
+    def peakmem_codigos(self, n_linhas):
+        _agrega_movimentacoes(self.vendas, "venda", EXCLUIR, None)
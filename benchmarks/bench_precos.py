@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+"""Consulta da série de cada título: MultiIndex não ordenado x PrecosTesouro."""
+
+import warnings
+
+import pandas as pd
+
+from src.tesouro_direto_br import PrecosTesouro
+from tests.dados_sinteticos import _titulos, gera_taxa
+from tests.legado import serie_pu_legado
+
+
+class ConsultaTitulos:
+    params = [8, 40]
+    param_names = ["titulos"]
+
+    def setup(self, n_titulos):
+        taxa = gera_taxa(n_dias=2500, n_titulos=n_titulos).sample(frac=1, random_state=0)
+        self.taxa = taxa
+        self.taxa_agrupada = taxa.set_index(pd.MultiIndex.from_frame(taxa.iloc[:, :2])).iloc[:, 2:]
+        self.precos = PrecosTesouro(taxa)
+        self.titulos = _titulos(None, n_titulos)
+
+    def time_multiindex(self, n_titulos):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            for tipo, vencimento in self.titulos:
+                serie_pu_legado(self.taxa_agrupada, tipo, vencimento)
+
+    def time_precos_serie(self, n_titulos):
+        for tipo, vencimento in self.titulos:
+            self.precos.serie(tipo, vencimento, ["PU Base Manha"])
+
+    def time_precos_arrays(self, n_titulos):
+        for tipo, vencimento in self.titulos:
+            self.precos.arrays(tipo, vencimento)
+
+    def time_construcao(self, n_titulos):
+        PrecosTesouro(self.taxa)
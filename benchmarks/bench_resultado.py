@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+"""Rotina diária: recálculo completo da carteira x ResultadoCarteira.atualiza com uma nova data base."""
+
+from src.tesouro_direto_br import Carteira, PrecosTesouro, ResultadoCarteira, Titulo, calcula_retorno_carteira
+from tests.dados_sinteticos import TITULOS_PADRAO, gera_taxa
+
+
+class AtualizacaoDiaria:
+    params = [500, 2500]
+    param_names = ["dias"]
+
+    def setup(self, n_dias):
+        taxa = gera_taxa(n_dias=n_dias, titulos=[t for t in TITULOS_PADRAO if t[1] > "2030"], n_titulos=20)
+        datas = sorted(taxa["Data Base"].unique())
+        self.carteira = Carteira(Titulo())
+        for (tipo, vencimento), _ in taxa.groupby(["Tipo Titulo", "Data Vencimento"]):
+            self.carteira.add(Titulo(tipo, vencimento.strftime("%Y-%m-%d"), datas[0].strftime("%Y-%m-%d"), 100.0))
+        self.precos = PrecosTesouro(taxa)
+        anterior = ResultadoCarteira.calcula(self.carteira, precos=PrecosTesouro(taxa[taxa["Data Base"] < datas[-1]]))
+        self.anterior = (anterior.titulos, anterior.tabela, anterior.estado)
+
+    def time_recalculo_completo(self, n_dias):
+        calcula_retorno_carteira(self.carteira, precos=self.precos)
+
+    def time_atualiza(self, n_dias):
+        ResultadoCarteira(*self.anterior).atualiza(precos=self.precos)
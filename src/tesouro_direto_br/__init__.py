@@ -1,5 +1,21 @@
 from .tesouro_direto_br import *
+from .analitico import calcula_analitico
+from .arquivo_colunar import carrega_arquivo_colunar, exporta_arquivo_colunar
+from .cache import diretorio_cache, limpa_cache
+from .calendario import (
+    ajusta_datas,
+    conta_dias_uteis,
+    dias_uteis,
+    eh_dia_util,
+    feriados_nacionais,
+)
+from .cubo import CuboMovimentacoes
+from .graficos import plota_taxas_titulos, reduz_serie
+from .instrumentacao import Medicoes, instrumenta
+from .metricas import calcula_metricas
+from .precos import PrecosTesouro
+from .resultado import ResultadoCarteira
 from . import version
 
 __version__ = version.__version__
-__author__ = "Rafael Rodrigues, rafa-rod @ GitHub"
\ No newline at end of file
+__author__ = "Rafael Rodrigues, rafa-rod @ GitHub"
@@ -0,0 +1,191 @@
+# -*- coding: utf-8 -*-
+"""
+Preço teórico, duration e DV01 de todos os títulos em todas as datas da base de taxas, em lote.
+
+Cada título é descrito pelo seu fluxo de pagamentos (cupons semestrais e principal, em % do valor de face) e
+descontado pela taxa do dia em dias úteis/252, convenção do Tesouro Nacional. Os pares (dia, pagamento) de todos
+os títulos são montados de uma vez e os valores presentes somados por linha, sem laço por título ou por data;
+os dias úteis até cada pagamento vêm da contagem acumulada do calendário (calendario.conta_dias_uteis).
+
+Títulos indexados (Tesouro IPCA+, IGPM+ e Selic) têm o preço em % do valor nominal atualizado (VNA), que não
+consta da base: para eles a cotação é calculada pela taxa e o VNA implícito, pelo PU observado.
+"""
+
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+from . import calendario, instrumentacao
+from .tesouro_direto_br import nomeclatura_titulos
+
+# cupom semestral (fração do valor de face) e se o valor de face é nominal (R$ 1.000) ou o VNA
+CONVENCOES: Dict[str, Tuple[float, bool]] = {
+    "LTN": (0.0, True),
+    "NTN-F": (1.10**0.5 - 1, True),
+    "NTN-B": (1.06**0.5 - 1, False),
+    "NTN-C": (1.06**0.5 - 1, False),
+    "NTN-B PRINCIPAL": (0.0, False),
+    "LTF": (0.0, False),
+}
+CUPOM_NTNC_2031 = 1.12**0.5 - 1
+VALOR_FACE = 1000.0
+BASE_ANO = 252
+PONTO_BASE = 0.0001
+COLUNAS_ANALITICO = [
+    "Tipo Titulo",
+    "Data Vencimento",
+    "Data Base",
+    "Dias Uteis",
+    "Taxa",
+    "Cotação",
+    "PU Teórico",
+    "VNA Implícito",
+    "Duration Macaulay",
+    "Duration Modificada",
+    "DV01",
+]
+
+
+def _convencao(sigla: str, vencimento: np.datetime64) -> Tuple[float, bool]:
+    cupom, nominal = CONVENCOES[sigla]
+    if sigla == "NTN-C" and vencimento.astype("datetime64[Y]") == np.datetime64("2031", "Y"):
+        cupom = CUPOM_NTNC_2031
+    return cupom, nominal
+
+
+def _cronograma(vencimento: np.datetime64, desde: np.datetime64, cupom: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Datas (crescentes) e valores, em % do valor de face, dos pagamentos posteriores a desde."""
+    if not cupom:
+        return np.array([vencimento]), np.array([100.0])
+    mes = vencimento.astype("datetime64[M]")
+    dia = vencimento - mes.astype("datetime64[D]")
+    semestres = (mes - desde.astype("datetime64[M]")).astype(int) // 6 + 1
+    datas = (mes - 6 * np.arange(max(semestres, 0) + 1)[::-1]).astype("datetime64[D]") + dia
+    datas = datas[datas > desde]
+    valores = np.full(len(datas), 100 * cupom)
+    valores[-1] += 100.0
+    return datas, valores
+
+
+@instrumentacao.medida()
+def calcula_analitico(
+    taxa: pd.DataFrame,
+    coluna_taxa: str = "Taxa Venda Manha",
+    coluna_pu: str = "PU Venda Manha",
+    linhas_por_bloco: int = 100_000,
+) -> pd.DataFrame:
+    """
+    Cotação, PU teórico, duration e DV01 de cada título em cada data base, pela taxa informada.
+        Parâmetros:
+                taxa (dataframe) => retorno de busca_tesouro_direto(tipo="taxa"), agrupado ou não;
+                coluna_taxa (str) => opcional. coluna da taxa (em % a.a.) usada no apreçamento;
+                coluna_pu (str) => opcional. coluna do PU observado, para o VNA implícito e o DV01 dos indexados;
+                linhas_por_bloco (int) => opcional. linhas processadas de cada vez, limita a memória usada.
+            Retorno:
+                df (dataframe): uma linha por título e data base, na ordem de taxa. Dias Uteis até o vencimento;
+                Cotação em % do valor de face; PU Teórico (somente prefixados); VNA Implícito (somente indexados);
+                durations em anos de 252 dias úteis; DV01 em R$ por título para 1 ponto-base. Tesouro RendA+ e
+                Educa+ e datas a partir do vencimento ficam com NaN.
+    """
+    if isinstance(taxa.index, pd.MultiIndex):
+        taxa = taxa.reset_index()
+    for coluna in (coluna_taxa, coluna_pu):
+        if coluna not in taxa.columns:
+            raise ValueError(f"Coluna não encontrada: {coluna}")
+    if linhas_por_bloco < 1:
+        raise ValueError("linhas_por_bloco deve ser positivo")
+
+    with instrumentacao.etapa("fluxos_titulos"):
+        tipos = taxa["Tipo Titulo"]
+        vencimentos = taxa["Data Vencimento"].to_numpy().astype("datetime64[D]")
+        datas = taxa["Data Base"].to_numpy().astype("datetime64[D]")
+        codigos_tipo, tipos_unicos = pd.factorize(tipos)
+        deslocamento = np.int64(1 << 20)  # chaves (título, dia): dias de 1970 somados a 2**19 ficam em [0, 2**20)
+        chave = codigos_tipo.astype(np.int64) * deslocamento + (vencimentos.astype(np.int64) + (1 << 19))
+        codigos, chaves = pd.factorize(chave)
+        n_titulos = len(chaves)
+
+        primeira = np.full(n_titulos, np.iinfo(np.int64).max)
+        np.minimum.at(primeira, codigos, datas.astype(np.int64))
+        _, indice = np.unique(codigos, return_index=True)  # primeira linha de cada título
+
+        # pagamentos de todos os títulos concatenados, cada título em um trecho [fins[t] - tamanhos[t], fins[t])
+        siglas = nomeclatura_titulos()
+        pagamentos, valores = [], []
+        nominal = np.zeros(n_titulos, dtype=bool)
+        suportado = np.zeros(n_titulos, dtype=bool)
+        for t, i in enumerate(indice.tolist()):
+            try:
+                cupom, nominal[t] = _convencao(siglas.get(tipos_unicos[codigos_tipo[i]]), vencimentos[i])
+            except KeyError:
+                pagamentos.append(np.array([], dtype="datetime64[D]"))
+                valores.append(np.array([]))
+                continue
+            suportado[t] = True
+            d, v = _cronograma(vencimentos[i], primeira[t].astype("datetime64[D]"), cupom)
+            pagamentos.append(d)
+            valores.append(v)
+        tamanhos = np.array([len(d) for d in pagamentos], dtype=np.int64)
+        fins = np.cumsum(tamanhos)
+        pagamentos = np.concatenate(pagamentos).astype("datetime64[D]")
+        valores = np.concatenate(valores)
+
+        # dias úteis acumulados do calendário: a contagem entre duas datas é a diferença das posições
+        _, _, acumulado = calendario._calendario()
+        datas_unicas, posicao_data = np.unique(datas, return_inverse=True)
+        acumulado_data = acumulado[calendario._posicoes(datas_unicas)][posicao_data].astype(np.int64)
+        acumulado_pagamento = acumulado[calendario._posicoes(pagamentos)].astype(np.int64)
+        acumulado_vencimento = acumulado[calendario._posicoes(vencimentos)].astype(np.int64)
+
+        # primeiro pagamento posterior à data base de cada linha (busca binária no trecho do título)
+        titulo_pagamento = np.repeat(np.arange(n_titulos, dtype=np.int64), tamanhos)
+        chave_pagamento = titulo_pagamento * deslocamento + (pagamentos.astype(np.int64) + (1 << 19))
+        chave_linha = codigos * deslocamento + (datas.astype(np.int64) + (1 << 19))
+        proximo = np.searchsorted(chave_pagamento, chave_linha, side="right")
+        restantes = fins[codigos] - proximo
+
+    with instrumentacao.etapa("analitico_titulos"):
+        n = len(taxa)
+        taxa_anual = taxa[coluna_taxa].to_numpy(dtype=float) / 100
+        pu = taxa[coluna_pu].to_numpy(dtype=float)
+        pu = np.where(pu > 0, pu, np.nan)
+        cotacao = np.zeros(n)
+        prazo_medio = np.zeros(n)
+        for a in range(0, n, linhas_por_bloco):
+            b = min(a + linhas_por_bloco, n)
+            quantidade = restantes[a:b]
+            linha = np.repeat(np.arange(a, b), quantidade)
+            inicio_linha = np.cumsum(quantidade) - quantidade
+            pagamento = proximo[linha] + (np.arange(len(linha)) - np.repeat(inicio_linha, quantidade))
+            anos = (acumulado_pagamento[pagamento] - acumulado_data[linha]) / BASE_ANO
+            presente = valores[pagamento] * (1 + taxa_anual[linha]) ** -anos
+            cotacao[a:b] = np.bincount(linha - a, weights=presente, minlength=b - a)
+            prazo_medio[a:b] = np.bincount(linha - a, weights=presente * anos, minlength=b - a)
+
+        valido = (restantes > 0) & suportado[codigos]
+        cotacao[~valido] = np.nan
+        duration = prazo_medio / cotacao
+        duration_modificada = duration / (1 + taxa_anual)
+        eh_nominal = nominal[codigos]
+        pu_teorico = np.where(eh_nominal, cotacao * VALOR_FACE / 100, np.nan)
+        vna = np.where(eh_nominal, np.nan, pu / cotacao * 100)
+        pu_referencia = np.where(np.isnan(pu), pu_teorico, pu)
+        dias = acumulado_vencimento - acumulado_data
+
+        return pd.DataFrame(
+            {
+                "Tipo Titulo": tipos.to_numpy(),
+                "Data Vencimento": taxa["Data Vencimento"].to_numpy(),
+                "Data Base": taxa["Data Base"].to_numpy(),
+                "Dias Uteis": pd.arrays.IntegerArray(dias, ~valido),
+                "Taxa": taxa_anual,
+                "Cotação": cotacao,
+                "PU Teórico": pu_teorico,
+                "VNA Implícito": vna,
+                "Duration Macaulay": duration,
+                "Duration Modificada": duration_modificada,
+                "DV01": pu_referencia * duration_modificada * PONTO_BASE,
+            },
+            columns=COLUNAS_ANALITICO,
+        )
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+Arquivo colunar dos dados do Tesouro Transparente, para abrir a base já processada em vários processos.
+
+Cada conjunto de dados ("venda", "taxa" e "resgate") fica em um subdiretório com um arquivo .npy por coluna
+(textos como categorias: códigos no .npy e categorias no manifesto) e o manifesto manifesto.json. A leitura
+mapeia os arquivos em memória (numpy.load com mmap_mode="r"): nada é copiado nem interpretado, e os processos
+da máquina que abrem o mesmo arquivo compartilham as mesmas páginas de memória.
+
+As linhas são gravadas ordenadas por título (tipo e vencimento) e data, a ordem de PrecosTesouro, que assim
+usa as colunas mapeadas sem reordená-las.
+"""
+
+import json
+import os
+import uuid
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from . import instrumentacao
+
+VERSAO_ARQUIVO = 1
+TIPOS_ARQUIVO = ("venda", "taxa", "resgate")
+MANIFESTO = "manifesto.json"
+
+
+def _pasta_tipo(diretorio: Union[str, Path], tipo: str) -> Path:
+    if tipo not in TIPOS_ARQUIVO:
+        raise ValueError("Tipo não encontrado")
+    return Path(diretorio) / tipo
+
+
+def _le_manifesto(pasta: Path) -> Optional[dict]:
+    try:
+        return json.loads((pasta / MANIFESTO).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def _grava_tipo(pasta: Path, df: pd.DataFrame) -> None:
+    if isinstance(df.index, pd.MultiIndex):
+        df = df.reset_index()
+    tipos = pd.Categorical(df.iloc[:, 0])
+    ordem = np.lexsort((df.iloc[:, 2].to_numpy(), df.iloc[:, 1].to_numpy(), tipos.codes))
+
+    # nomes de arquivo novos a cada gravação: processos com a versão anterior aberta continuam lendo os arquivos antigos
+    versao = uuid.uuid4().hex[:12]
+    pasta.mkdir(parents=True, exist_ok=True)
+    colunas = []
+    for i, nome in enumerate(df.columns):
+        serie = df[nome]
+        coluna = {"nome": nome, "arquivo": f"coluna_{i}.{versao}.npy"}
+        if isinstance(serie.dtype, np.dtype) and serie.dtype.kind in "biufM":
+            valores = serie.to_numpy()[ordem]
+        else:
+            categorias = pd.Categorical(serie)
+            valores = categorias.codes[ordem]
+            coluna["categorias"] = categorias.categories.tolist()
+        np.save(pasta / coluna["arquivo"], np.ascontiguousarray(valores))
+        colunas.append(coluna)
+
+    anterior = _le_manifesto(pasta)
+    try:
+        gravado_em = (pasta / MANIFESTO).stat().st_mtime
+    except OSError:
+        gravado_em = None
+    manifesto = {"versao": VERSAO_ARQUIVO, "linhas": len(df), "colunas": colunas}
+    temporario = pasta / f"{MANIFESTO}.{versao}.tmp"
+    temporario.write_text(json.dumps(manifesto, ensure_ascii=False), encoding="utf-8")
+    os.replace(temporario, pasta / MANIFESTO)
+
+    # remove os arquivos da versão anterior e os que sobraram de gravações mais antigas (anteriores ao manifesto
+    # substituído). No Windows, arquivos ainda mapeados por outro processo não podem ser removidos: ficam para
+    # a próxima gravação
+    atuais = {coluna["arquivo"] for coluna in colunas}
+    antigos = {coluna["arquivo"] for coluna in (anterior or {}).get("colunas", [])}
+    for arquivo in pasta.glob("coluna_*.npy"):
+        if arquivo.name in atuais:
+            continue
+        try:
+            if arquivo.name in antigos or (gravado_em is not None and arquivo.stat().st_mtime < gravado_em):
+                arquivo.unlink()
+        except OSError:
+            pass
+
+
+@instrumentacao.medida()
+def exporta_arquivo_colunar(
+    diretorio: Union[str, Path],
+    tipos: Sequence[str] = TIPOS_ARQUIVO,
+    dados: Optional[Dict[str, pd.DataFrame]] = None,
+    proxies: Optional[Dict[str, str]] = None,
+    **kwargs,
+) -> Path:
+    """
+    Grava os dados do Tesouro Transparente no formato colunar, substituindo a versão anterior do diretório.
+        Parâmetros:
+                diretorio (str) => diretório do arquivo;
+                tipos (tuple) => opcional. conjuntos de dados a gravar, dentre "venda", "taxa" e "resgate";
+                dados (dict) => opcional. tabelas já obtidas com busca_tesouro_direto, por tipo. Os tipos ausentes são buscados;
+                proxies (dict) => opcional. se necessário, informar dicionário com as proxies, exemplo: {"http":f'https://{LOGIN}:{SENHA}@{PROXY_EMPRESA}:{PORTA}'}
+                kwargs => opcional. demais parâmetros de busca_tesouro_direto (cache, validade_cache, incremental).
+            Retorno:
+                diretorio (Path): diretório do arquivo.
+    """
+    from .tesouro_direto_br import busca_tesouro_direto
+
+    pastas = {tipo: _pasta_tipo(diretorio, tipo) for tipo in tipos}
+    for tipo, pasta in pastas.items():
+        if dados is not None and tipo in dados:
+            df = dados[tipo]
+        else:
+            df = busca_tesouro_direto(tipo, proxies=proxies, agrupar=False, **kwargs)
+        with instrumentacao.etapa("gravacao_arquivo_colunar"):
+            _grava_tipo(pasta, df)
+    return Path(diretorio)
+
+
+@instrumentacao.medida()
+def carrega_arquivo_colunar(
+    diretorio: Union[str, Path], tipo: str = "taxa", agrupar: bool = False
+) -> pd.DataFrame:
+    """
+    Abre um conjunto de dados gravado por exporta_arquivo_colunar, com as colunas mapeadas em memória (somente leitura).
+        Parâmetros:
+                diretorio (str) => diretório do arquivo;
+                tipo (str) => opcional. "venda", "taxa" ou "resgate";
+                agrupar (bool) => opcional. para agrupar o dataframe por titulo e vencimento.
+            Retorno:
+                df (dataframe): tabela no formato de busca_tesouro_direto, com Tipo Titulo como categoria e
+                linhas ordenadas por título e data.
+    """
+    pasta = _pasta_tipo(diretorio, tipo)
+    manifesto = _le_manifesto(pasta)
+    if manifesto is None:
+        raise ValueError(f"Arquivo colunar não encontrado em {pasta}")
+    if manifesto.get("versao") != VERSAO_ARQUIVO:
+        raise ValueError(f"Versão do arquivo colunar não suportada: {manifesto.get('versao')}")
+
+    modo = "r" if manifesto["linhas"] else None  # arquivo sem linhas não pode ser mapeado
+    dados = {}
+    for coluna in manifesto["colunas"]:
+        valores = np.load(pasta / coluna["arquivo"], mmap_mode=modo)
+        if "categorias" in coluna:
+            valores = pd.Categorical.from_codes(valores, coluna["categorias"])
+        dados[coluna["nome"]] = valores
+    df = pd.DataFrame(dados, copy=False)
+
+    if agrupar:  # titulo e seu vencimento
+        multi_indice = pd.MultiIndex.from_frame(df.iloc[:, :2])
+        df = df.set_index(multi_indice).iloc[:, 2:]
+    return df
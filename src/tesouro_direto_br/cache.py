@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+"""
+Cache local dos dados baixados do Tesouro Transparente.
+
+Cada conjunto de dados ("venda", "taxa" e "resgate") é gravado já processado (datas convertidas),
+junto com os metadados HTTP (ETag e Last-Modified) usados para revalidar o arquivo com o servidor.
+O diretório padrão é ~/.tesouro_direto_br e pode ser alterado pela variável de ambiente
+TESOURO_DIRETO_BR_CACHE.
+"""
+
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Optional, Tuple
+
+import pandas as pd
+
+from . import instrumentacao
+
+VARIAVEL_DIRETORIO_CACHE = "TESOURO_DIRETO_BR_CACHE"
+
+
+def diretorio_cache() -> Path:
+    return Path(
+        os.environ.get(
+            VARIAVEL_DIRETORIO_CACHE, Path.home() / ".tesouro_direto_br"
+        )
+    )
+
+
+def _arquivos_cache(tipo: str) -> Tuple[Path, Path]:
+    diretorio = diretorio_cache()
+    return diretorio / f"{tipo}.pkl", diretorio / f"{tipo}.json"
+
+
+def le_metadados_cache(tipo: str) -> Optional[dict]:
+    arquivo_dados, arquivo_meta = _arquivos_cache(tipo)
+    if not (arquivo_dados.exists() and arquivo_meta.exists()):
+        return None
+    try:
+        return json.loads(arquivo_meta.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def le_cache(tipo: str) -> Optional[pd.DataFrame]:
+    arquivo_dados, _ = _arquivos_cache(tipo)
+    try:
+        with instrumentacao.etapa("cache_leitura"):
+            return pd.read_pickle(arquivo_dados)
+    except Exception:  # arquivo ausente, truncado ou de versão incompatível do pandas
+        return None
+
+
+def _grava_atomico(destino: Path, grava: Callable[[str], None]) -> None:
+    # grava em arquivo temporário exclusivo e renomeia: não deixa cache corrompido se o processo for interrompido
+    # e gravações simultâneas (outras threads ou processos) não disputam o mesmo arquivo temporário
+    descritor, temporario = tempfile.mkstemp(dir=destino.parent, prefix=f"{destino.name}.", suffix=".tmp")
+    os.close(descritor)
+    try:
+        grava(temporario)
+        os.replace(temporario, destino)
+    except BaseException:
+        Path(temporario).unlink(missing_ok=True)
+        raise
+
+
+def grava_cache(tipo: str, df: pd.DataFrame, metadados: dict) -> None:
+    arquivo_dados, _ = _arquivos_cache(tipo)
+    arquivo_dados.parent.mkdir(parents=True, exist_ok=True)
+    with instrumentacao.etapa("cache_gravacao"):
+        _grava_atomico(arquivo_dados, df.to_pickle)
+    grava_metadados_cache(tipo, metadados)
+
+
+def grava_metadados_cache(tipo: str, metadados: dict) -> None:
+    _, arquivo_meta = _arquivos_cache(tipo)
+    arquivo_meta.parent.mkdir(parents=True, exist_ok=True)
+    conteudo = json.dumps(dict(metadados, verificado_em=time.time()))
+    _grava_atomico(arquivo_meta, lambda caminho: Path(caminho).write_text(conteudo, encoding="utf-8"))
+
+
+def cache_valido(metadados: Optional[dict], url: str, validade: float) -> bool:
+    if not metadados or metadados.get("url") != url:
+        return False
+    return time.time() - metadados.get("verificado_em", 0) < validade
+
+
+@instrumentacao.medida()
+def limpa_cache(tipo: Optional[str] = None) -> None:
+    """
+    Remove os arquivos do cache local.
+        Parâmetros:
+                tipo (str) => opcional. "venda", "taxa" ou "resgate". Se omitido, remove todos.
+    """
+    tipos = [tipo.lower()] if tipo else ["venda", "taxa", "resgate"]
+    for t in tipos:
+        for arquivo in _arquivos_cache(t):
+            if arquivo.exists():
+                arquivo.unlink()
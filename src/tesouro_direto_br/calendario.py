@@ -0,0 +1,183 @@
+# -*- coding: utf-8 -*-
+"""
+Calendário de dias úteis (feriados nacionais ANBIMA), calculado localmente, sem acesso à rede.
+
+O calendário é montado uma única vez: um array ordenado com os dias úteis e outro com a contagem acumulada
+de dias úteis para cada dia corrido, de modo que o número de dias úteis entre duas datas é a diferença de
+duas posições do array.
+"""
+
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from . import instrumentacao
+
+ANO_INICIAL = 1990
+ANO_FINAL = 2099
+SENTIDOS_AJUSTE = ("seguinte", "anterior")
+
+Datas = Union[str, date, datetime, np.datetime64, pd.Series, pd.Index, np.ndarray, list]
+
+
+def _dia(anos: np.ndarray, mes: Union[int, np.ndarray], dia: Union[int, np.ndarray]) -> np.ndarray:
+    meses = (anos - 1970) * 12 + mes - 1
+    return meses.astype("datetime64[M]").astype("datetime64[D]") + (dia - 1)
+
+
+def _pascoa(anos: np.ndarray) -> np.ndarray:
+    # algoritmo de Meeus/Jones/Butcher para o calendário gregoriano
+    a = anos % 19
+    b, c = anos // 100, anos % 100
+    d, e = b // 4, b % 4
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    mes = (h + l - 7 * m + 114) // 31
+    dia = (h + l - 7 * m + 114) % 31 + 1
+    return _dia(anos, mes, dia)
+
+
+@instrumentacao.medida()
+def feriados_nacionais(ano_inicial: int = ANO_INICIAL, ano_final: int = ANO_FINAL) -> np.ndarray:
+    """
+    Feriados nacionais considerados pela ANBIMA: datas fixas, Carnaval (segunda e terça), Sexta-feira Santa,
+    Corpus Christi e, a partir de 2024, o Dia Nacional de Zumbi e da Consciência Negra.
+        Parâmetros:
+                ano_inicial, ano_final (int) => opcional. intervalo de anos (inclusive).
+            Retorno:
+                array datetime64[D] ordenado.
+    """
+    anos = np.arange(ano_inicial, ano_final + 1)
+    fixos = [
+        _dia(anos, mes, dia)
+        for mes, dia in [(1, 1), (4, 21), (5, 1), (9, 7), (10, 12), (11, 2), (11, 15), (12, 25)]
+    ]
+    fixos.append(_dia(anos[anos >= 2024], 11, 20))
+    pascoa = _pascoa(anos)
+    moveis = [pascoa - 48, pascoa - 47, pascoa - 2, pascoa + 60]
+    return np.unique(np.concatenate(fixos + moveis))
+
+
+@lru_cache(maxsize=1)
+def _calendario() -> Tuple[np.datetime64, np.ndarray, np.ndarray]:
+    inicio = np.datetime64(f"{ANO_INICIAL}-01-01", "D")
+    fim = np.datetime64(f"{ANO_FINAL + 1}-01-01", "D")
+    dias = np.arange(inicio, fim)
+    uteis = np.is_busday(dias, holidays=feriados_nacionais())
+    # acumulado[i] = dias úteis em [inicio, inicio + i)
+    acumulado = np.zeros(len(dias) + 1, dtype=np.int32)
+    np.cumsum(uteis, out=acumulado[1:])
+    dias_uteis = dias[uteis]
+    dias_uteis.flags.writeable = False
+    acumulado.flags.writeable = False
+    return inicio, dias_uteis, acumulado
+
+
+def _para_dias(datas: Datas) -> np.ndarray:
+    if getattr(datas, "dtype", None) is not None and datas.dtype.kind == "M":
+        return np.asarray(datas).astype("datetime64[D]")
+    if isinstance(datas, str):
+        datas = pd.to_datetime(datas, dayfirst="/" in datas)
+    elif isinstance(datas, (list, tuple)):
+        datas = pd.to_datetime(datas, dayfirst=any(isinstance(d, str) and "/" in d for d in datas))
+    return np.asarray(pd.to_datetime(datas)).astype("datetime64[D]")
+
+
+def _posicoes(datas: Datas) -> np.ndarray:
+    inicio, _, acumulado = _calendario()
+    posicoes = (_para_dias(datas) - inicio).astype(np.int64)
+    if np.any((posicoes < 0) | (posicoes >= len(acumulado) - 1)):
+        raise ValueError(f"Data fora do calendário de dias úteis ({ANO_INICIAL} a {ANO_FINAL})")
+    return posicoes
+
+
+@instrumentacao.medida()
+def conta_dias_uteis(inicio: Datas, fim: Datas, inclusivo: bool = True) -> Union[int, np.ndarray]:
+    """
+    Número de dias úteis entre duas datas, em tempo constante. Aceita datas isoladas ou arrays de datas.
+        Parâmetros:
+                inicio, fim (str, datetime ou array) => datas no formato dd/mm/aaaa, aaaa-mm-dd ou datetime;
+                inclusivo (bool) => opcional. True conta o intervalo [inicio, fim], como listar_dias_uteis do pyettj;
+                False conta [inicio, fim), como numpy.busday_count.
+            Retorno:
+                int ou array de int. Negativo se fim for anterior a inicio.
+    """
+    _, _, acumulado = _calendario()
+    a, b = _posicoes(inicio), _posicoes(fim) + int(inclusivo)
+    contagem = acumulado[b] - acumulado[a]
+    return int(contagem) if contagem.ndim == 0 else contagem.astype(np.int64)
+
+
+@instrumentacao.medida()
+def dias_uteis(inicio: Datas, fim: Datas) -> pd.DatetimeIndex:
+    """
+    Dias úteis entre duas datas (inclusive).
+        Parâmetros:
+                inicio, fim (str ou datetime) => datas no formato dd/mm/aaaa, aaaa-mm-dd ou datetime.
+    """
+    _, uteis, acumulado = _calendario()
+    a, b = _posicoes(inicio), _posicoes(fim) + 1
+    return pd.DatetimeIndex(uteis[acumulado[a] : max(acumulado[a], acumulado[b])])
+
+
+@instrumentacao.medida()
+def eh_dia_util(datas: Datas) -> Union[bool, np.ndarray]:
+    """
+    Indica se a data (ou cada data do array) é dia útil.
+    """
+    _, _, acumulado = _calendario()
+    posicoes = _posicoes(datas)
+    util = acumulado[posicoes + 1] > acumulado[posicoes]
+    return bool(util) if util.ndim == 0 else util
+
+
+@instrumentacao.medida()
+def ajusta_datas(
+    datas: Datas, datas_validas: Optional[Datas] = None, sentido: str = "seguinte"
+) -> Union[pd.Timestamp, pd.DatetimeIndex]:
+    """
+    Ajusta cada data para uma data válida: a própria data, se válida, ou a primeira válida seguinte (ou anterior).
+    Todas as datas são resolvidas de uma vez, por busca binária nas datas válidas.
+        Parâmetros:
+                datas (str, datetime ou array) => datas a ajustar, exemplo: datas de investimento de uma carteira;
+                datas_validas (array) => opcional. datas com negociação, exemplo: índice de calcula_retorno_carteira ou PrecosTesouro.datas. Se omitido, usa os dias úteis;
+                sentido (str) => opcional. "seguinte" ou "anterior".
+            Retorno:
+                Timestamp ou DatetimeIndex. NaT quando não há data válida no sentido informado.
+    """
+    if sentido not in SENTIDOS_AJUSTE:
+        raise ValueError("Sentido não encontrado.")
+    seguinte = sentido == "seguinte"
+    dias = _para_dias(datas)
+    escalar = dias.ndim == 0
+    dias = np.atleast_1d(dias)
+    presentes = ~np.isnat(dias)
+
+    if datas_validas is None:
+        _, validas, acumulado = _calendario()
+        posicoes = _posicoes(dias[presentes])
+        # acumulado[p] = dias úteis anteriores ao dia p = posição do primeiro dia útil a partir dele
+        indices = acumulado[posicoes] if seguinte else acumulado[posicoes + 1] - 1
+    else:
+        validas = np.unique(_para_dias(datas_validas).ravel())
+        validas = validas[~np.isnat(validas)]
+        indices = np.searchsorted(validas, dias[presentes], side="left" if seguinte else "right")
+        if not seguinte:
+            indices = indices - 1
+
+    encontradas = (indices >= 0) & (indices < len(validas))
+    ajustadas = np.full(len(dias), np.datetime64("NaT"), dtype="datetime64[D]")
+    valores = ajustadas[presentes]
+    valores[encontradas] = validas[indices[encontradas]]
+    ajustadas[presentes] = valores
+    ajustadas = ajustadas.astype("datetime64[ns]")
+    if escalar:
+        return pd.Timestamp(ajustadas[0])
+    return pd.DatetimeIndex(ajustadas)
@@ -0,0 +1,202 @@
+# -*- coding: utf-8 -*-
+"""
+Cubo de movimentações (vendas e resgates) do Tesouro Direto montado uma única vez, para consultas repetidas.
+
+As duas bases são somadas em um array denso movimento x medida x título x data (títulos = pares tipo e vencimento,
+datas = todas as datas com venda ou resgate) e guardadas como somas acumuladas ao longo das datas. A soma de
+qualquer intervalo de datas é a diferença de duas posições; períodos (semanas, meses), grupos de títulos e o fluxo
+líquido (vendas menos resgates) saem de recortes e diferenças do cubo, sem reagrupar os registros originais.
+"""
+
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from . import instrumentacao
+from .tesouro_direto_br import FREQUENCIAS_MOVIMENTACAO, _periodos
+
+MOVIMENTOS = ("venda", "resgate")
+MEDIDAS = ("Quantidade", "Valor")
+AGRUPAMENTOS = ("titulo", "tipo")
+
+Data = Union[str, np.datetime64, pd.Timestamp, None]
+
+
+def _colunas_movimentacao(df: pd.DataFrame, movimento: str) -> Tuple[pd.Series, np.ndarray, np.ndarray, np.ndarray]:
+    if isinstance(df.index, pd.MultiIndex):
+        df = df.reset_index()
+    return (
+        df["Tipo Titulo"],
+        df["Vencimento do Titulo"].to_numpy().astype("datetime64[D]"),
+        df[f"Data {movimento.title()}"].to_numpy(),
+        np.stack([df[medida].to_numpy(dtype=float) for medida in MEDIDAS]),
+    )
+
+
+class CuboMovimentacoes:
+    """
+    Vendas e resgates (recompras) por título e data em um array denso de somas acumuladas.
+        Parâmetros:
+                venda (dataframe) => retorno de busca_tesouro_direto(tipo="venda"), agrupado ou não;
+                resgate (dataframe) => retorno de busca_tesouro_direto(tipo="resgate"), agrupado ou não.
+        Atributos:
+                titulos (dataframe): Tipo Titulo e Vencimento do Titulo de cada título, indexados pelo nome tipo_vencimento (como em movimentacoes_titulos_publicos);
+                datas (DatetimeIndex): datas com alguma venda ou resgate;
+                acumulado (array): movimento ("venda", "resgate") x medida ("Quantidade", "Valor") x título x (datas + 1), somas até cada data (exclusive).
+    """
+
+    @instrumentacao.medida("cubo_movimentacoes")
+    def __init__(self, venda: pd.DataFrame, resgate: pd.DataFrame):
+        bases = [_colunas_movimentacao(venda, "venda"), _colunas_movimentacao(resgate, "resgate")]
+        codigos_tipo, tipos_unicos = pd.factorize(pd.concat([b[0] for b in bases], ignore_index=True))
+        vencimentos = np.concatenate([b[1] for b in bases])
+        datas = np.concatenate([b[2] for b in bases])
+
+        # título = (tipo, vencimento) e data agrupados por códigos inteiros, como em movimentacoes_titulos_publicos
+        chave = codigos_tipo.astype(np.int64) << 32 | (vencimentos.astype(np.int64) & 0xFFFFFFFF)
+        codigos_titulo, chaves = pd.factorize(chave)
+        tipo_titulo = np.asarray(tipos_unicos, dtype=object)[chaves >> 32]
+        vencimento_titulo = (chaves & 0xFFFFFFFF).astype(np.int32).astype("datetime64[D]")
+        nomes = np.array(
+            [f"{t}_{v}" for t, v in zip(tipo_titulo, vencimento_titulo.astype(str))], dtype=object
+        )
+        # títulos na ordem das colunas de movimentacoes_titulos_publicos: cada tipo ocupa um trecho contíguo
+        ordem = np.argsort(nomes, kind="stable")
+        posicao = np.empty_like(ordem)
+        posicao[ordem] = np.arange(len(ordem))
+        codigos_titulo = posicao[codigos_titulo]
+        codigos_data, datas_unicas = pd.factorize(datas)
+        ordem_datas = np.argsort(datas_unicas)
+        posicao_data = np.empty_like(ordem_datas)
+        posicao_data[ordem_datas] = np.arange(len(ordem_datas))
+        codigos_data = posicao_data[codigos_data]
+
+        self.datas = pd.DatetimeIndex(datas_unicas[ordem_datas], name="Data")
+        self.titulos = pd.DataFrame(
+            {
+                "Tipo Titulo": tipo_titulo[ordem],
+                "Vencimento do Titulo": pd.to_datetime(vencimento_titulo[ordem]),
+            },
+            index=pd.Index(nomes[ordem], name="Titulo"),
+        )
+
+        n_titulos, n_datas = len(ordem), len(self.datas)
+        self.acumulado = np.zeros((len(MOVIMENTOS), len(MEDIDAS), n_titulos, n_datas + 1))
+        celulas = codigos_titulo * n_datas + codigos_data
+        inicio = 0
+        for m, (_, _, datas_base, valores) in enumerate(bases):
+            fim = inicio + len(datas_base)
+            celula = celulas[inicio:fim]
+            for k in range(len(MEDIDAS)):
+                soma = np.bincount(celula, weights=valores[k], minlength=n_titulos * n_datas)
+                np.cumsum(soma.reshape(n_titulos, n_datas), axis=1, out=self.acumulado[m, k, :, 1:])
+            inicio = fim
+
+        # início de cada tipo no eixo de títulos, para somar grupos de títulos com reduceat
+        tipos_ordenados = self.titulos["Tipo Titulo"].to_numpy()
+        self._inicios_tipos = np.flatnonzero(
+            np.concatenate([[True], tipos_ordenados[1:] != tipos_ordenados[:-1]])
+        )
+
+    @classmethod
+    def busca(cls, proxies: Optional[Dict[str, str]] = None, **kwargs) -> "CuboMovimentacoes":
+        """
+        Obtém vendas e resgates com busca_tesouro_direto e monta o cubo.
+            Parâmetros:
+                    proxies (dict) => opcional. se necessário, informar dicionário com as proxies, exemplo: {"http":f'https://{LOGIN}:{SENHA}@{PROXY_EMPRESA}:{PORTA}'}
+                    kwargs => opcional. demais parâmetros de busca_tesouro_direto (cache, validade_cache, incremental).
+        """
+        from .tesouro_direto_br import busca_tesouro_direto
+
+        return cls(
+            busca_tesouro_direto("venda", proxies=proxies, agrupar=False, **kwargs),
+            busca_tesouro_direto("resgate", proxies=proxies, agrupar=False, **kwargs),
+        )
+
+    @classmethod
+    def de_arquivo_colunar(cls, diretorio: Union[str, Path]) -> "CuboMovimentacoes":
+        """
+        Monta o cubo a partir das vendas e resgates gravados por exporta_arquivo_colunar.
+            Parâmetros:
+                    diretorio (str) => diretório do arquivo.
+        """
+        from .arquivo_colunar import carrega_arquivo_colunar
+
+        return cls(carrega_arquivo_colunar(diretorio, "venda"), carrega_arquivo_colunar(diretorio, "resgate"))
+
+    def _somas(self, movimento: str, medida: str, limites: np.ndarray) -> np.ndarray:
+        """Somas de cada título entre posições consecutivas de limites: títulos x períodos."""
+        if medida not in MEDIDAS:
+            raise ValueError("Medida não encontrada.")
+        k = MEDIDAS.index(medida)
+        if movimento == "liquido":
+            acumulado = self.acumulado[0, k][:, limites] - self.acumulado[1, k][:, limites]
+        elif movimento in MOVIMENTOS:
+            acumulado = self.acumulado[MOVIMENTOS.index(movimento), k][:, limites]
+        else:
+            raise ValueError("Tipo de Movimentação não encontrada.")
+        return np.diff(acumulado, axis=1)
+
+    def _intervalo(self, inicio: Data, fim: Data) -> Tuple[int, int]:
+        a, b = 0, len(self.datas)
+        if inicio is not None:
+            a = int(self.datas.searchsorted(pd.Timestamp(inicio), side="left"))
+        if fim is not None:
+            b = int(self.datas.searchsorted(pd.Timestamp(fim), side="right"))
+        return a, max(a, b)
+
+    @instrumentacao.medida("CuboMovimentacoes.consulta")
+    def consulta(
+        self,
+        movimento: str = "liquido",
+        medida: str = "Quantidade",
+        frequencia: Optional[str] = None,
+        inicio: Data = None,
+        fim: Data = None,
+        tipos_titulo: Optional[Sequence[str]] = None,
+        agrupar_por: str = "titulo",
+    ) -> Union[pd.Series, pd.DataFrame]:
+        """
+        Soma das movimentações no intervalo de datas, total ou por período, por título ou por tipo de título.
+            Parâmetros:
+                    movimento (str) => opcional. "venda", "resgate" ou "liquido" (vendas menos resgates);
+                    medida (str) => opcional. "Quantidade" ou "Valor";
+                    frequencia (str) => opcional. "diaria", "semanal" (semanas encerradas no domingo) ou "mensal" (datas no último dia do mês). Se omitida, total do intervalo;
+                    inicio, fim (str) => opcional. intervalo de datas (inclusive);
+                    tipos_titulo (list) => opcional. tipos de TPF a manter, exemplo: ["Tesouro IPCA+", "Tesouro IPCA+ com Juros Semestrais"];
+                    agrupar_por (str) => opcional. "titulo" (colunas tipo_vencimento) ou "tipo" (colunas por tipo de título).
+                Retorno:
+                    series (total) ou dataframe (períodos x títulos), com zero onde não houve movimentação.
+        """
+        if frequencia is not None and frequencia not in FREQUENCIAS_MOVIMENTACAO:
+            raise ValueError("Frequência não encontrada.")
+        if agrupar_por not in AGRUPAMENTOS:
+            raise ValueError("Agrupamento não encontrado.")
+        a, b = self._intervalo(inicio, fim)
+
+        # posições das somas acumuladas que delimitam cada período: o período i soma as datas [limites[i], limites[i + 1])
+        if frequencia is None:
+            limites = np.array([a, b])
+            indice = None
+        else:
+            rotulos = _periodos(self.datas.to_numpy()[a:b], frequencia)
+            mudancas = np.flatnonzero(rotulos[1:] != rotulos[:-1]) + 1
+            limites = a + np.concatenate([[0], mudancas, [b - a]]) if b > a else np.array([a])
+            indice = pd.DatetimeIndex(rotulos[limites[:-1] - a], name="Data")
+        somas = self._somas(movimento, medida, limites)
+
+        titulos = self.titulos
+        if agrupar_por == "tipo":
+            somas = np.add.reduceat(somas, self._inicios_tipos, axis=0) if len(somas) else somas
+            colunas = pd.Index(titulos["Tipo Titulo"].to_numpy()[self._inicios_tipos], name="Tipo Titulo")
+            manter = colunas.isin(tipos_titulo) if tipos_titulo is not None else slice(None)
+        else:
+            colunas = titulos.index
+            manter = titulos["Tipo Titulo"].isin(tipos_titulo).to_numpy() if tipos_titulo is not None else slice(None)
+        somas, colunas = somas[manter], colunas[manter]
+
+        if indice is None:
+            return pd.Series(somas[:, 0], index=colunas, name=movimento)
+        return pd.DataFrame(somas.T, index=indice, columns=colunas)
@@ -0,0 +1,126 @@
+# -*- coding: utf-8 -*-
+"""
+Gráficos das taxas de vários títulos a partir de uma única base de preços.
+
+Cada série é reduzida à resolução da tela antes de ir para o matplotlib: as datas são divididas em grupos
+consecutivos e, de cada grupo, ficam o primeiro e o último ponto, o mínimo e o máximo (redução min/max). Com um
+grupo por coluna de pixels, a linha desenhada é igual à da série completa, com poucos milhares de pontos.
+"""
+
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from . import instrumentacao
+from .precos import PrecosTesouro
+
+PONTOS_PADRAO = 2_000
+TAMANHO_FIGURA = (16, 5)
+
+
+def _indices_min_max(valores: np.ndarray, pontos: int) -> np.ndarray:
+    n = len(valores)
+    grupos = max(pontos // 4, 1)
+    if n <= pontos:
+        return np.arange(n)
+    tamanho = -(-n // grupos)
+    grupos = -(-n // tamanho)
+    nulos = np.isnan(valores)
+    menores = np.full(grupos * tamanho, np.inf)
+    maiores = np.full(grupos * tamanho, -np.inf)
+    menores[:n] = np.where(nulos, np.inf, valores)
+    maiores[:n] = np.where(nulos, -np.inf, valores)
+    inicios = np.arange(grupos) * tamanho
+    indices = np.concatenate(
+        [
+            inicios,
+            inicios + menores.reshape(grupos, tamanho).argmin(axis=1),
+            inicios + maiores.reshape(grupos, tamanho).argmax(axis=1),
+            np.minimum(inicios + tamanho, n) - 1,
+            np.flatnonzero(nulos),  # lacunas da série continuam como lacunas no gráfico
+        ]
+    )
+    return np.unique(indices)
+
+
+@instrumentacao.medida()
+def reduz_serie(
+    datas: np.ndarray, valores: np.ndarray, pontos: int = PONTOS_PADRAO
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reduz a série a no máximo cerca de pontos pontos, preservando o desenho: de cada grupo de datas consecutivas
+    ficam o primeiro e o último ponto, o mínimo e o máximo.
+        Parâmetros:
+                datas (array) => datas da série, em ordem crescente;
+                valores (array) => valores da série;
+                pontos (int) => opcional. número de pontos desejado (use a largura do gráfico em pixels).
+            Retorno:
+                (datas, valores): arrays reduzidos, na ordem original.
+    """
+    if pontos < 4:
+        raise ValueError("Informe ao menos 4 pontos")
+    valores = np.asarray(valores, dtype=float)
+    indices = _indices_min_max(valores, pontos)
+    return np.asarray(datas)[indices], valores[indices]
+
+
+@instrumentacao.medida()
+def plota_taxas_titulos(
+    titulos: Sequence[Tuple[str, str]],
+    colunas: Sequence[str] = ("Taxa Compra Manha",),
+    inicio: Optional[str] = None,
+    fim: Optional[str] = None,
+    arquivo: Union[str, Path, None] = None,
+    pontos: Optional[int] = None,
+    ax=None,
+    proxies: Optional[Dict[str, str]] = None,
+    precos: Optional[PrecosTesouro] = None,
+):
+    """
+    Plota as taxas de vários títulos nos mesmos eixos, com cada série reduzida à resolução do gráfico.
+        Parâmetros:
+                titulos (list) => pares (tipo de TPF, vencimento), exemplo: [("Tesouro Prefixado", "2029-01-01"), ("Tesouro IPCA+", "2035-05-15")];
+                colunas (list) => opcional. colunas de taxa (ou preço) de cada título;
+                inicio, fim (str) => opcional. intervalo de datas base (inclusive);
+                arquivo (str) => opcional. grava o gráfico no arquivo (png, svg, pdf...) sem usar a interface gráfica;
+                pontos (int) => opcional. pontos por série. Padrão: a largura do gráfico em pixels;
+                ax (Axes) => opcional. eixos do matplotlib onde desenhar;
+                proxies (dict) => opcional. se necessário, informar dicionário com as proxies, exemplo: {"http":f'https://{LOGIN}:{SENHA}@{PROXY_EMPRESA}:{PORTA}'}
+                precos (PrecosTesouro) => opcional. base de preços já carregada, evita nova busca dos dados.
+            Retorno:
+                fig (Figure): figura do matplotlib.
+    """
+    if precos is None:
+        precos = PrecosTesouro.busca(proxies=proxies)
+    from .tesouro_direto_br import nomeclatura_titulos
+
+    if ax is not None:
+        fig = ax.figure
+    elif arquivo is not None:
+        from matplotlib.figure import Figure
+
+        # figura fora do pyplot: não abre janela nem depende do backend da interface gráfica
+        fig = Figure(figsize=TAMANHO_FIGURA)
+        ax = fig.add_subplot()
+    else:
+        import matplotlib.pyplot as plt
+
+        fig, ax = plt.subplots(figsize=TAMANHO_FIGURA)
+    if pontos is None:
+        pontos = max(int(ax.bbox.width), 4)
+
+    siglas = nomeclatura_titulos()
+    for tipo_titulo, vencimento in titulos:
+        nome = f"{siglas.get(tipo_titulo, tipo_titulo)} {pd.Timestamp(vencimento):%d/%m/%Y}"
+        for coluna in colunas:
+            datas, valores = precos.arrays(tipo_titulo, vencimento, coluna, inicio, fim)
+            datas, valores = reduz_serie(datas, valores, pontos)
+            ax.plot(datas, valores, label=nome if len(colunas) == 1 else f"{nome} {coluna}")
+    # posição fixa: loc="best" percorre todos os pontos de todas as linhas para posicionar a legenda
+    ax.legend(frameon=False, loc="upper left")
+
+    if arquivo is not None:
+        fig.savefig(arquivo)
+    return fig
@@ -0,0 +1,146 @@
+# -*- coding: utf-8 -*-
+"""
+Medição opcional das etapas do processamento: tempo de cada etapa (requisição, leitura do CSV, conversão
+de datas, cache, montagem das séries e cotização), bytes baixados, linhas lidas e acertos e falhas do cache.
+
+Desativada por padrão: enquanto nenhuma medição estiver aberta com instrumenta(), cada ponto de medição
+custa apenas a verificação de uma lista vazia.
+
+    with instrumenta() as medicoes:
+        calcula_retorno_carteira(carteira)
+    medicoes.como_dict()
+
+Os tempos são inclusivos: uma etapa contém as etapas chamadas dentro dela (a leitura do CSV inclui a
+conversão de datas, calcula_retorno_carteira inclui busca_tesouro_direto). Chamadas feitas em outras
+threads são registradas; em outros processos (calcula_retorno_carteiras com processos > 1), não.
+"""
+
+import logging
+import threading
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+from time import perf_counter
+from typing import Callable, Dict, Iterator, List, Optional
+
+logger = logging.getLogger("tesouro_direto_br")
+
+_MEDICOES: List["Medicoes"] = []
+_NULO = nullcontext()
+
+
+class Medicoes:
+    """
+    Tempos e contadores registrados enquanto a medição está aberta.
+        Parâmetros:
+                nivel_log (int) => opcional. nível (exemplo: logging.INFO) em que cada registro é enviado ao logger "tesouro_direto_br";
+                callback (função) => opcional. chamada a cada registro com (tipo, nome, valor), tipo "etapa" (valor em segundos) ou "contador".
+    """
+
+    def __init__(
+        self,
+        nivel_log: Optional[int] = None,
+        callback: Optional[Callable[[str, str, float], None]] = None,
+    ):
+        self.etapas: Dict[str, Dict[str, float]] = {}
+        self.contadores: Dict[str, int] = {}
+        self.nivel_log = nivel_log
+        self.callback = callback
+        self._trava = threading.Lock()
+
+    def _registra_etapa(self, nome: str, segundos: float) -> None:
+        with self._trava:
+            etapa = self.etapas.setdefault(nome, {"chamadas": 0, "segundos": 0.0})
+            etapa["chamadas"] += 1
+            etapa["segundos"] += segundos
+        if self.nivel_log is not None:
+            logger.log(self.nivel_log, "etapa %s: %.6f s", nome, segundos)
+        if self.callback is not None:
+            self.callback("etapa", nome, segundos)
+
+    def _registra_contador(self, nome: str, valor: int) -> None:
+        with self._trava:
+            self.contadores[nome] = self.contadores.get(nome, 0) + valor
+        if self.nivel_log is not None:
+            logger.log(self.nivel_log, "contador %s: +%d", nome, valor)
+        if self.callback is not None:
+            self.callback("contador", nome, valor)
+
+    def como_dict(self) -> dict:
+        """
+        Retorno:
+            dict com "etapas" ({nome: {"chamadas", "segundos"}}) e "contadores" ({nome: total}).
+        """
+        with self._trava:
+            return {
+                "etapas": {nome: dict(etapa) for nome, etapa in self.etapas.items()},
+                "contadores": dict(self.contadores),
+            }
+
+
+@contextmanager
+def instrumenta(
+    nivel_log: Optional[int] = None,
+    callback: Optional[Callable[[str, str, float], None]] = None,
+) -> Iterator[Medicoes]:
+    """
+    Abre uma medição das funções do pacote chamadas dentro do bloco with.
+        Parâmetros:
+                nivel_log (int) => opcional. nível (exemplo: logging.INFO) em que cada registro é enviado ao logger "tesouro_direto_br";
+                callback (função) => opcional. chamada a cada registro com (tipo, nome, valor), tipo "etapa" (valor em segundos) ou "contador".
+            Retorno:
+                medicoes (Medicoes): tempos por etapa e contadores (bytes_baixados, linhas_lidas, requisicoes, cache_acertos, cache_falhas).
+    """
+    medicoes = Medicoes(nivel_log, callback)
+    _MEDICOES.append(medicoes)
+    try:
+        yield medicoes
+    finally:
+        _MEDICOES.remove(medicoes)
+
+
+class _Etapa:
+    __slots__ = ("nome", "inicio")
+
+    def __init__(self, nome: str):
+        self.nome = nome
+
+    def __enter__(self) -> "_Etapa":
+        self.inicio = perf_counter()
+        return self
+
+    def __exit__(self, *excecao) -> None:
+        segundos = perf_counter() - self.inicio
+        for medicoes in list(_MEDICOES):
+            medicoes._registra_etapa(self.nome, segundos)
+
+
+def etapa(nome: str):
+    """Bloco with cujo tempo é registrado com o nome informado (sem efeito sem medição aberta)."""
+    if not _MEDICOES:
+        return _NULO
+    return _Etapa(nome)
+
+
+def conta(nome: str, valor: int = 1) -> None:
+    """Soma valor ao contador informado (sem efeito sem medição aberta)."""
+    if _MEDICOES:
+        for medicoes in list(_MEDICOES):
+            medicoes._registra_contador(nome, valor)
+
+
+def medida(nome: Optional[str] = None) -> Callable:
+    """Decorador que registra o tempo de cada chamada da função (pelo nome da função, se omitido)."""
+
+    def decorador(funcao: Callable) -> Callable:
+        rotulo = nome or funcao.__name__
+
+        @wraps(funcao)
+        def envolvida(*args, **kwargs):
+            if not _MEDICOES:
+                return funcao(*args, **kwargs)
+            with _Etapa(rotulo):
+                return funcao(*args, **kwargs)
+
+        return envolvida
+
+    return decorador
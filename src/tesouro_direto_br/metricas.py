@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""
+Métricas de risco e retorno das cotas de uma ou de muitas carteiras, calculadas em uma única passagem.
+
+As cotas são organizadas em uma matriz datas x carteiras (NaN antes do início de cada carteira). Todas as métricas
+saem de somas acumuladas ao longo das datas: retornos, quadrados dos retornos e excessos sobre a Selic (janelas
+móveis são diferenças de duas posições das somas) e o máximo acumulado das cotas (drawdown). O custo é linear no
+número de datas, qualquer que seja a janela, e o mesmo para todas as carteiras de uma vez.
+"""
+
+from typing import Dict, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from . import instrumentacao
+
+JANELAS = (21, 63, 252)
+DIAS_ANO = 252
+
+Cotas = Union[pd.DataFrame, pd.Series, np.ndarray, Dict[object, pd.DataFrame]]
+
+
+def _matriz_cotas(cotas: Cotas) -> Tuple[np.ndarray, pd.Index, pd.Index, bool]:
+    """Matriz datas x carteiras, datas, carteiras e se a entrada é uma única carteira."""
+    unica = False
+    if isinstance(cotas, dict):
+        cotas = pd.concat({k: _coluna_cotas(v) for k, v in cotas.items()}, axis=1, names=["Carteira"])
+    elif isinstance(cotas, np.ndarray):
+        if cotas.ndim == 1:
+            cotas, unica = cotas[:, None], True
+        if cotas.ndim != 2:
+            raise ValueError("Cotas devem ser uma série ou uma matriz datas x carteiras")
+        cotas = pd.DataFrame(cotas)
+    elif isinstance(cotas, pd.Series) or {"Cotas", "Rentabilidade Diária"} & set(cotas.columns):
+        serie = _coluna_cotas(cotas)
+        if isinstance(serie.index, pd.MultiIndex):  # formato_longo de calcula_retorno_carteiras
+            cotas = serie.unstack(level=0)
+        else:
+            cotas, unica = serie.to_frame("Carteira"), True
+    return cotas.to_numpy(dtype=float), cotas.index, cotas.columns, unica
+
+
+def _coluna_cotas(df: Union[pd.DataFrame, pd.Series]) -> pd.Series:
+    if isinstance(df, pd.Series):
+        return df
+    if "Cotas" in df.columns:
+        return df["Cotas"]
+    if "Rentabilidade Diária" in df.columns:
+        return (1 + df["Rentabilidade Diária"].fillna(0)).cumprod()
+    raise ValueError("Informe a tabela de calcula_retorno_carteira (colunas Cotas ou Rentabilidade Diária)")
+
+
+def _retorno_selic(
+    selic: Union[float, pd.Series, np.ndarray, None], datas: pd.Index, n_datas: int
+) -> np.ndarray:
+    if selic is None:
+        return np.zeros(n_datas)
+    if isinstance(selic, pd.Series):
+        return selic.reindex(datas).to_numpy(dtype=float)
+    if np.ndim(selic) == 0:  # taxa anual constante
+        return np.full(n_datas, (1 + float(selic)) ** (1 / DIAS_ANO) - 1)
+    selic = np.asarray(selic, dtype=float)
+    if selic.shape != (n_datas,):
+        raise ValueError("A série da Selic deve ter uma taxa diária por data")
+    return selic
+
+
+def _somas(valores: np.ndarray) -> np.ndarray:
+    """Somas acumuladas com uma linha de zeros no início: a soma em (i, j] é somas[j] - somas[i]."""
+    somas = np.zeros((valores.shape[0] + 1,) + valores.shape[1:])
+    np.cumsum(valores, axis=0, out=somas[1:])
+    return somas
+
+
+def _janela(
+    somas: Tuple[np.ndarray, ...], fim, inicio, tamanho: Optional[int]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Volatilidade anualizada dos retornos e índice de Sharpe dos excessos entre duas posições das somas
+    acumuladas (fim e inicio: índices das somas). Com tamanho, exige a janela completa de retornos (e de
+    excessos, para o Sharpe).
+    """
+    n_r, s_r, s_r2, n_e, s_e, s_e2 = (s[fim] - s[inicio] for s in somas)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        variancia = (s_r2 - s_r * s_r / n_r) / (n_r - 1)
+        media_excesso = s_e / n_e
+        desvio_excesso = np.sqrt(np.maximum((s_e2 - s_e * media_excesso) / (n_e - 1), 0))
+        volatilidade = np.sqrt(np.maximum(variancia, 0) * DIAS_ANO)
+        sharpe = media_excesso / desvio_excesso * np.sqrt(DIAS_ANO)
+    if tamanho is not None:
+        volatilidade = np.where(n_r == tamanho, volatilidade, np.nan)
+        sharpe = np.where(n_e == tamanho, sharpe, np.nan)
+    return volatilidade, sharpe
+
+
+@instrumentacao.medida()
+def calcula_metricas(
+    cotas: Cotas,
+    selic: Union[float, pd.Series, np.ndarray, None] = None,
+    janelas: Sequence[int] = JANELAS,
+    series_moveis: bool = False,
+) -> Union[pd.DataFrame, pd.Series, Tuple[Union[pd.DataFrame, pd.Series], pd.DataFrame]]:
+    """
+    Retorno, volatilidade anualizada, drawdown máximo e índice de Sharpe (contra a Selic) de carteiras, no
+    período completo e nas janelas móveis informadas, para todas as carteiras de uma só vez.
+        Parâmetros:
+                cotas (dataframe, dict ou array) => retorno de calcula_retorno_carteira (colunas Cotas ou Rentabilidade Diária),
+                de calcula_retorno_carteiras (dict ou formato_longo) ou matriz de cotas datas x carteiras (NaN fora do período);
+                selic (float, series ou array) => opcional. taxa Selic anual constante (exemplo: 0.1075) ou retorno diário por data. Padrão: zero;
+                janelas (list) => opcional. tamanhos, em dias úteis, das janelas móveis;
+                series_moveis (bool) => opcional. retorna também as séries diárias das métricas móveis e do drawdown.
+            Retorno:
+                resumo (series ou dataframe): métricas de cada carteira (série, se uma única carteira), com as janelas móveis na última data;
+                moveis (dataframe): somente com series_moveis. métricas móveis por data (e por carteira, se várias).
+    """
+    janelas = [int(j) for j in janelas]
+    if any(j < 2 for j in janelas):
+        raise ValueError("As janelas devem ter ao menos 2 dias")
+    matriz, datas, carteiras, unica = _matriz_cotas(cotas)
+    n_datas, n_carteiras = matriz.shape
+    rf = _retorno_selic(selic, datas, n_datas)[:, None]
+
+    # retornos diários (NaN antes do início da carteira) e somas acumuladas
+    retornos = np.full_like(matriz, np.nan)
+    np.divide(matriz[1:], matriz[:-1], out=retornos[1:])
+    retornos -= 1
+    excessos = retornos - rf
+    # contagens separadas: datas sem Selic ficam fora somente do Sharpe, não da volatilidade
+    validos_retorno = ~np.isnan(retornos)
+    validos_excesso = ~np.isnan(excessos)
+    np.copyto(retornos, 0.0, where=~validos_retorno)
+    np.copyto(excessos, 0.0, where=~validos_excesso)
+    somas = (
+        _somas(validos_retorno.astype(float)),
+        _somas(retornos),
+        _somas(retornos * retornos),
+        _somas(validos_excesso.astype(float)),
+        _somas(excessos),
+        _somas(excessos * excessos),
+    )
+    del retornos, excessos, validos_retorno, validos_excesso
+
+    # período completo: da primeira à última cota de cada carteira
+    presentes = ~np.isnan(matriz)
+    primeira = presentes.argmax(axis=0)
+    ultima = n_datas - 1 - presentes[::-1].argmax(axis=0)
+    colunas = np.arange(n_carteiras)
+    inicial, final = matriz[primeira, colunas], matriz[ultima, colunas]
+    dias = (ultima - primeira).astype(float)
+    drawdown = np.fmax.accumulate(matriz, axis=0)
+    np.divide(matriz, drawdown, out=drawdown)
+    drawdown -= 1
+    volatilidade, sharpe = _janela(somas, -1, 0, None)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        resumo = {
+            "Retorno Acumulado": final / inicial - 1,
+            "Retorno Anualizado": (final / inicial) ** (DIAS_ANO / dias) - 1,
+            "Volatilidade Anualizada": volatilidade,
+            "Drawdown Máximo": np.fmin.reduce(drawdown, axis=0, initial=0.0),
+            "Sharpe": sharpe,
+        }
+
+    # janelas móveis: retorno pelas cotas das pontas e estatísticas pelas diferenças das somas. Sem as séries,
+    # somente a última data de cada carteira é calculada
+    moveis = {}
+    for j in janelas:
+        completa = ultima >= j
+        inicio = np.where(completa, ultima - j, 0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            retorno = np.where(completa, final / matriz[inicio, colunas] - 1, np.nan)
+        volatilidade, sharpe = _janela(somas, (ultima + 1, colunas), (inicio + 1, colunas), j)
+        resumo[f"Retorno {j}d"] = retorno
+        resumo[f"Volatilidade {j}d"] = np.where(completa, volatilidade, np.nan)
+        resumo[f"Sharpe {j}d"] = np.where(completa, sharpe, np.nan)
+        if series_moveis:
+            retorno = np.full_like(matriz, np.nan)
+            volatilidade = np.full_like(matriz, np.nan)
+            sharpe = np.full_like(matriz, np.nan)
+            if j < n_datas:
+                retorno[j:] = matriz[j:] / matriz[:-j] - 1
+                volatilidade[j:], sharpe[j:] = _janela(somas, slice(j + 1, None), slice(1, -j), j)
+            moveis[f"Retorno {j}d"] = retorno
+            moveis[f"Volatilidade {j}d"] = volatilidade
+            moveis[f"Sharpe {j}d"] = sharpe
+    moveis["Drawdown"] = drawdown
+
+    resumo = pd.DataFrame(resumo, index=carteiras)
+    if unica:
+        resumo = resumo.iloc[0]
+    if not series_moveis:
+        return resumo
+
+    if unica:
+        tabela = pd.DataFrame({nome: valores[:, 0] for nome, valores in moveis.items()}, index=datas)
+    else:
+        indice = pd.MultiIndex.from_product([carteiras, datas], names=["Carteira", datas.name])
+        tabela = pd.DataFrame({nome: valores.T.ravel() for nome, valores in moveis.items()}, index=indice)
+        tabela = tabela[presentes.T.ravel()]
+    return resumo, tabela
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""
+Base de preços e taxas do Tesouro Direto organizada por título para consultas repetidas.
+"""
+
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from . import instrumentacao
+
+COLUNAS_PRECOS = [
+    "Taxa Compra Manha",
+    "Taxa Venda Manha",
+    "PU Compra Manha",
+    "PU Venda Manha",
+    "PU Base Manha",
+]
+
+Data = Union[str, datetime, np.datetime64, None]
+
+
+def _ordenado(codigos: np.ndarray, vencimentos: np.ndarray, datas: np.ndarray) -> bool:
+    mesmo_tipo = codigos[1:] == codigos[:-1]
+    mesmo_titulo = mesmo_tipo & (vencimentos[1:] == vencimentos[:-1])
+    return bool(
+        np.all(
+            (codigos[1:] > codigos[:-1])
+            | (mesmo_tipo & (vencimentos[1:] > vencimentos[:-1]))
+            | (mesmo_titulo & (datas[1:] >= datas[:-1]))
+        )
+    )
+
+
+def _chave_vencimento(vencimento: Data) -> np.datetime64:
+    if isinstance(vencimento, str):
+        try:
+            return np.datetime64(vencimento[:10], "D")
+        except ValueError:
+            pass
+    return np.datetime64(pd.Timestamp(vencimento).date(), "D")
+
+
+class PrecosTesouro:
+    """
+    Tabela de preços e taxas (busca_tesouro_direto com tipo="taxa") ordenada por tipo, vencimento e data base.
+    Cada título ocupa um trecho contíguo dos arrays de datas e valores, localizado em tempo constante pelo
+    par (tipo, vencimento); recortes por data usam busca binária dentro do trecho.
+        Parâmetros:
+                taxa (dataframe) => retorno de busca_tesouro_direto(tipo="taxa"), agrupado ou não.
+    """
+
+    @instrumentacao.medida("indice_precos")
+    def __init__(self, taxa: pd.DataFrame):
+        if isinstance(taxa.index, pd.MultiIndex):
+            taxa = taxa.reset_index()
+        tipos = pd.Categorical(taxa["Tipo Titulo"])
+        vencimentos = taxa["Data Vencimento"].to_numpy().astype("datetime64[D]")
+        datas = taxa["Data Base"].to_numpy()
+        if _ordenado(tipos.codes, vencimentos, datas):
+            # já na ordem da base (exemplo: arquivo colunar): as colunas são usadas sem cópia
+            ordem = slice(None)
+        else:
+            ordem = np.lexsort((datas, vencimentos, tipos.codes))
+
+        self.datas = datas[ordem]
+        self.colunas = [c for c in COLUNAS_PRECOS if c in taxa.columns]
+        self.valores = {
+            c: np.ascontiguousarray(taxa[c].to_numpy(dtype=float)[ordem]) for c in self.colunas
+        }
+
+        codigos, vencimentos = tipos.codes[ordem], vencimentos[ordem]
+        mudanca = np.flatnonzero(
+            (codigos[1:] != codigos[:-1]) | (vencimentos[1:] != vencimentos[:-1])
+        ) + 1
+        inicios = np.concatenate([[0], mudanca])
+        fins = np.concatenate([mudanca, [len(datas)]])
+        categorias = tipos.categories
+        self._trechos: Dict[Tuple[str, np.datetime64], Tuple[int, int]] = {
+            (categorias[codigos[i]], vencimentos[i]): (i, f)
+            for i, f in zip(inicios.tolist(), fins.tolist())
+        }
+        self.titulos = pd.DataFrame(
+            {
+                "Tipo Titulo": categorias[codigos[inicios]],
+                "Data Vencimento": pd.to_datetime(vencimentos[inicios]),
+                "Inicio": self.datas[inicios],
+                "Fim": self.datas[fins - 1],
+                "Registros": fins - inicios,
+            }
+        )
+
+    @classmethod
+    def busca(cls, proxies: Optional[Dict[str, str]] = None, **kwargs) -> "PrecosTesouro":
+        """
+        Obtém os dados com busca_tesouro_direto(tipo="taxa") e monta a base.
+            Parâmetros:
+                    proxies (dict) => opcional. se necessário, informar dicionário com as proxies, exemplo: {"http":f'https://{LOGIN}:{SENHA}@{PROXY_EMPRESA}:{PORTA}'}
+                    kwargs => opcional. demais parâmetros de busca_tesouro_direto (cache, validade_cache, incremental).
+        """
+        from .tesouro_direto_br import busca_tesouro_direto
+
+        return cls(busca_tesouro_direto("taxa", proxies=proxies, agrupar=False, **kwargs))
+
+    @classmethod
+    def de_arquivo_colunar(cls, diretorio: Union[str, Path]) -> "PrecosTesouro":
+        """
+        Abre a base gravada por exporta_arquivo_colunar, sem copiar nem reordenar os dados: os processos que
+        abrem o mesmo diretório compartilham uma única cópia dos preços na memória.
+            Parâmetros:
+                    diretorio (str) => diretório do arquivo.
+        """
+        from .arquivo_colunar import carrega_arquivo_colunar
+
+        return cls(carrega_arquivo_colunar(diretorio, "taxa"))
+
+    def __len__(self) -> int:
+        return len(self.datas)
+
+    def __contains__(self, titulo: Tuple[str, Data]) -> bool:
+        tipo_titulo, vencimento = titulo
+        return (tipo_titulo, _chave_vencimento(vencimento)) in self._trechos
+
+    def _trecho(
+        self, tipo_titulo: str, vencimento: Data, inicio: Data = None, fim: Data = None
+    ) -> Tuple[int, int]:
+        try:
+            a, b = self._trechos[(tipo_titulo, _chave_vencimento(vencimento))]
+        except KeyError:
+            raise KeyError(f"Título não encontrado: {tipo_titulo} {vencimento}")
+        datas = self.datas[a:b]
+        if inicio is not None:
+            a += int(np.searchsorted(datas, np.datetime64(pd.Timestamp(inicio)), side="left"))
+        if fim is not None:
+            b = a + int(
+                np.searchsorted(self.datas[a:b], np.datetime64(pd.Timestamp(fim)), side="right")
+            )
+        return a, b
+
+    def arrays(
+        self,
+        tipo_titulo: str,
+        vencimento: Data,
+        coluna: str = "PU Base Manha",
+        inicio: Data = None,
+        fim: Data = None,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Datas e valores de um título, sem cópia.
+            Parâmetros:
+                    tipo_titulo (str) => tipo de TPF, exemplo: Tesouro Selic;
+                    vencimento (str) => data de vencimento do TPF;
+                    coluna (str) => opcional. coluna de preço ou taxa;
+                    inicio, fim (str) => opcional. intervalo de datas base (inclusive).
+                Retorno:
+                    (datas, valores): arrays ordenados por data base.
+        """
+        a, b = self._trecho(tipo_titulo, vencimento, inicio, fim)
+        return self.datas[a:b], self.valores[coluna][a:b]
+
+    @instrumentacao.medida("serie_precos")
+    def serie(
+        self,
+        tipo_titulo: str,
+        vencimento: Data,
+        colunas: Optional[Sequence[str]] = None,
+        inicio: Data = None,
+        fim: Data = None,
+    ) -> pd.DataFrame:
+        """
+        Série histórica de um título indexada pela data base.
+            Parâmetros:
+                    tipo_titulo (str) => tipo de TPF, exemplo: Tesouro Selic;
+                    vencimento (str) => data de vencimento do TPF;
+                    colunas (list) => opcional. colunas de preço ou taxa (padrão: todas);
+                    inicio, fim (str) => opcional. intervalo de datas base (inclusive).
+        """
+        a, b = self._trecho(tipo_titulo, vencimento, inicio, fim)
+        colunas: List[str] = list(colunas or self.colunas)
+        return pd.DataFrame(
+            {c: self.valores[c][a:b] for c in colunas},
+            index=pd.Index(self.datas[a:b], name="Data Base"),
+        )
@@ -0,0 +1,242 @@
+# -*- coding: utf-8 -*-
+"""
+Resultado de calcula_retorno_carteira que pode ser gravado em disco e atualizado a cada nova data base,
+calculando apenas as datas novas a partir do último estado da cotização.
+"""
+
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from . import cache, instrumentacao
+from .precos import PrecosTesouro
+from .tesouro_direto_br import (
+    Carteira,
+    _cotiza_tabela_carteira,
+    _fator_titulo,
+    _nome_titulo,
+    _series_pu_carteiras,
+)
+
+
+class ResultadoCarteira:
+    """
+    Tabela de cotização de uma carteira (mesmo formato de calcula_retorno_carteira) junto com o estado
+    do último dia: fator acumulado e último PU de cada título, quantidade e valor da cota e rentabilidade
+    acumulada. Com esse estado, atualiza() calcula somente as datas base publicadas depois da última,
+    com o mesmo resultado de um recálculo completo.
+    """
+
+    def __init__(self, titulos: List[dict], tabela: pd.DataFrame, estado: dict):
+        self.titulos = titulos
+        self.tabela = tabela
+        self.estado = estado
+
+    @classmethod
+    @instrumentacao.medida("ResultadoCarteira.calcula")
+    def calcula(
+        cls,
+        carteira: Union[Carteira, List[dict]],
+        proxies: Optional[Dict[str, str]] = None,
+        precos: Optional[PrecosTesouro] = None,
+    ) -> "ResultadoCarteira":
+        """
+        Calcula a carteira desde a data do primeiro investimento.
+            Parâmetros:
+                    carteira (class) => carteira de TPFs (ou a lista Carteira.titulos);
+                    proxies (dict) => opcional. se necessário, informar dicionário com as proxies, exemplo: {"http":f'https://{LOGIN}:{SENHA}@{PROXY_EMPRESA}:{PORTA}'}
+                    precos (PrecosTesouro) => opcional. base de preços já carregada, evita nova busca dos dados.
+        """
+        titulos = carteira.titulos if isinstance(carteira, Carteira) else carteira
+        titulos = sorted(titulos, key=lambda d: d["Data Investimento"])
+        if precos is None:
+            precos = PrecosTesouro.busca(proxies=proxies)
+        series_pu = _series_pu_carteiras(precos, [titulos])
+        fatores = [
+            _fator_titulo(
+                series_pu[(tpf["Tipo"], tpf["Vencimento"])],
+                tpf["Tipo"],
+                tpf["Vencimento"],
+                tpf["Data Investimento"],
+                tpf["Investimento"],
+            )
+            for tpf in titulos
+        ]
+        tabela = _cotiza_tabela_carteira(pd.concat([fator - 1 for fator in fatores], axis=1))
+
+        ultima_data = tabela.index[-1]
+        colunas = tabela.columns[: len(titulos)]
+        valores = tabela[colunas].to_numpy(dtype=float)[-1:]
+        acumulado = (1 + tabela["Rentabilidade Diária"]).cumprod().iloc[-1]
+        estado = {
+            "fatores": np.array([f.iloc[-1, 0] if len(f) else np.nan for f in fatores]),
+            "pus": np.array(
+                [
+                    series_pu[(tpf["Tipo"], tpf["Vencimento"])].loc[f.index[-1]].iloc[0] if len(f) else np.nan
+                    for tpf, f in zip(titulos, fatores)
+                ]
+            ),
+            "iniciados": np.array([len(f) > 0 for f in fatores]),
+            "encerrados": np.array([len(f) > 0 and f.index[-1] < ultima_data for f in fatores]),
+            "mtm": np.where(np.isnan(valores), 0.0, valores).sum(axis=1)[0],
+            "qde_cotas": tabela["Qde Cotas"].iloc[-1],
+            "cota": tabela["Cotas"].iloc[-1],
+            "acumulado": 1.0 if np.isnan(acumulado) else acumulado,
+        }
+        return cls(titulos, tabela, estado)
+
+    @classmethod
+    @instrumentacao.medida("ResultadoCarteira.carrega")
+    def carrega(cls, arquivo: Union[str, Path]) -> "ResultadoCarteira":
+        """
+        Lê um resultado gravado com salva().
+            Parâmetros:
+                    arquivo (str) => caminho do arquivo.
+        """
+        dados = pd.read_pickle(arquivo)
+        return cls(dados["titulos"], dados["tabela"], dados["estado"])
+
+    @instrumentacao.medida("ResultadoCarteira.salva")
+    def salva(self, arquivo: Union[str, Path]) -> None:
+        """
+        Grava a tabela e o estado da cotização para atualizações futuras.
+            Parâmetros:
+                    arquivo (str) => caminho do arquivo.
+        """
+        arquivo = Path(arquivo)
+        arquivo.parent.mkdir(parents=True, exist_ok=True)
+        dados = {"titulos": self.titulos, "tabela": self.tabela, "estado": self.estado}
+        cache._grava_atomico(arquivo, lambda caminho: pd.to_pickle(dados, caminho))
+
+    @instrumentacao.medida("ResultadoCarteira.atualiza")
+    def atualiza(
+        self,
+        proxies: Optional[Dict[str, str]] = None,
+        precos: Optional[PrecosTesouro] = None,
+        novos_titulos: Optional[List[dict]] = None,
+    ) -> pd.DataFrame:
+        """
+        Acrescenta à tabela as datas base posteriores à última calculada, com as aplicações dos novos títulos
+        e os vencimentos ocorridos nessas datas. Se a atualização afetar datas já calculadas (novo título com
+        aplicação anterior à última data, ou preços publicados para um título já vencido), a carteira é
+        recalculada por completo.
+            Parâmetros:
+                    proxies (dict) => opcional. se necessário, informar dicionário com as proxies, exemplo: {"http":f'https://{LOGIN}:{SENHA}@{PROXY_EMPRESA}:{PORTA}'}
+                    precos (PrecosTesouro) => opcional. base de preços já carregada, evita nova busca dos dados.
+                    novos_titulos (list) => opcional. títulos adicionados à carteira (formato de Carteira.titulos).
+                Retorno:
+                    novas (dataframe): linhas acrescentadas à tabela.
+        """
+        if precos is None:
+            precos = PrecosTesouro.busca(proxies=proxies)
+        ultima_data = self.tabela.index[-1]
+        titulos = sorted(self.titulos + list(novos_titulos or []), key=lambda d: d["Data Investimento"])
+        if any(a is not b for a, b in zip(titulos, self.titulos)) or any(
+            pd.to_datetime(tpf["Data Investimento"]) <= ultima_data for tpf in titulos[len(self.titulos) :]
+        ):
+            return self._recalcula(titulos, precos)
+
+        n_antigos, n_titulos = len(self.titulos), len(titulos)
+        estado = self.estado
+        vazios = n_titulos - n_antigos
+        fatores = np.concatenate([estado["fatores"], np.full(vazios, np.nan)])
+        pus = np.concatenate([estado["pus"], np.full(vazios, np.nan)])
+        iniciados = np.concatenate([estado["iniciados"], np.zeros(vazios, dtype=bool)])
+        encerrados = np.concatenate([estado["encerrados"], np.zeros(vazios, dtype=bool)])
+        colunas = list(self.tabela.columns[:n_antigos]) + [
+            _nome_titulo(tpf["Tipo"], tpf["Vencimento"], tpf["Data Investimento"])
+            for tpf in titulos[n_antigos:]
+        ]
+
+        dia_seguinte = ultima_data + pd.Timedelta(days=1)
+        novos_precos = []
+        for j, tpf in enumerate(titulos):
+            inicio = dia_seguinte if iniciados[j] else tpf["Data Investimento"]
+            datas, pu = precos.arrays(tpf["Tipo"], tpf["Vencimento"], inicio=inicio)
+            if len(datas) and (encerrados[j] or datas[0] <= ultima_data.to_datetime64()):
+                return self._recalcula(titulos, precos)
+            novos_precos.append((datas, pu))
+        novas_datas = np.unique(np.concatenate([datas for datas, _ in novos_precos]))
+        n_datas = len(novas_datas)
+        if not n_datas:
+            self.tabela = self.tabela.reindex(columns=colunas + list(self.tabela.columns[n_antigos:]))
+            self.titulos = titulos
+            self.estado = dict(estado, fatores=fatores, pus=pus, iniciados=iniciados, encerrados=encerrados)
+            return self.tabela.iloc[:0]
+
+        # valores dos títulos nas novas datas, continuando o produto acumulado de cada um
+        valores = np.full((n_datas, n_titulos), np.nan)
+        for j, (datas, pu) in enumerate(novos_precos):
+            if not len(datas):
+                continue
+            if iniciados[j]:
+                anteriores = np.concatenate([[pus[j]], pu[:-1]])
+                fator = np.cumprod(np.concatenate([[fatores[j]], 1 + (pu / anteriores - 1)]))[1:]
+            else:
+                inicial = 1 + titulos[j]["Investimento"]
+                fator = np.cumprod(np.concatenate([[inicial], 1 + (pu[1:] / pu[:-1] - 1)]))
+            valores[np.searchsorted(novas_datas, datas), j] = fator - 1
+            fatores[j], pus[j] = fator[-1], pu[-1]
+
+        # eventos nas novas datas, na mesma ordem de _cotiza_carteira: aplicações dos títulos que passam a ter
+        # valor e vencimentos dos que deixam de ter (na primeira nova data, se o último valor é o da última data já calculada)
+        validos = ~np.isnan(valores)
+        possui_valor = validos.any(axis=0)
+        primeira = validos.argmax(axis=0)
+        ultima = n_datas - 1 - validos[::-1].argmax(axis=0)
+        vencem_antes = iniciados & ~encerrados & ~possui_valor
+        vencem_depois = possui_valor & (ultima < n_datas - 1)
+        aplicacoes = np.flatnonzero(possui_valor & ~iniciados)
+        vencimentos = np.flatnonzero(vencem_antes | vencem_depois)
+        linhas_vencimento = np.where(vencem_antes, 0, ultima + 1)[vencimentos]
+        ultimo_valor = np.where(vencem_antes, fatores - 1, valores[ultima, np.arange(n_titulos)])
+
+        fluxo = np.zeros(n_datas)
+        np.add.at(fluxo, primeira[aplicacoes], valores[primeira[aplicacoes], aplicacoes])
+        np.add.at(fluxo, linhas_vencimento, -ultimo_valor[vencimentos])
+        datas_eventos = np.unique(np.concatenate([primeira[aplicacoes], linhas_vencimento]))
+
+        mtm = np.where(validos, valores, 0.0).sum(axis=1)
+        mtm_anterior = np.concatenate([[estado["mtm"]], mtm[:-1]])
+        n_anteriores = len(self.tabela)
+        qde_eventos = np.empty(len(datas_eventos) + 1)
+        qde_eventos[0] = qde = estado["qde_cotas"]
+        for i, x in enumerate(datas_eventos, start=1):
+            cota_anterior = mtm_anterior[x] / qde if n_anteriores + x > 1 else 1.0
+            qde = qde + fluxo[x] / cota_anterior
+            qde_eventos[i] = qde
+        qde_cotas = qde_eventos[np.searchsorted(datas_eventos, np.arange(n_datas), side="right")]
+        cotas = mtm / qde_cotas
+        rentabilidade = cotas / np.concatenate([[estado["cota"]], cotas[:-1]]) - 1
+        acumulado = np.cumprod(np.concatenate([[estado["acumulado"]], 1 + rentabilidade]))[1:]
+
+        novas = pd.DataFrame(
+            valores, index=pd.Index(novas_datas, name=self.tabela.index.name), columns=colunas
+        )
+        novas["MTM"] = novas.sum(axis=1)
+        novas["Qde Cotas"] = qde_cotas
+        novas["Cotas"] = cotas
+        novas["Rentabilidade Diária"] = rentabilidade
+        novas["Rentabilidade Acumulada"] = acumulado - 1
+
+        self.tabela = pd.concat([self.tabela.reindex(columns=novas.columns), novas])
+        self.titulos = titulos
+        self.estado = {
+            "fatores": fatores,
+            "pus": pus,
+            "iniciados": iniciados | possui_valor,
+            "encerrados": encerrados | vencem_antes | vencem_depois,
+            "mtm": mtm[-1],
+            "qde_cotas": qde_cotas[-1],
+            "cota": cotas[-1],
+            "acumulado": acumulado[-1],
+        }
+        return novas
+
+    def _recalcula(self, titulos: List[dict], precos: PrecosTesouro) -> pd.DataFrame:
+        n_anteriores = len(self.tabela)
+        recalculado = ResultadoCarteira.calcula(titulos, precos=precos)
+        self.titulos, self.tabela, self.estado = recalculado.titulos, recalculado.tabela, recalculado.estado
+        return self.tabela.iloc[n_anteriores:]
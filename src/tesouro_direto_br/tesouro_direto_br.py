@@ -6,36 +6,56 @@ Created on Wed Feb  8 09:50:30 2023
 @author: Rafael
 """
 
+# anotações não avaliadas: requests só é importado quando há download (ver _requests)
+from __future__ import annotations
+
 import pandas as pd
-import requests
 import io
+import os
 import numpy as np
-from typing import Dict, List, Optional, Union
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import IO, TYPE_CHECKING, Dict, List, Optional, Tuple, Union
+from pandas.api.types import union_categoricals
 from datetime import datetime, timedelta
+from functools import lru_cache
 
 import warnings
 
-warnings.filterwarnings("ignore")
+if TYPE_CHECKING:
+    import requests
+
+from . import cache, calendario, instrumentacao
+from .precos import PrecosTesouro
+
 
-import matplotlib.pyplot as plt
-import pyettj.ettj as ettj
+_NOMECLATURA_TITULOS = {
+    "Tesouro IPCA+ com Juros Semestrais": "NTN-B",
+    "Tesouro IGPM+ com Juros Semestrais": "NTN-C",
+    "Tesouro Prefixado": "LTN",
+    "Tesouro Prefixado com Juros Semestrais": "NTN-F",
+    "Tesouro Selic": "LTF",
+    "Tesouro IPCA+": "NTN-B PRINCIPAL",
+    "Tesouro RendA+": "RENDA+",
+    "Tesouro Educa+": "EDUCA+",
+}
+_TIPOS_TITULO = tuple(_NOMECLATURA_TITULOS)
+CAMPOS_CARTEIRA = ("Tipo", "Vencimento", "Data Investimento", "Investimento")
 
 
+@instrumentacao.medida()
 def nomeclatura_titulos() -> Dict[str, str]:
-    nomeclatura_dict = {
-        "Tesouro IPCA+ com Juros Semestrais": "NTN-B",
-        "Tesouro IGPM+ com Juros Semestrais": "NTN-C",
-        "Tesouro Prefixado": "LTN",
-        "Tesouro Prefixado com Juros Semestrais": "NTN-F",
-        "Tesouro Selic": "LTF",
-        "Tesouro IPCA+": "NTN-B PRINCIPAL",
-        "Tesouro RendA+": "RENDA+",
-        "Tesouro Educa+": "EDUCA+",
-    }
-    return nomeclatura_dict
+    return dict(_NOMECLATURA_TITULOS)
 
 
 class Titulo:
+    __slots__ = (
+        "tipo_titulo",
+        "data_vencimento",
+        "data_investimento",
+        "investimento",
+        "nomeclatura",
+    )
+
     def __init__(
         self,
         tipo_titulo=None,
@@ -48,10 +68,13 @@ class Titulo:
         self.data_vencimento = data_vencimento
         self.investimento = investimento
         if self.tipo_titulo:
-            self.nomeclatura = nomeclatura_titulos()[self.tipo_titulo].upper()
+            self.nomeclatura = _NOMECLATURA_TITULOS[self.tipo_titulo].upper()
         else:
             self.nomeclatura = None
-        self.titulo = {
+
+    @property
+    def titulo(self) -> dict:
+        return {
             "Tipo": self.tipo_titulo,
             "Nomeclatura": self.nomeclatura,
             "Vencimento": self.data_vencimento,
@@ -60,17 +83,505 @@ class Titulo:
         }
 
 
+def _datas_carteira(valores) -> np.ndarray:
+    valores = np.asarray(valores)
+    if valores.dtype.kind == "M":
+        return valores.astype("datetime64[D]")
+    try:  # aaaa-mm-dd, date e datetime: conversão direta do numpy
+        return valores.astype(object).astype("datetime64[D]")
+    except (ValueError, TypeError):
+        pass
+    # demais formatos: cada data distinta é interpretada uma vez e, com barras, como dd/mm/aaaa
+    codigos, unicos = pd.factorize(valores)
+    unicos = pd.Series(unicos, dtype=object)
+    barras = unicos.map(lambda v: isinstance(v, str) and "/" in v).to_numpy(dtype=bool)
+    convertidos = np.empty(len(unicos) + 1, dtype="datetime64[D]")
+    convertidos[:-1][barras] = pd.to_datetime(unicos[barras], dayfirst=True).to_numpy()
+    # datas distintas convertidas uma a uma: formatos misturados, sem depender de format="mixed" (pandas >= 2)
+    convertidos[:-1][~barras] = [pd.Timestamp(v).to_datetime64() for v in unicos[~barras]]
+    convertidos[-1] = np.datetime64("NaT")  # posição -1: valores ausentes
+    return convertidos[codigos]
+
+
+def _data_carteira(valor) -> np.datetime64:
+    if isinstance(valor, str):
+        if "/" in valor:  # dd/mm/aaaa, como em _datas_carteira
+            return pd.to_datetime(valor, dayfirst=True).to_datetime64().astype("datetime64[D]")
+        if valor[4:5] == "-":  # aaaa-mm-dd: conversão direta do numpy
+            return np.datetime64(valor, "D")
+    return pd.Timestamp(valor).to_datetime64().astype("datetime64[D]")
+
+
+def _colunas_carteira(
+    tipos, vencimentos, datas, investimentos
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    posicoes = {tipo: i for i, tipo in enumerate(_TIPOS_TITULO)}
+    codigos = np.array([posicoes.get(tipo, -1) for tipo in tipos], dtype=np.int64)
+    if (codigos < 0).any():
+        invalidos = sorted({str(t) for t, c in zip(tipos, codigos) if c < 0})
+        raise ValueError(f"Tipo de título não encontrado: {', '.join(invalidos)}")
+    vencimentos, datas = _datas_carteira(vencimentos), _datas_carteira(datas)
+    investimentos = np.asarray(investimentos, dtype=float)
+    if np.isnat(vencimentos).any() or np.isnat(datas).any() or np.isnan(investimentos).any():
+        raise ValueError("Título sem vencimento, data ou valor do investimento.")
+    return codigos.astype(np.int8), vencimentos, datas, investimentos
+
+
 class Carteira(Titulo):
-    def __init__(self, Titulo):
-        self.titulo = Titulo.titulo
-        self.titulos = []
+    """
+    Carteira de títulos públicos. As posições ficam em arrays (tipo, vencimento, data e valor do investimento)
+    ordenados pela data de investimento, e Carteira.titulos apresenta as posições como tupla de dicionários (somente leitura).
+        Parâmetros:
+                titulo (Titulo) => opcional. título de referência da carteira (não é incluído nas posições).
+    """
+
+    __slots__ = ("_tipos", "_vencimentos", "_datas", "_investimentos", "_pendentes")
+
+    def __init__(self, titulo: Optional[Titulo] = None):
+        if titulo is None:
+            super().__init__()
+        else:
+            super().__init__(
+                titulo.tipo_titulo,
+                titulo.data_vencimento,
+                titulo.data_investimento,
+                titulo.investimento,
+            )
+        self._define_colunas(
+            np.empty(0, dtype=np.int8),
+            np.empty(0, dtype="datetime64[D]"),
+            np.empty(0, dtype="datetime64[D]"),
+            np.empty(0),
+        )
+
+    def _define_colunas(
+        self,
+        tipos: np.ndarray,
+        vencimentos: np.ndarray,
+        datas: np.ndarray,
+        investimentos: np.ndarray,
+    ) -> None:
+        ordem = np.argsort(datas, kind="stable")  # títulos com a mesma data mantêm a ordem de inclusão
+        self._tipos = tipos[ordem]
+        self._vencimentos = vencimentos[ordem]
+        self._datas = datas[ordem]
+        self._investimentos = investimentos[ordem]
+        self._pendentes: List[tuple] = []
+
+    def _consolida(self) -> None:
+        # inclusões acumuladas por add(), já validadas, entram nos arrays de uma só vez, na próxima leitura
+        if self._pendentes:
+            tipos, vencimentos, datas, investimentos = zip(*self._pendentes)
+            novos = (
+                np.array(tipos, dtype=np.int8),
+                np.array(vencimentos, dtype="datetime64[D]"),
+                np.array(datas, dtype="datetime64[D]"),
+                np.array(investimentos),
+            )
+            atuais = (self._tipos, self._vencimentos, self._datas, self._investimentos)
+            self._define_colunas(*(np.concatenate([a, n]) for a, n in zip(atuais, novos)))
+
+    def add(self, outro_titulo: Titulo) -> None:
+        if outro_titulo.tipo_titulo is None:
+            raise ValueError("Título sem tipo não pode ser incluído na carteira.")
+        try:
+            codigo = _TIPOS_TITULO.index(outro_titulo.tipo_titulo)
+        except ValueError:
+            raise ValueError(f"Tipo de título não encontrado: {outro_titulo.tipo_titulo}")
+        # título validado na inclusão: um título inválido não chega às posições pendentes
+        campos = (outro_titulo.data_vencimento, outro_titulo.data_investimento, outro_titulo.investimento)
+        if any(v is None or v != v for v in campos):  # None, NaN e NaT
+            raise ValueError("Título sem vencimento, data ou valor do investimento.")
+        vencimento = _data_carteira(outro_titulo.data_vencimento)
+        data = _data_carteira(outro_titulo.data_investimento)
+        investimento = float(outro_titulo.investimento)
+        self._pendentes.append((codigo, vencimento, data, investimento))
+
+    @property
+    def titulos(self) -> Tuple[dict, ...]:
+        """
+        Posições ordenadas pela data de investimento, com datas no formato aaaa-mm-dd. A tupla é montada a cada
+        leitura a partir das colunas da carteira: para incluir posições use add() ou atribua uma nova lista.
+        """
+        self._consolida()
+        tipos = [_TIPOS_TITULO[c] for c in self._tipos.tolist()]
+        return tuple(
+            {
+                "Tipo": tipo,
+                "Nomeclatura": _NOMECLATURA_TITULOS[tipo].upper(),
+                "Vencimento": vencimento,
+                "Data Investimento": data,
+                "Investimento": investimento,
+            }
+            for tipo, vencimento, data, investimento in zip(
+                tipos,
+                np.datetime_as_string(self._vencimentos, unit="D").tolist(),
+                np.datetime_as_string(self._datas, unit="D").tolist(),
+                self._investimentos.tolist(),
+            )
+        )
+
+    @titulos.setter
+    def titulos(self, titulos: List[dict]) -> None:
+        self._define_colunas(
+            *_colunas_carteira(*([tpf[campo] for tpf in titulos] for campo in CAMPOS_CARTEIRA))
+        )
+
+    @classmethod
+    @instrumentacao.medida("carteira_de_dataframe")
+    def de_dataframe(
+        cls, operacoes: pd.DataFrame, colunas: Optional[Dict[str, str]] = None
+    ) -> "Carteira":
+        """
+        Monta a carteira de uma só vez a partir de uma tabela de operações (uma linha por aplicação).
+            Parâmetros:
+                    operacoes (dataframe) => colunas "Tipo", "Vencimento", "Data Investimento" e "Investimento";
+                    colunas (dict) => opcional. nome da coluna da tabela para cada campo, exemplo: {"Tipo": "Tipo Titulo", "Investimento": "Valor"}.
+                Retorno:
+                    carteira (Carteira): posições ordenadas pela data de investimento.
+        """
+        nomes = {campo: (colunas or {}).get(campo, campo) for campo in CAMPOS_CARTEIRA}
+        ausentes = [nome for nome in nomes.values() if nome not in operacoes.columns]
+        if ausentes:
+            raise ValueError(f"Colunas não encontradas: {', '.join(ausentes)}")
+        carteira = cls()
+        carteira._define_colunas(
+            *_colunas_carteira(*(operacoes[nomes[campo]].to_numpy() for campo in CAMPOS_CARTEIRA))
+        )
+        return carteira
+
+    @classmethod
+    @instrumentacao.medida("carteira_de_csv")
+    def de_csv(
+        cls,
+        arquivo,
+        colunas: Optional[Dict[str, str]] = None,
+        sep: str = ";",
+        decimal: str = ",",
+        **kwargs,
+    ) -> "Carteira":
+        """
+        Monta a carteira a partir de um arquivo CSV de operações (ver de_dataframe).
+            Parâmetros:
+                    arquivo (str) => caminho ou arquivo aberto;
+                    colunas (dict) => opcional. nome da coluna do arquivo para cada campo;
+                    sep, decimal (str) => opcional. separadores de campo e decimal, como nos arquivos do Tesouro Transparente;
+                    kwargs => opcional. demais parâmetros de pandas.read_csv.
+        """
+        return cls.de_dataframe(pd.read_csv(arquivo, sep=sep, decimal=decimal, **kwargs), colunas)
+
+
+URLS_TESOURO = {
+    "venda": "https://www.tesourotransparente.gov.br/ckan/dataset/f0468ecc-ae97-4287-89c2-6d8139fb4343/resource/e5f90e3a-8f8d-4895-9c56-4bb2f7877920/download/VendasTesouroDireto.csv",
+    "taxa": "https://www.tesourotransparente.gov.br/ckan/dataset/df56aa42-484a-4a59-8184-7676580c81e3/resource/796d2059-14e9-44e3-80c9-2d9e30b405c1/download/PrecoTaxaTesouroDireto.csv",
+    "resgate": "https://www.tesourotransparente.gov.br/ckan/dataset/f30db6e4-6123-416c-b094-be8dfc823601/resource/30c2b3f5-6edd-499a-8514-062bfda0f61a/download/RecomprasTesouroDireto.csv",
+}
+
+
+def _url_tesouro(tipo: str) -> str:
+    try:
+        return URLS_TESOURO[tipo.lower()]
+    except KeyError:
+        raise ValueError("Tipo não encontrado")
+
+
+def _requests():
+    # importado na primeira requisição: o cálculo com bases já carregadas não precisa do requests
+    import requests
+
+    return requests
+
+
+def _requisita_tesouro(
+    url: str,
+    proxies: Optional[Dict[str, str]] = None,
+    cabecalhos: Optional[Dict[str, str]] = None,
+    sessao: Optional[requests.Session] = None,
+    timeout: Optional[float] = None,
+    stream: bool = False,
+) -> requests.Response:
+    cliente = sessao or _requests()
+    instrumentacao.conta("requisicoes")
+    with instrumentacao.etapa("requisicao"):
+        if proxies:
+            from urllib3.exceptions import InsecureRequestWarning
+
+            with warnings.catch_warnings():  # verify=False é intencional com proxy corporativo
+                warnings.simplefilter("ignore", InsecureRequestWarning)
+                resposta = cliente.get(
+                    url,
+                    proxies=proxies,
+                    verify=False,
+                    headers=cabecalhos,
+                    timeout=timeout,
+                    stream=stream,
+                )
+        else:
+            resposta = cliente.get(url, headers=cabecalhos, timeout=timeout, stream=stream)
+    resposta.raise_for_status()
+    return resposta
+
+
+def _sessao_tesouro(
+    tentativas: int = 3, backoff: float = 0.5, conexoes: int = 3
+) -> requests.Session:
+    """Sessão com conexões reaproveitadas e novas tentativas (com espera exponencial) em falhas transitórias."""
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    retry = Retry(
+        total=tentativas,
+        backoff_factor=backoff,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=("GET",),
+        raise_on_status=False,
+    )
+    adaptador = HTTPAdapter(
+        pool_connections=conexoes, pool_maxsize=conexoes, max_retries=retry
+    )
+    sessao = _requests().Session()
+    sessao.mount("http://", adaptador)
+    sessao.mount("https://", adaptador)
+    return sessao
+
+
+def _le_csv_tesouro(
+    data: Union[str, IO[str]], colunas: Optional[List[str]] = None
+) -> pd.DataFrame:
+    data_str = io.StringIO(data) if isinstance(data, str) else data
+    with instrumentacao.etapa("leitura_csv"):
+        if colunas is None:
+            df = pd.read_csv(data_str, sep=";", decimal=",")
+        else:  # trecho sem cabeçalho (download parcial)
+            df = pd.read_csv(data_str, sep=";", decimal=",", header=None, names=colunas)
+        instrumentacao.conta("linhas_lidas", len(df))
+        return _converte_colunas_datas(df)
+
+
+def _converte_datas(coluna: pd.Series) -> pd.Series:
+    """
+    Converte textos dd/mm/aaaa em datas interpretando cada texto distinto uma única vez.
+    As colunas de data do Tesouro têm poucos valores distintos (dezenas de vencimentos, milhares de datas)
+    repetidos em milhões de linhas.
+    """
+    codigos, unicos = pd.factorize(coluna)
+    datas = pd.to_datetime(unicos, format="%d/%m/%Y").to_numpy()
+    datas = np.append(datas, np.datetime64("NaT"))  # posição -1: valores ausentes
+    valores = datas[codigos]
+    return pd.Series(valores, index=coluna.index, name=coluna.name)
+
+
+def _converte_colunas_datas(df: pd.DataFrame) -> pd.DataFrame:
+    coluna_datas = [
+        x for x in df.columns if x.startswith("Data") or x.startswith("Vencimento")
+    ]
+    if coluna_datas:
+        with instrumentacao.etapa("conversao_datas"):
+            for col in coluna_datas:
+                df[col] = _converte_datas(df[col])
+    return df
+
+
+class _CorpoResposta(io.RawIOBase):
+    """
+    Entrega o corpo da resposta ao leitor de CSV à medida que chega pela conexão,
+    contando os bytes recebidos e guardando o final do arquivo (para a atualização incremental).
+    """
+
+    def __init__(self, resposta: requests.Response):
+        self._bruto = resposta.raw
+        self._bruto.decode_content = True
+        self.tamanho = 0
+        self.final = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        dados = self._bruto.read(len(buffer))
+        n = len(dados)
+        buffer[:n] = dados
+        self.tamanho += n
+        if n:
+            self.final = (self.final + dados)[-4096:]
+        return n
 
-    def add(self, outro_titulo):
-        self.titulos.append(outro_titulo.titulo)
 
+def _le_resposta_tesouro(resposta: requests.Response) -> Tuple[pd.DataFrame, int, bytes]:
+    """
+    Processa o CSV diretamente do fluxo da resposta, sem montar o texto completo em memória.
+        Retorno:
+            (df, tamanho, cauda): tabela, total de bytes recebidos e última linha do arquivo.
+    """
+    corpo = _CorpoResposta(resposta)
+    texto = io.TextIOWrapper(
+        io.BufferedReader(corpo, buffer_size=1 << 16),
+        encoding=resposta.encoding or "utf-8",
+        newline="",
+    )
+    try:
+        df = _le_csv_tesouro(texto)
+    finally:
+        resposta.close()
+        instrumentacao.conta("bytes_baixados", corpo.tamanho)
+    return df, corpo.tamanho, _ultima_linha(corpo.final)
+
+
+def _ultima_linha(conteudo: bytes) -> bytes:
+    return conteudo[conteudo.rstrip(b"\r\n").rfind(b"\n") + 1 :]
+
+
+def _metadados_resposta(
+    url: str, resposta: requests.Response, tamanho: int, cauda: bytes
+) -> Dict[str, Union[str, int, None]]:
+    return {
+        "url": url,
+        "etag": resposta.headers.get("ETag"),
+        "last_modified": resposta.headers.get("Last-Modified"),
+        "encoding": resposta.encoding,
+        "tamanho": tamanho,
+        "cauda": cauda.decode("latin-1"),
+    }
+
+
+def _registros_novos(armazenado: pd.DataFrame, novo: pd.DataFrame) -> pd.DataFrame:
+    """
+    Linhas de `novo` posteriores à última data já armazenada para o mesmo título e vencimento
+    (as duas primeiras colunas identificam o título e a terceira é a data do registro).
+    """
+    chave, coluna_data = novo.columns[:2].tolist(), novo.columns[2]
+    ultima_data = armazenado.groupby(chave)[coluna_data].max().rename("_ultima_data")
+    novo = novo.join(ultima_data, on=chave)
+    filtro = novo["_ultima_data"].isnull() | (novo[coluna_data] > novo["_ultima_data"])
+    return novo.loc[filtro, armazenado.columns]
+
+
+def _conteudo_resposta(resposta: requests.Response) -> bytes:
+    with instrumentacao.etapa("download"):
+        conteudo = resposta.content
+    instrumentacao.conta("bytes_baixados", len(conteudo))
+    return conteudo
+
+
+def _atualiza_incremental(
+    tipo: str,
+    url: str,
+    proxies: Optional[Dict[str, str]],
+    metadados: dict,
+    armazenado: pd.DataFrame,
+    sessao: Optional[requests.Session] = None,
+    timeout: Optional[float] = None,
+) -> Optional[pd.DataFrame]:
+    """
+    Acrescenta ao cache apenas os registros publicados desde o último download.
+    Pede ao servidor somente os bytes a partir da última linha conhecida (HTTP Range); se o servidor
+    não aceitar o intervalo ou o início do arquivo tiver mudado, baixa o arquivo inteiro e compara as datas.
+    Retorna None quando o cache não tem as informações necessárias para a atualização parcial.
+    """
+    cauda = metadados.get("cauda", "").encode("latin-1")
+    if not cauda or not metadados.get("tamanho"):
+        return None
+    inicio = metadados["tamanho"] - len(cauda)
+    cabecalhos = {"Range": f"bytes={inicio}-"}
+    if metadados.get("etag"):
+        cabecalhos["If-None-Match"] = metadados["etag"]
+    try:
+        resposta = _requisita_tesouro(url, proxies, cabecalhos, sessao, timeout)
+    except _requests().HTTPError:  # 416: arquivo menor que o armazenado
+        resposta = _requisita_tesouro(url, proxies, sessao=sessao, timeout=timeout)
+
+    if resposta.status_code == 304:
+        instrumentacao.conta("cache_acertos")
+        cache.grava_metadados_cache(tipo, metadados)
+        return armazenado
+
+    instrumentacao.conta("cache_falhas")
+    encoding = metadados.get("encoding") or resposta.encoding or "utf-8"
+    conteudo = _conteudo_resposta(resposta)
+    if resposta.status_code == 206 and conteudo.startswith(cauda):
+        tamanho = int(resposta.headers["Content-Range"].split("/")[-1])
+        trecho = conteudo[len(cauda) :].decode(encoding)
+        if trecho.strip():
+            novo = _le_csv_tesouro(trecho, colunas=armazenado.columns.tolist())
+        else:
+            novo = armazenado.iloc[:0]
+        nova_cauda = _ultima_linha(conteudo)
+    else:
+        if resposta.status_code == 206:
+            resposta = _requisita_tesouro(url, proxies, sessao=sessao, timeout=timeout)
+            conteudo = _conteudo_resposta(resposta)
+        tamanho = len(conteudo)
+        novo = _le_csv_tesouro(conteudo.decode(resposta.encoding or encoding))
+        nova_cauda = _ultima_linha(conteudo)
+
+    novo = _registros_novos(armazenado, novo)
+    df = pd.concat([armazenado, novo], ignore_index=True)
+    metadados_novos = _metadados_resposta(url, resposta, tamanho, nova_cauda)
+    metadados_novos["encoding"] = encoding
+    cache.grava_cache(tipo, df, metadados_novos)
+    return df
+
+
+def _busca_com_cache(
+    tipo: str,
+    url: str,
+    proxies: Optional[Dict[str, str]],
+    validade: timedelta,
+    incremental: bool = False,
+    sessao: Optional[requests.Session] = None,
+    timeout: Optional[float] = None,
+) -> pd.DataFrame:
+    metadados = cache.le_metadados_cache(tipo)
+    if cache.cache_valido(metadados, url, validade.total_seconds()):
+        df = cache.le_cache(tipo)
+        if df is not None:
+            instrumentacao.conta("cache_acertos")
+            return df
+
+    if incremental and metadados and metadados.get("url") == url:
+        armazenado = cache.le_cache(tipo)
+        if armazenado is not None:
+            df = _atualiza_incremental(
+                tipo, url, proxies, metadados, armazenado, sessao, timeout
+            )
+            if df is not None:
+                return df
+
+    cabecalhos = {}
+    if metadados and metadados.get("url") == url:
+        if metadados.get("etag"):
+            cabecalhos["If-None-Match"] = metadados["etag"]
+        if metadados.get("last_modified"):
+            cabecalhos["If-Modified-Since"] = metadados["last_modified"]
+    resposta = _requisita_tesouro(url, proxies, cabecalhos, sessao, timeout, stream=True)
+
+    if resposta.status_code == 304:
+        resposta.close()
+        df = cache.le_cache(tipo)
+        if df is not None:
+            instrumentacao.conta("cache_acertos")
+            cache.grava_metadados_cache(tipo, metadados)
+            return df
+        resposta = _requisita_tesouro(
+            url, proxies, sessao=sessao, timeout=timeout, stream=True
+        )
+
+    instrumentacao.conta("cache_falhas")
+    df, tamanho, cauda = _le_resposta_tesouro(resposta)
+    cache.grava_cache(tipo, df, _metadados_resposta(url, resposta, tamanho, cauda))
+    return df
 
+
+@instrumentacao.medida()
 def busca_tesouro_direto(
-    tipo: str = "venda", proxies: Optional[Dict[str, str]] = None, agrupar: bool = True
+    tipo: str = "venda",
+    proxies: Optional[Dict[str, str]] = None,
+    agrupar: bool = True,
+    cache: bool = True,
+    validade_cache: timedelta = timedelta(hours=12),
+    incremental: bool = False,
+    sessao: Optional[requests.Session] = None,
+    timeout: Optional[float] = None,
 ):
     """
     Função que retorna os dados diários do Tesouro Transparente.
@@ -78,38 +589,257 @@ def busca_tesouro_direto(
                 tipo (str) => informar "venda" ou "resgate" ou "taxa";
                 proxies (dict) => opcional. se necessário, informar dicionário com as proxies, exemplo: {"http":f'https://{LOGIN}:{SENHA}@{PROXY_EMPRESA}:{PORTA}'}
                 agrupar (bool) => opcional. para agrupar o dataframe por titulo e vencimento.
+                cache (bool) => opcional. mantém cópia local dos dados já processados, revalidada com o servidor (ETag/Last-Modified).
+                validade_cache (timedelta) => opcional. tempo em que o cache é usado sem consultar o servidor.
+                incremental (bool) => opcional. com cache, baixa e processa apenas os registros publicados desde a última atualização.
+                sessao (requests.Session) => opcional. sessão HTTP a ser reaproveitada.
+                timeout (float) => opcional. tempo máximo de espera do servidor, em segundos.
             Retorno:
                 df (dataframe): tabela contendo as informações dos TPFs por data.
     """
-    if tipo.lower() == "venda":
-        url = "https://www.tesourotransparente.gov.br/ckan/dataset/f0468ecc-ae97-4287-89c2-6d8139fb4343/resource/e5f90e3a-8f8d-4895-9c56-4bb2f7877920/download/VendasTesouroDireto.csv"
-    elif tipo.lower() == "taxa":
-        url = "https://www.tesourotransparente.gov.br/ckan/dataset/df56aa42-484a-4a59-8184-7676580c81e3/resource/796d2059-14e9-44e3-80c9-2d9e30b405c1/download/PrecoTaxaTesouroDireto.csv"
-    elif tipo.lower() == "resgate":
-        url = "https://www.tesourotransparente.gov.br/ckan/dataset/f30db6e4-6123-416c-b094-be8dfc823601/resource/30c2b3f5-6edd-499a-8514-062bfda0f61a/download/RecomprasTesouroDireto.csv"
-    else:
-        raise ValueError("Tipo não encontrado")
-    if proxies:
-        data = requests.get(url, proxies=proxies, verify=False).text
+    url = _url_tesouro(tipo)
+    if cache:
+        df = _busca_com_cache(
+            tipo.lower(),
+            url,
+            proxies,
+            validade_cache,
+            incremental=incremental,
+            sessao=sessao,
+            timeout=timeout,
+        )
     else:
-        data = requests.get(url).text
+        resposta = _requisita_tesouro(
+            url, proxies, sessao=sessao, timeout=timeout, stream=True
+        )
+        df = _le_resposta_tesouro(resposta)[0]
 
-    data_str = io.StringIO(data)
-    df = pd.read_csv(data_str, sep=";", decimal=",")
+    if agrupar:  # titulo e seu vencimento
+        with instrumentacao.etapa("agrupamento"):
+            multi_indice = pd.MultiIndex.from_frame(df.iloc[:, :2])
+            df = df.set_index(multi_indice).iloc[:, 2:]
+    return df
 
-    coluna_datas = [
-        x for x in df.columns if x.startswith("Data") or x.startswith("Vencimento")
-    ]
-    if coluna_datas:
-        for col in coluna_datas:
-            df[col] = pd.to_datetime(df[col], format="%d/%m/%Y")
+
+@instrumentacao.medida()
+def busca_tesouro_direto_todos(
+    proxies: Optional[Dict[str, str]] = None,
+    agrupar: bool = True,
+    tipos: Tuple[str, ...] = ("venda", "taxa", "resgate"),
+    timeout: Optional[float] = 60,
+    tentativas: int = 3,
+    backoff: float = 0.5,
+    **kwargs,
+) -> Dict[str, pd.DataFrame]:
+    """
+    Função que obtém os conjuntos de dados do Tesouro Transparente simultaneamente, por uma sessão HTTP compartilhada.
+        Parâmetros:
+                proxies (dict) => opcional. se necessário, informar dicionário com as proxies, exemplo: {"http":f'https://{LOGIN}:{SENHA}@{PROXY_EMPRESA}:{PORTA}'}
+                agrupar (bool) => opcional. para agrupar os dataframes por titulo e vencimento.
+                tipos (tuple) => opcional. conjuntos de dados a obter, dentre "venda", "taxa" e "resgate".
+                timeout (float) => opcional. tempo máximo de espera do servidor, em segundos.
+                tentativas (int) => opcional. número de novas tentativas em falhas de conexão ou erros 429/5xx.
+                backoff (float) => opcional. fator da espera exponencial entre tentativas, em segundos.
+                kwargs => opcional. demais parâmetros de busca_tesouro_direto (cache, validade_cache, incremental).
+            Retorno:
+                dados (dict): tabela de cada tipo, no formato de busca_tesouro_direto.
+    """
+    for tipo in tipos:
+        _url_tesouro(tipo)
+    with _sessao_tesouro(tentativas, backoff, conexoes=len(tipos)) as sessao:
+        with ThreadPoolExecutor(max_workers=len(tipos)) as executor:
+            futuros = {
+                tipo: executor.submit(
+                    busca_tesouro_direto,
+                    tipo,
+                    proxies=proxies,
+                    agrupar=agrupar,
+                    sessao=sessao,
+                    timeout=timeout,
+                    **kwargs,
+                )
+                for tipo in tipos
+            }
+            return {tipo: futuro.result() for tipo, futuro in futuros.items()}
+
+
+def _compactacao(coluna: str, valores: np.ndarray) -> Tuple[bool, bool]:
+    """
+    Se os valores cabem em int32 (somente quantidades inteiras) e em float32 sem perda: os valores do Tesouro têm duas
+    casas decimais, que o float32 preserva se o valor arredondado de volta for o original.
+    """
+    valores = valores.astype(np.float64, copy=False)
+    nulos = np.isnan(valores)
+    inteiro = (
+        coluna == "Quantidade"
+        and not nulos.any()
+        and bool(np.all(valores == np.floor(valores)))
+        and np.abs(valores).max(initial=0) < 2**31
+    )
+    arredondados = np.round(valores.astype(np.float32).astype(np.float64), 2)
+    return inteiro, bool(np.all((arredondados == valores) | nulos))
+
+
+def _tipo_compacto(inteiro: bool, simples: bool) -> type:
+    return np.int32 if inteiro else np.float32 if simples else np.float64
+
+
+def _converte_compacto(valores: np.ndarray, tipo: type) -> np.ndarray:
+    if tipo is np.float64 and valores.dtype == np.float32:  # volta às duas casas decimais originais
+        return np.round(valores.astype(np.float64), 2)
+    return valores.astype(tipo, copy=False)
+
+
+def _compacta_bloco(
+    bloco: pd.DataFrame, esquema: Dict[str, Tuple[bool, bool]], anteriores: List[pd.DataFrame]
+) -> pd.DataFrame:
+    """
+    Reduz os tipos numéricos do bloco com um único tipo por coluna para todos os blocos: quantidades inteiras viram
+    int32 e colunas cujos valores (com duas casas decimais) são preservados em float32 viram float32; as demais
+    permanecem em float64. Se um bloco não cabe no tipo escolhido até então, a coluna dos blocos anteriores é
+    convertida sem perda para o tipo mais largo.
+    """
+    for col in bloco.columns:
+        valores = bloco[col].to_numpy()
+        if valores.dtype.kind not in "iuf":
+            continue
+        inteiro, simples = _compactacao(col, valores)
+        atual = esquema.get(col, (True, True))
+        novo = (atual[0] and inteiro, atual[1] and simples)
+        esquema[col] = novo
+        tipo = _tipo_compacto(*novo)
+        if anteriores and tipo is not _tipo_compacto(*atual):
+            for anterior in anteriores:
+                anterior[col] = _converte_compacto(anterior[col].to_numpy(), tipo)
+        bloco[col] = _converte_compacto(valores, tipo)
+    return bloco
+
+
+def _le_csv_em_blocos(
+    texto: IO[str],
+    tipos_titulo: Optional[List[str]],
+    inicio: Optional[pd.Timestamp],
+    fim: Optional[pd.Timestamp],
+    compacto: bool,
+    linhas_por_bloco: int,
+) -> pd.DataFrame:
+    leitor = pd.read_csv(texto, sep=";", decimal=",", chunksize=linhas_por_bloco)
+    blocos = []
+    esquema: Dict[str, Tuple[bool, bool]] = {}
+    for bloco in leitor:
+        instrumentacao.conta("linhas_lidas", len(bloco))
+        if tipos_titulo:
+            bloco = bloco[bloco["Tipo Titulo"].isin(tipos_titulo)]
+        bloco = _converte_colunas_datas(bloco.copy())
+        coluna_data = bloco.columns[2]
+        if inicio is not None:
+            bloco = bloco[bloco[coluna_data] >= inicio]
+        if fim is not None:
+            bloco = bloco[bloco[coluna_data] <= fim]
+        if compacto:
+            bloco = _compacta_bloco(bloco, esquema, blocos)
+            bloco["Tipo Titulo"] = bloco["Tipo Titulo"].astype("category")
+        blocos.append(bloco)
+
+    if compacto:
+        tipos = union_categoricals([b["Tipo Titulo"] for b in blocos])
+        df = pd.concat(
+            [b.drop(columns="Tipo Titulo") for b in blocos], ignore_index=True
+        )
+        df.insert(0, "Tipo Titulo", tipos)
+        return df
+    return pd.concat(blocos, ignore_index=True)
+
+
+@instrumentacao.medida()
+def busca_tesouro_direto_em_blocos(
+    tipo: str = "venda",
+    proxies: Optional[Dict[str, str]] = None,
+    tipos_titulo: Optional[List[str]] = None,
+    inicio: Optional[Union[str, datetime]] = None,
+    fim: Optional[Union[str, datetime]] = None,
+    compacto: bool = True,
+    agrupar: bool = False,
+    linhas_por_bloco: int = 100_000,
+    sessao: Optional[requests.Session] = None,
+    timeout: Optional[float] = None,
+) -> pd.DataFrame:
+    """
+    Função que obtém os dados do Tesouro Transparente processando o CSV em blocos, à medida que chega pela conexão.
+    Os filtros são aplicados a cada bloco, então apenas as linhas selecionadas ficam em memória. Não usa o cache local.
+        Parâmetros:
+                tipo (str) => informar "venda" ou "resgate" ou "taxa";
+                proxies (dict) => opcional. se necessário, informar dicionário com as proxies, exemplo: {"http":f'https://{LOGIN}:{SENHA}@{PROXY_EMPRESA}:{PORTA}'}
+                tipos_titulo (list) => opcional. tipos de TPF a manter, exemplo: ["Tesouro Selic", "Tesouro IPCA+"];
+                inicio, fim (str) => opcional. intervalo (inclusive) da data do registro (Data Base, Data Venda ou Data Resgate);
+                compacto (bool) => opcional. Tipo Titulo como categoria, quantidades inteiras em int32 e valores em float32 quando não há perda nas duas casas decimais;
+                agrupar (bool) => opcional. para agrupar o dataframe por titulo e vencimento;
+                linhas_por_bloco (int) => opcional. número de linhas processadas por vez;
+                sessao (requests.Session) => opcional. sessão HTTP a ser reaproveitada;
+                timeout (float) => opcional. tempo máximo de espera do servidor, em segundos.
+            Retorno:
+                df (dataframe): tabela contendo as informações dos TPFs por data.
+    """
+    url = _url_tesouro(tipo)
+    resposta = _requisita_tesouro(
+        url, proxies, sessao=sessao, timeout=timeout, stream=True
+    )
+    corpo = _CorpoResposta(resposta)
+    texto = io.TextIOWrapper(
+        io.BufferedReader(corpo, buffer_size=1 << 16),
+        encoding=resposta.encoding or "utf-8",
+        newline="",
+    )
+    try:
+        with instrumentacao.etapa("leitura_csv"):
+            df = _le_csv_em_blocos(
+                texto,
+                tipos_titulo,
+                pd.to_datetime(inicio) if inicio is not None else None,
+                pd.to_datetime(fim) if fim is not None else None,
+                compacto,
+                linhas_por_bloco,
+            )
+    finally:
+        resposta.close()
+        instrumentacao.conta("bytes_baixados", corpo.tamanho)
 
     if agrupar:  # titulo e seu vencimento
-        multi_indice = pd.MultiIndex.from_frame(df.iloc[:, :2])
-        df = df.set_index(multi_indice).iloc[:, 2:]
+        with instrumentacao.etapa("agrupamento"):
+            multi_indice = pd.MultiIndex.from_frame(df.iloc[:, :2])
+            df = df.set_index(multi_indice).iloc[:, 2:]
     return df
 
 
+@instrumentacao.medida()
+def busca_novos_registros(
+    desde: Union[str, datetime],
+    tipo: str = "taxa",
+    proxies: Optional[Dict[str, str]] = None,
+    validade_cache: timedelta = timedelta(hours=12),
+) -> pd.DataFrame:
+    """
+    Função que atualiza o cache de forma incremental e retorna apenas os registros posteriores a uma data.
+        Parâmetros:
+                desde (str) => data a partir da qual (exclusive) os registros são retornados, exemplo: data da última execução;
+                tipo (str) => informar "venda" ou "resgate" ou "taxa";
+                proxies (dict) => opcional. se necessário, informar dicionário com as proxies, exemplo: {"http":f'https://{LOGIN}:{SENHA}@{PROXY_EMPRESA}:{PORTA}'}
+                validade_cache (timedelta) => opcional. tempo em que o cache é usado sem consultar o servidor.
+            Retorno:
+                df (dataframe): registros com data (Data Base, Data Venda ou Data Resgate) posterior a `desde`.
+    """
+    df = busca_tesouro_direto(
+        tipo,
+        proxies=proxies,
+        agrupar=False,
+        validade_cache=validade_cache,
+        incremental=True,
+    )
+    coluna_data = df.columns[2]
+    return df[df[coluna_data] > pd.to_datetime(desde)].reset_index(drop=True)
+
+
+@instrumentacao.medida()
 def calcula_taxa_b3(serie_mtm: pd.DataFrame) -> pd.DataFrame:
     """
     Taxa cobrada pela custódia da B3 de 0,2% no ano, cobrado 0,1% em Janeiro e Julho, ou de forma proporcional
@@ -125,14 +855,9 @@ def calcula_taxa_b3(serie_mtm: pd.DataFrame) -> pd.DataFrame:
         (datas_b3.index.month == 1) | (datas_b3.index.month == 7)
     ]  # meses de pagamento à B3
 
-    ano, mes, dia = str(serie_mtm.index[0])[:-9].split("-")
-    inicio_primeiro_semestre = "/".join([dia, mes, ano])
-    ano, mes, dia = str(datas_b3.index[0])[:-9].split("-")
-    fim_primeiro_semestre = "/".join([dia, mes, ano])
-    if datas_b3.index[0] < serie_mtm.index[0]:
+    inicio_primeiro_semestre = serie_mtm.index[0]
+    if not datas_b3.empty and datas_b3.index[0] < serie_mtm.index[0]:
         datas_b3.drop(datas_b3.index[0], inplace=True)
-        ano, mes, dia = str(datas_b3.index[0])[:-9].split("-")
-        fim_primeiro_semestre = "/".join([dia, mes, ano])
 
     if serie_mtm.columns.str.contains("LTF"):
         # incide sobre o excedente de 10000
@@ -151,34 +876,26 @@ def calcula_taxa_b3(serie_mtm: pd.DataFrame) -> pd.DataFrame:
         ]  # era 0,25% e a partir de jan/22 é de 0,2%aa ou 0,1%semestre
 
         # custos proporcionais após completar semestre
-        ano, mes, dia = str(custos_b3.index[-1])[:-9].split("-")
-        inicio = "/".join([dia, mes, ano])
-        ano, mes, dia = str(hoje).split("-")
-        fim = "/".join([dia, mes, ano])
-        datas = ettj.listar_dias_uteis(inicio, fim)
+        dias = calendario.conta_dias_uteis(custos_b3.index[-1], hoje)
         custos_b3["custo"] = (
             custos_b3["custo"]
-            + ((len(datas) * (0.1 / 100)) / 126) * custos_b3["MTM"].values[-1]
+            + ((dias * (0.1 / 100)) / 126) * custos_b3["MTM"].values[-1]
         )
 
         # custos proporcionais no inicio do semestre
-        datas = ettj.listar_dias_uteis(inicio_primeiro_semestre, fim_primeiro_semestre)
+        dias = calendario.conta_dias_uteis(inicio_primeiro_semestre, custos_b3.index[0])
         custos_b3["custo"] = (
             custos_b3["custo"]
-            + ((len(datas) * (0.1 / 100)) / 126) * custos_b3["MTM"].values[0]
+            + ((dias * (0.1 / 100)) / 126) * custos_b3["MTM"].values[0]
         )
     else:
         # custos proporcionais antes de completar o semestre (resgate em menos de 6 meses)
-        ano, mes, dia = str(serie_mtm.index[0])[:-9].split("-")
-        inicio = "/".join([dia, mes, ano])
-        ano, mes, dia = str(serie_mtm.index[-1])[:-9].split("-")
-        fim = "/".join([dia, mes, ano])
-        datas = ettj.listar_dias_uteis(inicio, fim)
+        dias = calendario.conta_dias_uteis(serie_mtm.index[0], serie_mtm.index[-1])
         custos_b3 = pd.DataFrame(
             np.array(
                 [
                     serie_mtm.iloc[-1].values[0],
-                    serie_mtm.iloc[-1].values[0] * (len(datas) * 0.1 / 100) / 126,
+                    serie_mtm.iloc[-1].values[0] * (dias * 0.1 / 100) / 126,
                 ]
             ),
             index=["MTM", "custo"],
@@ -187,6 +904,7 @@ def calcula_taxa_b3(serie_mtm: pd.DataFrame) -> pd.DataFrame:
     return custos_b3
 
 
+@instrumentacao.medida()
 def get_custos(
     serie_mtm: pd.DataFrame,
     custo_b3: bool = False,
@@ -203,8 +921,7 @@ def get_custos(
     datas = serie_mtm.index.tolist()
     T = len(datas)
     if T < 30:
-        iof = pd.read_excel("tabela_iof_investimentos.xlsx", index_col=0)
-        iof = iof.loc[T, :].values[0]
+        iof = aliquota_iof(T)
         print(f"IOF de {int(iof*100)}%")
     else:
         iof = 0
@@ -239,33 +956,177 @@ def get_custos(
     print(f"MTM Liquido {mtm_atual+retorno_liquido}")
     return custos, detalhamento_custos
 
-def _get_vencimentos(df: pd.DataFrame(), col: str) -> Union[datetime, None]:
-    try:
-        return df[df[col].isnull()][col].index[0]
-    except: pass
-
-def _get_valid_date(
-    date: Union[str, datetime], carteira_tesouro_direto: pd.DataFrame()
-) -> datetime:
-    if isinstance(date, str):
-        date = pd.to_datetime(date)
-    count = 0
-    df = carteira_tesouro_direto[
-        carteira_tesouro_direto.index.isin([date + timedelta(days=count)])
-    ]
-    while df.empty:
-        count += 1
-        df = carteira_tesouro_direto[
-            carteira_tesouro_direto.index.isin([date.date() + timedelta(days=count)])
-        ]
-    return date + timedelta(days=count)
+@lru_cache(maxsize=1)
+def _tabela_iof() -> np.ndarray:
+    # alíquota por número de dias de aplicação; posição 0 sem alíquota definida e zero a partir de 30 dias
+    tabela = pd.read_csv(
+        os.path.join(os.path.dirname(__file__), "tabela_iof_investimentos.csv"),
+        sep=";",
+        index_col=0,
+        encoding="utf-8",
+    ).iloc[:, 0]
+    aliquotas = np.full(tabela.index.max() + 1, np.nan)
+    aliquotas[tabela.index.to_numpy()] = tabela.to_numpy()
+    aliquotas.flags.writeable = False
+    return aliquotas
+
+
+@instrumentacao.medida()
+def aliquota_iof(dias: Union[int, np.ndarray]) -> Union[float, np.ndarray]:
+    """
+    Alíquota regressiva de IOF sobre o rendimento, zerada a partir de 30 dias de aplicação.
+        Parâmetros:
+                dias (int ou array) => número de dias de aplicação.
+            Retorno:
+                aliquota (float ou array): fração do rendimento, exemplo: 0.96 para 1 dia.
+    """
+    tabela = _tabela_iof()
+    dias = np.asarray(dias)
+    if (dias < 0).any():
+        raise ValueError("Número de dias de aplicação deve ser positivo")
+    aliquotas = tabela[np.minimum(dias, len(tabela) - 1)]
+    return float(aliquotas) if aliquotas.ndim == 0 else aliquotas
+
 
+def _custos_b3_lote(
+    datas: pd.DatetimeIndex, valores: np.ndarray, ltf: np.ndarray, hoje
+) -> np.ndarray:
+    # mesma regra de calcula_taxa_b3, para todas as colunas de valores (datas x posições) de uma vez
+    validos = ~np.isnan(valores)
+    colunas = np.arange(valores.shape[1])
+    primeira = validos.argmax(axis=0)
+    ultima = len(datas) - 1 - validos[::-1].argmax(axis=0)
+    valores = np.where(ltf, np.maximum(valores - 10_000, 0), valores)
 
+    inicio_mes = datas.to_period("M").to_timestamp()
+    novo_mes = np.ones(len(datas), dtype=bool)
+    novo_mes[1:] = inicio_mes[1:] != inicio_mes[:-1]
+    # primeira cotação válida de cada mês para cada posição, como groupby(Grouper(freq="MS")).first()
+    acumulado = np.cumsum(validos, axis=0)
+    antes_do_mes = np.maximum.accumulate(
+        np.where(novo_mes[:, None], acumulado - validos, 0), axis=0
+    )
+    primeira_do_mes = validos & (acumulado - antes_do_mes == 1)
+    semestre = primeira_do_mes & np.isin(inicio_mes.month, [1, 7])[:, None]
+    semestre &= inicio_mes.values[:, None] >= datas.values[primeira][None, :]
+
+    aliquota = np.where(inicio_mes < pd.Timestamp("2022-01-01"), 0.25 / 2 / 100, 0.2 / 2 / 100)
+    custos_semestrais = np.where(semestre, valores * aliquota[:, None], 0).sum(axis=0)
+    n_semestres = semestre.sum(axis=0)
+    tem_semestre = n_semestres > 0
+    primeiro_semestre = semestre.argmax(axis=0)
+    ultimo_semestre = len(datas) - 1 - semestre[::-1].argmax(axis=0)
+
+    dias_fim = calendario.conta_dias_uteis(inicio_mes[ultimo_semestre], hoje)
+    dias_inicio = calendario.conta_dias_uteis(datas[primeira], inicio_mes[primeiro_semestre])
+    proporcionais = ((dias_fim * (0.1 / 100)) / 126) * valores[ultimo_semestre, colunas] + (
+        (dias_inicio * (0.1 / 100)) / 126
+    ) * valores[primeiro_semestre, colunas]
+    dias_investidos = calendario.conta_dias_uteis(datas[primeira], datas[ultima])
+    return np.where(
+        tem_semestre,
+        custos_semestrais + n_semestres * proporcionais,
+        valores[ultima, colunas] * (dias_investidos * 0.1 / 100) / 126,
+    )
+
+
+COLUNAS_CUSTOS = [
+    "Investimento",
+    "MTM",
+    "Dias",
+    "Rendimento",
+    "Alíquota IRPF",
+    "Alíquota IOF",
+    "IRPF",
+    "IOF",
+    "Taxa Custódia B3",
+    "Custos",
+    "Retorno Líquido",
+]
+
+
+@instrumentacao.medida()
+def calcula_custos_lote(
+    serie_mtm: Union[pd.DataFrame, pd.Series],
+    custo_b3: bool = False,
+    hoje: Union[str, datetime, None] = None,
+) -> pd.DataFrame:
+    """
+    Calcula os custos (IRPF, IOF e custódia B3) de várias posições de uma só vez, com as mesmas regras
+    de get_custos e calcula_taxa_b3, sem imprimir resultados.
+        Parâmetros:
+                serie_mtm (dataframe) => MTM das posições: tabela larga (datas x posições, vazia fora do período
+                de cada posição) ou formato longo indexado por (posição, data) com uma coluna de valores;
+                custo_b3 (bool) => opcional. inclui a taxa de custódia da B3 (False para mercado secundário);
+                hoje (str) => opcional. data de referência dos custos proporcionais da B3 (padrão: data atual).
+            Retorno:
+                custos (dataframe): uma linha por posição com as colunas de COLUNAS_CUSTOS.
+    """
+    if isinstance(serie_mtm.index, pd.MultiIndex):
+        if isinstance(serie_mtm, pd.DataFrame):
+            serie_mtm = serie_mtm["MTM"] if "MTM" in serie_mtm.columns else serie_mtm.iloc[:, 0]
+        serie_mtm = serie_mtm.unstack(level=0)
+    serie_mtm = serie_mtm.sort_index()
+    datas = pd.DatetimeIndex(serie_mtm.index)
+    valores = serie_mtm.to_numpy(dtype=float)
+    validos = ~np.isnan(valores)
+    colunas = np.arange(valores.shape[1])
+    primeira = validos.argmax(axis=0)
+    ultima = len(datas) - 1 - validos[::-1].argmax(axis=0)
+
+    investimento = valores[primeira, colunas]
+    mtm_atual = valores[ultima, colunas]
+    dias = validos.sum(axis=0)
+    rendimento = mtm_atual - investimento
+    irpf = np.select([dias > 720, dias > 360, dias > 180], [0.15, 0.175, 0.2], 0.225)
+    iof = aliquota_iof(dias)
+    if custo_b3:
+        hoje = pd.Timestamp(hoje).date() if hoje is not None else datetime.today().date()
+        ltf = np.asarray(serie_mtm.columns.astype(str).str.contains("LTF"))
+        taxa_custodia = _custos_b3_lote(datas, valores, ltf, hoje)
+    else:
+        taxa_custodia = np.zeros(len(colunas))
+
+    custos = (rendimento * irpf) + taxa_custodia + (iof * rendimento)
+    return pd.DataFrame(
+        {
+            "Investimento": investimento,
+            "MTM": mtm_atual,
+            "Dias": dias,
+            "Rendimento": rendimento,
+            "Alíquota IRPF": irpf,
+            "Alíquota IOF": iof,
+            "IRPF": rendimento * irpf,
+            "IOF": iof * rendimento,
+            "Taxa Custódia B3": taxa_custodia,
+            "Custos": custos,
+            "Retorno Líquido": rendimento - custos,
+        },
+        index=serie_mtm.columns,
+    )
+
+
+FREQUENCIAS_MOVIMENTACAO = ("diaria", "semanal", "mensal")
+
+
+def _periodos(datas: np.ndarray, frequencia: str) -> np.ndarray:
+    # rótulos como no resample do pandas: domingo que encerra a semana ("W") ou último dia do mês ("ME")
+    dias = datas.astype("datetime64[D]")
+    if frequencia == "semanal":
+        dia_semana = (dias.astype(np.int64) + 3) % 7  # 1970-01-01 foi quinta-feira; segunda = 0
+        dias = dias + (6 - dia_semana)
+    elif frequencia == "mensal":
+        dias = (dias.astype("datetime64[M]") + 1).astype("datetime64[D]") - 1
+    return dias.astype(datas.dtype)
+
+
+@instrumentacao.medida()
 def movimentacoes_titulos_publicos(
     tipo_movimentacao: str,
     proxies: Optional[Dict[str, str]] = None,
     excluir: List[str] = ["Juros Semestrais", "Educa+", "RendA+"],
     filtrar_data: Union[str, None] = None,
+    frequencia: str = "diaria",
 ) -> pd.DataFrame:
     """
     Função para obter as movimentações de resgate (recompra) ou venda de TPF.
@@ -274,64 +1135,87 @@ def movimentacoes_titulos_publicos(
             excluir (list) => opcional. tipos de títulos a serem desconsiderados;
             proxies (dict) => opcional. se necessário, informar dicionário com as proxies, exemplo: {"http":f'https://{LOGIN}:{SENHA}@{PROXY_EMPRESA}:{PORTA}'}
             filtrar_data (str) => opcional. recomendado filtrar pela data de investimento para excluir TPFs que você não possua em carteira.
+            frequencia (str) => opcional. "diaria", "semanal" (semanas encerradas no domingo) ou "mensal" (datas no último dia do mês).
         Retorno:
             movimentacao_pivot (dataframe): tabela contendo a quantidade de TPFs movimentados por data.
     """
     if tipo_movimentacao != "resgate" and tipo_movimentacao != "venda":
         raise ValueError("Tipo de Movimentação não encontrada.")
+    if frequencia not in FREQUENCIAS_MOVIMENTACAO:
+        raise ValueError("Frequência não encontrada.")
     # quando vc resgata antes do vencimento, Tesouro recompra o título
-    taxa_agrupada = busca_tesouro_direto(
-        tipo=tipo_movimentacao, proxies=proxies, agrupar=True
+    movimentacao = busca_tesouro_direto(
+        tipo=tipo_movimentacao, proxies=proxies, agrupar=False
     )
-    movimentacao = (
-        taxa_agrupada.reset_index()
-        .groupby(
-            [
-                "Tipo Titulo",
-                "Vencimento do Titulo",
-                f"Data {tipo_movimentacao.title()}",
-            ],
-            as_index=False,
-        )[["Quantidade"]]
-        .sum()
+    return _agrega_movimentacoes(
+        movimentacao, tipo_movimentacao, excluir, filtrar_data, frequencia
     )
+
+
+@instrumentacao.medida("agregacao_movimentacoes")
+def _agrega_movimentacoes(
+    movimentacao: pd.DataFrame,
+    tipo_movimentacao: str,
+    excluir: Optional[List[str]],
+    filtrar_data: Union[str, None],
+    frequencia: str = "diaria",
+) -> pd.DataFrame:
+    coluna_data = f"Data {tipo_movimentacao.title()}"
+    codigos_tipo, tipos = pd.factorize(movimentacao["Tipo Titulo"])
+    vencimentos = movimentacao["Vencimento do Titulo"].to_numpy()
+    datas = movimentacao[coluna_data].to_numpy()
+
+    manter = np.ones(len(movimentacao), dtype=bool)
+    if excluir:
+        # um único padrão para todos os tipos excluídos, avaliado uma vez por tipo distinto
+        padrao = "|".join(f"(?:{remover})" for remover in excluir)
+        excluidos = np.asarray(pd.Index(tipos).str.contains(padrao), dtype=bool)
+        manter &= ~excluidos[codigos_tipo]
     if filtrar_data:
-        dt_investimento = pd.to_datetime(filtrar_data)
-        movimentacao = movimentacao[
-            (movimentacao["Vencimento do Titulo"] > dt_investimento)
-            & (movimentacao[f"Data {tipo_movimentacao.title()}"] > dt_investimento)
-        ]
-    movimentacao = movimentacao.set_index(
-        ["Tipo Titulo", "Vencimento do Titulo"]
-    ).reset_index()
-    movimentacao["Vencimento do Titulo"] = movimentacao["Vencimento do Titulo"].astype(
-        str
+        dt_investimento = np.datetime64(pd.to_datetime(filtrar_data))
+        manter &= (vencimentos > dt_investimento) & (datas > dt_investimento)
+
+    codigos_tipo, vencimentos = codigos_tipo[manter], vencimentos[manter]
+    datas = _periodos(datas[manter], frequencia)
+    # título = (tipo, vencimento) e data agrupados por códigos inteiros
+    chave_titulo = codigos_tipo.astype(np.int64) << 32 | (
+        vencimentos.astype("datetime64[D]").astype(np.int64) & 0xFFFFFFFF
     )
-    if excluir:
-        df1 = pd.DataFrame()
-        for remover in excluir:
-            df = movimentacao[movimentacao["Tipo Titulo"].str.contains(f"{remover}")]
-            df1 = pd.concat([df1, df])
-        movimentacao = movimentacao.drop(df1.index)
-    movimentacao["Titulo"] = (
-        movimentacao["Tipo Titulo"] + "_" + movimentacao["Vencimento do Titulo"]
+    codigos_titulo, titulos_unicos = pd.factorize(chave_titulo)
+    codigos_data, datas_unicas = pd.factorize(datas)
+    n_titulos = len(titulos_unicos)
+    quantidades = movimentacao["Quantidade"].to_numpy(dtype=float)[manter]
+    somas = (
+        pd.Series(quantidades)
+        .groupby(codigos_data.astype(np.int64) * n_titulos + codigos_titulo, sort=False)
+        .sum()
     )
-    movimentacao = movimentacao.drop(["Tipo Titulo", "Vencimento do Titulo"], axis=1)
-    movimentacao_pivot = pd.pivot_table(
-        movimentacao.reset_index(),
-        values="Quantidade",
-        index=f"Data {tipo_movimentacao.title()}",
-        columns="Titulo",
+    tabela = np.full(len(datas_unicas) * n_titulos, np.nan)
+    tabela[somas.index.to_numpy()] = somas.to_numpy()
+    tabela = tabela.reshape(len(datas_unicas), n_titulos)
+
+    primeira_linha = np.unique(codigos_titulo, return_index=True)[1]
+    nomes = [
+        f"{tipos[t]}_{pd.Timestamp(v).strftime('%Y-%m-%d')}"
+        for t, v in zip(codigos_tipo[primeira_linha], vencimentos[primeira_linha])
+    ]
+    ordem_colunas = np.argsort(nomes, kind="stable")
+    ordem_linhas = np.argsort(datas_unicas, kind="stable")
+    return pd.DataFrame(
+        tabela[np.ix_(ordem_linhas, ordem_colunas)],
+        index=pd.Index(datas_unicas[ordem_linhas], name=coluna_data),
+        columns=pd.Index([nomes[i] for i in ordem_colunas], name="Titulo"),
     )
-    return movimentacao_pivot
 
 
+@instrumentacao.medida()
 def calcula_retorno_titulo(
     tipo_titulo: str,
     vencimento: str,
     data_investimento: str,
     investimento: str,
     proxies: Optional[Dict[str, str]] = None,
+    precos: Optional[PrecosTesouro] = None,
 ) -> pd.DataFrame:
     """
     Função que calcula os retornos diários de um título público.
@@ -341,115 +1225,234 @@ def calcula_retorno_titulo(
                 data_investimento (str) => data de aquisição do TPF;
                 investimento (str) => valor investido;
                 proxies (dict) => opcional. se necessário, informar dicionário com as proxies, exemplo: {"http":f'https://{LOGIN}:{SENHA}@{PROXY_EMPRESA}:{PORTA}'}
+                precos (PrecosTesouro) => opcional. base de preços já carregada, evita nova busca dos dados.
             Retorno:
                 serie_retorno (dataframe): retorno acumulado desde a data de investimento.
     """
-    taxa_agrupada = busca_tesouro_direto(tipo="taxa", proxies=proxies, agrupar=True)
-    titulo = taxa_agrupada.loc[(tipo_titulo, vencimento)]
-    serie_pu = titulo.sort_values("Data Base").set_index("Data Base")[["PU Base Manha"]]
-    nom = nomeclatura_titulos()
+    if precos is None:
+        precos = PrecosTesouro.busca(proxies=proxies)
+    serie_pu = _serie_pu(precos, tipo_titulo, vencimento)
+    return _retorno_titulo(
+        serie_pu, tipo_titulo, vencimento, data_investimento, investimento
+    )
+
+
+def _serie_pu(
+    precos: PrecosTesouro, tipo_titulo: str, vencimento: str
+) -> pd.DataFrame:
+    return precos.serie(tipo_titulo, vencimento, ["PU Base Manha"])
+
+
+def _nome_titulo(tipo_titulo: str, vencimento: str, data_investimento: str) -> str:
     venc = vencimento.split("-")[0]
-    serie_pu.columns = [nom[tipo_titulo].upper() + "_" + venc + "_" + data_investimento]
-    serie_pu_filtrado = serie_pu[serie_pu.index >= pd.to_datetime(data_investimento)]
+    return _NOMECLATURA_TITULOS[tipo_titulo].upper() + "_" + venc + "_" + data_investimento
+
+
+def _fator_titulo(
+    serie_pu: pd.DataFrame,
+    tipo_titulo: str,
+    vencimento: str,
+    data_investimento: str,
+    investimento: float,
+) -> pd.DataFrame:
+    serie_pu = serie_pu.set_axis(
+        [_nome_titulo(tipo_titulo, vencimento, data_investimento)], axis=1
+    )
+    # índice ordenado por data base: o início do investimento é localizado por busca binária
+    inicio = serie_pu.index.searchsorted(pd.to_datetime(data_investimento), side="left")
+    serie_pu_filtrado = serie_pu.iloc[inicio:]
     rentabilidade_diaria = serie_pu_filtrado.pct_change()
-    serie_retorno = (1 + rentabilidade_diaria.fillna(investimento)).cumprod() - 1
-    return serie_retorno
+    return (1 + rentabilidade_diaria.fillna(investimento)).cumprod()
+
 
+def _retorno_titulo(
+    serie_pu: pd.DataFrame,
+    tipo_titulo: str,
+    vencimento: str,
+    data_investimento: str,
+    investimento: float,
+) -> pd.DataFrame:
+    fator = _fator_titulo(serie_pu, tipo_titulo, vencimento, data_investimento, investimento)
+    return fator - 1
 
+
+def _cotiza_carteira(valores: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Cotização da carteira a partir da tabela de valores (datas x títulos, NaN fora do período de cada título).
+    A quantidade de cotas só muda nas datas de eventos, calculadas de uma vez para todos os títulos:
+    aplicação (primeira data com valor do título) e vencimento (data seguinte ao último valor do título).
+    Nessas datas entram (ou saem) cotas pelo valor da cota do dia anterior; nas demais, a quantidade se mantém.
+        Retorno:
+            (qde_cotas, cotas): arrays com a quantidade e o valor da cota em cada data.
+    """
+    n_datas = valores.shape[0]
+    validos = ~np.isnan(valores)
+    mtm = np.where(validos, valores, 0.0).sum(axis=1)
+
+    possui_valor = validos.any(axis=0)
+    primeira = validos.argmax(axis=0)
+    ultima = n_datas - 1 - validos[::-1].argmax(axis=0)
+    aplicacoes = np.flatnonzero(possui_valor & (primeira > 0))
+    vencimentos = np.flatnonzero(possui_valor & (ultima < n_datas - 1))
+
+    fluxo = np.zeros(n_datas)
+    np.add.at(fluxo, primeira[aplicacoes], valores[primeira[aplicacoes], aplicacoes])
+    np.add.at(fluxo, ultima[vencimentos] + 1, -valores[ultima[vencimentos], vencimentos])
+    datas_eventos = np.unique(
+        np.concatenate([primeira[aplicacoes], ultima[vencimentos] + 1])
+    )
+
+    qde_eventos = np.empty(len(datas_eventos) + 1)
+    qde_eventos[0] = qde = mtm[0]
+    for i, x in enumerate(datas_eventos, start=1):
+        cota_anterior = mtm[x - 1] / qde if x > 1 else 1.0
+        qde = qde + fluxo[x] / cota_anterior
+        qde_eventos[i] = qde
+    qde_cotas = qde_eventos[np.searchsorted(datas_eventos, np.arange(n_datas), side="right")]
+
+    cotas = mtm / qde_cotas
+    cotas[0] = 1.0
+    return qde_cotas, cotas
+
+
+@instrumentacao.medida()
 def calcula_retorno_carteira(
-    carteira: Carteira, proxies: Optional[Dict[str, str]] = None
+    carteira: Carteira,
+    proxies: Optional[Dict[str, str]] = None,
+    precos: Optional[PrecosTesouro] = None,
 ) -> pd.DataFrame:
     """
     Função que calcula o retorno de uma carteira de títulos públicos pelo método de cotização de carteiras.
         Parâmetros:
                 carteira (class) => carteira de TPFs (podendo conter 1 ou mais TPFs);
                 proxies (dict) => opcional. se necessário, informar dicionário com as proxies, exemplo: {"http":f'https://{LOGIN}:{SENHA}@{PROXY_EMPRESA}:{PORTA}'}
+                precos (PrecosTesouro) => opcional. base de preços já carregada, evita nova busca dos dados.
             Retorno:
                 carteira_tesouro_direto (dataframe): retorno acumulado desde a data de investimento do primeiro TPF da carteira.
     """
-    carteira.titulos = sorted(carteira.titulos, key=lambda d: d["Data Investimento"])
-    carteira_tesouro_direto = pd.DataFrame()
-    for tpf in carteira.titulos:
-        tipo_titulo = tpf["Tipo"]
-        investimento = tpf["Investimento"]
-        data_investimento = tpf["Data Investimento"]
-        vencimento = tpf["Vencimento"]
-        serie_retorno = calcula_retorno_titulo(
-            tipo_titulo, vencimento, data_investimento, investimento, proxies=proxies
-        )
-        carteira_tesouro_direto = pd.concat(
-            [carteira_tesouro_direto, serie_retorno], axis=1
-        )
-    columns = carteira_tesouro_direto.columns.tolist()
-    vencimentos_validos = [_get_vencimentos(carteira_tesouro_direto, col) for col in columns if _get_vencimentos(carteira_tesouro_direto, col) is not None]
-    carteira_tesouro_direto["MTM"] = carteira_tesouro_direto.sum(axis=1)
-    carteira_tesouro_direto["Qde Cotas"] = carteira_tesouro_direto["MTM"].iloc[0]
-    carteira_tesouro_direto["Cotas"] = 1
-    investimentos = [
-        pd.to_datetime(carteira.titulos[x]["Data Investimento"])
-        for x in range(len(carteira.titulos))
-    ]
-    vencimentos = [
-        pd.to_datetime(carteira.titulos[x]["Vencimento"])
-        for x in range(len(carteira.titulos))
-    ]
+    titulos = carteira.titulos  # já ordenados pela data de investimento
+    if precos is None:
+        precos = PrecosTesouro.busca(proxies=proxies)
+    series_pu = _series_pu_carteiras(precos, [titulos])
+    return _calcula_retorno_titulos(titulos, series_pu)
 
-    investimentos_datas_validas = [
-        _get_valid_date(x, carteira_tesouro_direto) for x in investimentos
-    ]
 
-    for x, idx in enumerate(carteira_tesouro_direto.index[1:], start=1):
-        idx_investimento = [
-            i for i, date in enumerate(investimentos_datas_validas) if idx == date
-        ]
-        idx_vencimento = [
-            i for i, date in enumerate(vencimentos_validos) if idx == date
-        ]
-        if idx_investimento:
-            idx_investimento = idx_investimento[0]
-            dt_investimento = [investimentos_datas_validas[idx_investimento]]
-            ativo = [
-                carteira.titulos[x]["Nomeclatura"]
-                + "_"
-                + carteira.titulos[x]["Vencimento"][:4]
-                + "_"
-                + str(investimentos[idx_investimento])[:-9]
-                for x in range(len(carteira.titulos))
-                if pd.to_datetime(carteira.titulos[x]["Data Investimento"])
-                == investimentos[idx_investimento]
-            ]
-            investimento = carteira_tesouro_direto.loc[dt_investimento, ativo].values[
-                0
-            ][0]
-            carteira_tesouro_direto.loc[dt_investimento, "Qde Cotas"] = (
-                carteira_tesouro_direto.iloc[x - 1]["Qde Cotas"]
-                + investimento / carteira_tesouro_direto.iloc[x - 1]["Cotas"]
+@instrumentacao.medida("series_pu")
+def _series_pu_carteiras(
+    precos: PrecosTesouro, lista_titulos: List[List[dict]]
+) -> Dict[Tuple[str, str], pd.DataFrame]:
+    """Série de PU de cada par (tipo, vencimento) distinto presente nas carteiras, montada uma única vez."""
+    pares = {(tpf["Tipo"], tpf["Vencimento"]) for titulos in lista_titulos for tpf in titulos}
+    return {
+        (tipo_titulo, vencimento): _serie_pu(precos, tipo_titulo, vencimento)
+        for tipo_titulo, vencimento in pares
+    }
+
+
+def _calcula_retorno_titulos(
+    titulos: List[dict], series_pu: Dict[Tuple[str, str], pd.DataFrame]
+) -> pd.DataFrame:
+    titulos = sorted(titulos, key=lambda d: d["Data Investimento"])
+    with instrumentacao.etapa("retornos_titulos"):
+        series_retorno = [
+            _retorno_titulo(
+                series_pu[(tpf["Tipo"], tpf["Vencimento"])],
+                tpf["Tipo"],
+                tpf["Vencimento"],
+                tpf["Data Investimento"],
+                tpf["Investimento"],
             )
-        elif idx_vencimento:
-            idx_vencimento = idx_vencimento[0]
-            dt_vencimento = [vencimentos[idx_vencimento]]
-            ativo = [
-                carteira.titulos[x]["Nomeclatura"]
-                + "_"
-                + carteira.titulos[x]["Vencimento"][:4]
-                + "_"
-                + carteira.titulos[x]["Data Investimento"]
-                for x in range(len(carteira.titulos))
-                if pd.to_datetime(carteira.titulos[x]["Vencimento"])
-                == dt_vencimento[0]
-            ]
-            dt_vencimento_dia_anterior = carteira_tesouro_direto[ativo].dropna().index[-1]
-            desinvestimento = carteira_tesouro_direto.loc[dt_vencimento_dia_anterior, ativo].values[0]
-            carteira_tesouro_direto.loc[vencimentos_validos[idx_vencimento], "Qde Cotas"] = (
-                carteira_tesouro_direto.iloc[x-1]["Qde Cotas"]
-                - desinvestimento / carteira_tesouro_direto.iloc[x-1]["Cotas"]
+            for tpf in titulos
+        ]
+        carteira_tesouro_direto = pd.concat(series_retorno, axis=1)
+    return _cotiza_tabela_carteira(carteira_tesouro_direto)
+
+
+_SERIES_PU_PROCESSO: Dict[Tuple[str, str], pd.DataFrame] = {}
+
+
+def _inicializa_processo(series_pu: Dict[Tuple[str, str], pd.DataFrame]) -> None:
+    global _SERIES_PU_PROCESSO
+    _SERIES_PU_PROCESSO = series_pu
+
+
+def _calcula_retorno_titulos_processo(titulos: List[dict]) -> pd.DataFrame:
+    return _calcula_retorno_titulos(titulos, _SERIES_PU_PROCESSO)
+
+
+@instrumentacao.medida()
+def calcula_retorno_carteiras(
+    carteiras: Union[Dict[str, Carteira], List[Carteira]],
+    proxies: Optional[Dict[str, str]] = None,
+    processos: Optional[int] = None,
+    formato_longo: bool = False,
+    precos: Optional[PrecosTesouro] = None,
+) -> Union[Dict[str, pd.DataFrame], pd.DataFrame]:
+    """
+    Função que calcula o retorno de várias carteiras de títulos públicos de uma só vez.
+    Os dados de preços são obtidos uma única vez e a série de cada título (tipo e vencimento) é montada
+    uma única vez, sendo compartilhada por todas as carteiras que o possuem.
+        Parâmetros:
+                carteiras (dict ou list) => carteiras de TPFs indexadas por identificador (se lista, o identificador é a posição);
+                proxies (dict) => opcional. se necessário, informar dicionário com as proxies, exemplo: {"http":f'https://{LOGIN}:{SENHA}@{PROXY_EMPRESA}:{PORTA}'}
+                processos (int) => opcional. número de processos para distribuir o cálculo entre os núcleos da máquina.
+                formato_longo (bool) => opcional. retorna uma única tabela indexada por carteira e data, apenas com as colunas da carteira.
+                precos (PrecosTesouro) => opcional. base de preços já carregada, evita nova busca dos dados.
+            Retorno:
+                resultados (dict ou dataframe): resultado de calcula_retorno_carteira para cada carteira.
+    """
+    if not isinstance(carteiras, dict):
+        carteiras = dict(enumerate(carteiras))
+    lista_titulos = [carteira.titulos for carteira in carteiras.values()]
+    if precos is None:
+        precos = PrecosTesouro.busca(proxies=proxies)
+    series_pu = _series_pu_carteiras(precos, lista_titulos)
+
+    if processos and processos > 1:
+        with ProcessPoolExecutor(
+            max_workers=processos,
+            initializer=_inicializa_processo,
+            initargs=(series_pu,),
+        ) as executor:
+            calculos = executor.map(
+                _calcula_retorno_titulos_processo,
+                lista_titulos,
+                chunksize=max(1, len(lista_titulos) // (4 * processos)),
             )
-        else:
-            carteira_tesouro_direto.loc[idx, "Qde Cotas"] = carteira_tesouro_direto.iloc[x - 1]["Qde Cotas"]
-        carteira_tesouro_direto.loc[idx, "Cotas"] = (
-            carteira_tesouro_direto.loc[idx, columns].dropna().sum()
-            / carteira_tesouro_direto.loc[idx, "Qde Cotas"]
+            resultados = dict(zip(carteiras.keys(), calculos))
+    else:
+        resultados = {
+            identificador: _calcula_retorno_titulos(titulos, series_pu)
+            for identificador, titulos in zip(carteiras.keys(), lista_titulos)
+        }
+
+    if formato_longo:
+        return pd.concat(
+            {
+                identificador: resultado[COLUNAS_COTIZACAO]
+                for identificador, resultado in resultados.items()
+            },
+            names=["Carteira"],
         )
+    return resultados
+
+
+COLUNAS_COTIZACAO = [
+    "MTM",
+    "Qde Cotas",
+    "Cotas",
+    "Rentabilidade Diária",
+    "Rentabilidade Acumulada",
+]
+
+
+@instrumentacao.medida("cotizacao")
+def _cotiza_tabela_carteira(carteira_tesouro_direto: pd.DataFrame) -> pd.DataFrame:
+    columns = carteira_tesouro_direto.columns.tolist()
+    qde_cotas, cotas = _cotiza_carteira(carteira_tesouro_direto[columns].to_numpy(dtype=float))
+    carteira_tesouro_direto["MTM"] = carteira_tesouro_direto.sum(axis=1)
+    carteira_tesouro_direto["Qde Cotas"] = qde_cotas
+    carteira_tesouro_direto["Cotas"] = cotas
     carteira_tesouro_direto["Rentabilidade Diária"] = carteira_tesouro_direto[
         "Cotas"
     ].pct_change()
@@ -459,11 +1462,13 @@ def calcula_retorno_carteira(
     return carteira_tesouro_direto
 
 
+@instrumentacao.medida()
 def plot_taxas(
     tipo_titulo: str,
     data_investimento: str,
     vencimento: str,
     proxies: Optional[Dict[str, str]] = None,
+    precos: Optional[PrecosTesouro] = None,
 ) -> None:
     """
     Função plota a evolução das taxas do TPF.
@@ -472,15 +1477,18 @@ def plot_taxas(
                 data_investimento (str) => data de aquisição do TPF;
                 vencimento (str) => data de vencimento do TPF;
                 proxies (dict) => opcional. se necessário, informar dicionário com as proxies, exemplo: {"http":f'https://{LOGIN}:{SENHA}@{PROXY_EMPRESA}:{PORTA}'}
+                precos (PrecosTesouro) => opcional. base de preços já carregada, evita nova busca dos dados.
     """
-    taxa_agrupada = busca_tesouro_direto(tipo="taxa", proxies=proxies, agrupar=True)
-    titulo = taxa_agrupada.loc[(tipo_titulo, vencimento)]
-    taxa = titulo.sort_values("Data Base").set_index("Data Base")[
-        ["Taxa Compra Manha", "Taxa Venda Manha"]
-    ]
+    if precos is None:
+        precos = PrecosTesouro.busca(proxies=proxies)
+
+    import matplotlib.pyplot as plt
+
+    from .graficos import TAMANHO_FIGURA, reduz_serie
 
-    plt.figure(figsize=(16, 5))
-    plt.plot(taxa)
+    plt.figure(figsize=TAMANHO_FIGURA)
+    for coluna in ["Taxa Compra Manha", "Taxa Venda Manha"]:
+        plt.plot(*reduz_serie(*precos.arrays(tipo_titulo, vencimento, coluna)))
     plt.legend(["Taxa Compra Manha", "Taxa Venda Manha"], frameon=False)
     plt.axvline(pd.to_datetime(data_investimento), color="red")
     plt.show()
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from src.tesouro_direto_br import tesouro_direto_br as td
+from tests.dados_sinteticos import gera_resgates, gera_taxa, gera_vendas, para_csv
+from tests.servidor_local import ServidorTesouro
+
+ARQUIVOS = {
+    "venda": "VendasTesouroDireto.csv",
+    "taxa": "PrecoTaxaTesouroDireto.csv",
+    "resgate": "RecomprasTesouroDireto.csv",
+}
+
+
+@pytest.fixture
+def diretorio_cache(tmp_path, monkeypatch):
+    diretorio = tmp_path / "cache"
+    monkeypatch.setenv("TESOURO_DIRETO_BR_CACHE", str(diretorio))
+    return diretorio
+
+
+@pytest.fixture
+def servidor(monkeypatch, diretorio_cache):
+    """Servidor local com dados sintéticos no lugar do Tesouro Transparente."""
+    arquivos = {
+        ARQUIVOS["taxa"]: para_csv(gera_taxa(n_dias=300)),
+        ARQUIVOS["venda"]: para_csv(gera_vendas(n_dias=300)),
+        ARQUIVOS["resgate"]: para_csv(gera_resgates(n_dias=300)),
+    }
+    with ServidorTesouro(arquivos) as srv:
+        for tipo, nome in ARQUIVOS.items():
+            monkeypatch.setitem(td.URLS_TESOURO, tipo, srv.url(nome))
+        yield srv
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+"""
+Geração determinística de arquivos CSV com o mesmo formato dos dados do Tesouro Transparente
+(PrecoTaxaTesouroDireto, VendasTesouroDireto e RecomprasTesouroDireto), para testes e benchmarks offline.
+"""
+
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+TITULOS_PADRAO = [
+    ("Tesouro IPCA+", "2026-08-15"),
+    ("Tesouro Selic", "2025-03-01"),
+    ("Tesouro Prefixado", "2024-01-01"),
+    ("Tesouro IPCA+ com Juros Semestrais", "2035-05-15"),
+    ("Tesouro Prefixado com Juros Semestrais", "2031-01-01"),
+    ("Tesouro Selic", "2029-03-01"),
+    ("Tesouro Educa+", "2040-12-15"),
+    ("Tesouro RendA+", "2065-12-15"),
+]
+
+COLUNAS_TAXA = [
+    "Tipo Titulo",
+    "Data Vencimento",
+    "Data Base",
+    "Taxa Compra Manha",
+    "Taxa Venda Manha",
+    "PU Compra Manha",
+    "PU Venda Manha",
+    "PU Base Manha",
+]
+COLUNAS_VENDA = ["Tipo Titulo", "Vencimento do Titulo", "Data Venda", "PU", "Quantidade", "Valor"]
+COLUNAS_RESGATE = ["Tipo Titulo", "Vencimento do Titulo", "Data Resgate", "Quantidade", "Valor"]
+
+
+def datas_pregao(inicio: str = "2020-01-02", n_dias: int = 500) -> pd.DatetimeIndex:
+    return pd.bdate_range(inicio, periods=n_dias)
+
+
+def _titulos(titulos: Optional[List[Tuple[str, str]]], n_titulos: Optional[int]) -> List[Tuple[str, str]]:
+    titulos = list(titulos or TITULOS_PADRAO)
+    if n_titulos is None or n_titulos <= len(titulos):
+        return titulos[: n_titulos or len(titulos)]
+    tipos = sorted({tipo for tipo, _ in titulos})
+    extras = [
+        (tipos[i % len(tipos)], f"{2030 + i // len(tipos)}-0{1 + i % 9}-15")
+        for i in range(n_titulos - len(titulos))
+    ]
+    return titulos + extras
+
+
+def gera_taxa(
+    n_dias: int = 500,
+    titulos: Optional[List[Tuple[str, str]]] = None,
+    n_titulos: Optional[int] = None,
+    inicio: str = "2020-01-02",
+    semente: int = 42,
+) -> pd.DataFrame:
+    """Tabela de preços e taxas diária por título, até a véspera do vencimento de cada um."""
+    rng = np.random.RandomState(semente)
+    datas = datas_pregao(inicio, n_dias)
+    linhas = []
+    for i, (tipo, vencimento) in enumerate(_titulos(titulos, n_titulos)):
+        venc = pd.to_datetime(vencimento)
+        datas_titulo = datas[datas < venc]
+        n = len(datas_titulo)
+        if not n:
+            continue
+        taxa = np.round(4 + 0.5 * i + np.cumsum(rng.normal(0, 0.03, n)), 2)
+        anos = (venc - datas_titulo).days.values / 365.25
+        pu = np.round(1000 * (1 + 0.01 * np.arange(n) / 252) / (1 + taxa / 100) ** anos, 2)
+        linhas.append(
+            pd.DataFrame(
+                {
+                    "Tipo Titulo": tipo,
+                    "Data Vencimento": venc,
+                    "Data Base": datas_titulo,
+                    "Taxa Compra Manha": taxa,
+                    "Taxa Venda Manha": np.round(taxa + 0.12, 2),
+                    "PU Compra Manha": pu,
+                    "PU Venda Manha": np.round(pu * 0.998, 2),
+                    "PU Base Manha": np.round(pu * 0.998, 2),
+                }
+            )
+        )
+    return pd.concat(linhas, ignore_index=True)[COLUNAS_TAXA]
+
+
+def _movimentacoes(
+    coluna_data: str,
+    n_dias: int,
+    titulos: Optional[List[Tuple[str, str]]],
+    n_titulos: Optional[int],
+    inicio: str,
+    operacoes_por_dia: int,
+    semente: int,
+) -> pd.DataFrame:
+    rng = np.random.RandomState(semente)
+    datas = datas_pregao(inicio, n_dias)
+    titulos = _titulos(titulos, n_titulos)
+    n = n_dias * operacoes_por_dia
+    idx_titulo = rng.randint(0, len(titulos), n)
+    idx_data = np.repeat(np.arange(n_dias), operacoes_por_dia)
+    quantidade = np.round(rng.exponential(2.0, n) + 0.01, 2)
+    pu = np.round(rng.uniform(500, 4000, n), 2)
+    df = pd.DataFrame(
+        {
+            "Tipo Titulo": [titulos[i][0] for i in idx_titulo],
+            "Vencimento do Titulo": pd.to_datetime([titulos[i][1] for i in idx_titulo]),
+            coluna_data: datas[idx_data],
+            "PU": pu,
+            "Quantidade": quantidade,
+            "Valor": np.round(pu * quantidade, 2),
+        }
+    )
+    return df[df[coluna_data] < df["Vencimento do Titulo"]].reset_index(drop=True)
+
+
+def gera_vendas(
+    n_dias: int = 500,
+    titulos: Optional[List[Tuple[str, str]]] = None,
+    n_titulos: Optional[int] = None,
+    inicio: str = "2020-01-02",
+    operacoes_por_dia: int = 20,
+    semente: int = 7,
+) -> pd.DataFrame:
+    df = _movimentacoes("Data Venda", n_dias, titulos, n_titulos, inicio, operacoes_por_dia, semente)
+    return df[COLUNAS_VENDA]
+
+
+def gera_resgates(
+    n_dias: int = 500,
+    titulos: Optional[List[Tuple[str, str]]] = None,
+    n_titulos: Optional[int] = None,
+    inicio: str = "2020-01-02",
+    operacoes_por_dia: int = 10,
+    semente: int = 11,
+) -> pd.DataFrame:
+    df = _movimentacoes("Data Resgate", n_dias, titulos, n_titulos, inicio, operacoes_por_dia, semente)
+    return df[COLUNAS_RESGATE]
+
+
+def para_csv(df: pd.DataFrame, cabecalho: bool = True) -> bytes:
+    """Serializa no formato do Tesouro Transparente: separador ';', decimal ',' e datas dd/mm/aaaa."""
+    return df.to_csv(
+        sep=";", decimal=",", date_format="%d/%m/%Y", index=False, header=cabecalho
+    ).encode("utf-8")
+
+
+def gera_series_carteira(n_titulos: int = 5, n_dias: int = 500, semente: int = 3):
+    """
+    Carteira sintética e a tabela de valores por título no formato montado por calcula_retorno_carteira.
+    O primeiro título é aplicado no primeiro dia e vence dentro do período; os demais são aplicados
+    em datas distintas antes desse vencimento e vencem após o período.
+        Retorno:
+            (titulos, tabela): lista de dicionários no formato de Carteira.titulos e dataframe datas x títulos.
+    """
+    rng = np.random.RandomState(semente)
+    datas = datas_pregao(n_dias=n_dias)
+    tipos = [
+        ("Tesouro IPCA+", "NTN-B PRINCIPAL"),
+        ("Tesouro Selic", "LTF"),
+        ("Tesouro Prefixado", "LTN"),
+        ("Tesouro IPCA+ com Juros Semestrais", "NTN-B"),
+    ]
+    fim_primeiro = int(n_dias * 0.7)
+    dias_aplicacao = np.sort(rng.choice(np.arange(1, fim_primeiro), n_titulos - 1, replace=False))
+    dias_aplicacao = np.concatenate([[0], dias_aplicacao])
+    titulos, colunas = [], []
+    for i, dia in enumerate(dias_aplicacao):
+        tipo, nomeclatura = tipos[i % len(tipos)]
+        if i == 0:
+            fim = fim_primeiro
+            vencimento = datas[fim].strftime("%Y-%m-%d")
+        else:
+            fim = n_dias
+            vencimento = f"{datas[-1].year + 1 + i % 20}-{1 + i % 12:02d}-15"
+        data_investimento = datas[dia].strftime("%Y-%m-%d")
+        investimento = float(np.round(rng.uniform(50, 5000), 2))
+        pu = 1000 * np.cumprod(1 + rng.normal(0.0003, 0.002, fim - dia))
+        serie = pd.Series(pu, index=datas[dia:fim])
+        retorno = (1 + serie.pct_change().fillna(investimento)).cumprod() - 1
+        nome = nomeclatura + "_" + vencimento.split("-")[0] + "_" + data_investimento
+        colunas.append(retorno.rename(nome))
+        titulos.append(
+            {
+                "Tipo": tipo,
+                "Nomeclatura": nomeclatura,
+                "Vencimento": vencimento,
+                "Data Investimento": data_investimento,
+                "Investimento": investimento,
+            }
+        )
+    return titulos, pd.concat(colunas, axis=1)
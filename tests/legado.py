@@ -0,0 +1,300 @@
+# -*- coding: utf-8 -*-
+"""
+Implementações anteriores às otimizações, mantidas como referência para os testes de equivalência
+e para os benchmarks. Não devem ser usadas fora dos testes.
+"""
+
+from datetime import timedelta
+from typing import List
+
+import pandas as pd
+
+from src.tesouro_direto_br.tesouro_direto_br import nomeclatura_titulos
+
+
+class TituloLegado:
+    """Titulo antes de __slots__: atributos em dicionário e o dicionário `titulo` montado na construção."""
+
+    def __init__(self, tipo_titulo=None, data_vencimento=None, data_investimento=None, investimento=None):
+        self.tipo_titulo = tipo_titulo
+        self.data_investimento = data_investimento
+        self.data_vencimento = data_vencimento
+        self.investimento = investimento
+        if self.tipo_titulo:
+            self.nomeclatura = nomeclatura_titulos()[self.tipo_titulo].upper()
+        else:
+            self.nomeclatura = None
+        self.titulo = {
+            "Tipo": self.tipo_titulo,
+            "Nomeclatura": self.nomeclatura,
+            "Vencimento": self.data_vencimento,
+            "Data Investimento": self.data_investimento,
+            "Investimento": self.investimento,
+        }
+
+
+class CarteiraLegado(TituloLegado):
+    """Carteira antes do armazenamento em colunas: lista de dicionários na ordem de inclusão."""
+
+    def __init__(self, Titulo):
+        self.titulo = Titulo.titulo
+        self.titulos = []
+
+    def add(self, outro_titulo):
+        self.titulos.append(outro_titulo.titulo)
+
+
+def _get_vencimentos(df: pd.DataFrame(), col: str):
+    """Primeira data sem valor na coluna, por máscara booleana da coluna inteira."""
+    try:
+        return df[df[col].isnull()][col].index[0]
+    except: pass
+
+
+def _get_valid_date(date, carteira_tesouro_direto: pd.DataFrame()):
+    """
+    Próxima data do índice, testando dia a dia com isin sobre a tabela inteira. Única alteração: a data
+    testada é um Timestamp, pois no pandas 3 isin não encontra datetime.date em índice de datas (laço infinito).
+    """
+    if isinstance(date, str):
+        date = pd.to_datetime(date)
+    count = 0
+    df = carteira_tesouro_direto[
+        carteira_tesouro_direto.index.isin([date + timedelta(days=count)])
+    ]
+    while df.empty:
+        count += 1
+        df = carteira_tesouro_direto[
+            carteira_tesouro_direto.index.isin([date + timedelta(days=count)])
+        ]
+    return date + timedelta(days=count)
+
+
+def cotiza_carteira_legado(titulos: List[dict], carteira_tesouro_direto: pd.DataFrame) -> pd.DataFrame:
+    """
+    Laço de cotização de calcula_retorno_carteira antes da vetorização. Única alteração: "Cotas" é
+    iniciada como float, pois o pandas 3 não aceita gravar floats em coluna inteira.
+    """
+    titulos = sorted(titulos, key=lambda d: d["Data Investimento"])
+    carteira_tesouro_direto = carteira_tesouro_direto.copy()
+    columns = carteira_tesouro_direto.columns.tolist()
+    vencimentos_validos = [_get_vencimentos(carteira_tesouro_direto, col) for col in columns if _get_vencimentos(carteira_tesouro_direto, col) is not None]
+    carteira_tesouro_direto["MTM"] = carteira_tesouro_direto.sum(axis=1)
+    carteira_tesouro_direto["Qde Cotas"] = carteira_tesouro_direto["MTM"].iloc[0]
+    carteira_tesouro_direto["Cotas"] = 1.0
+    investimentos = [
+        pd.to_datetime(titulos[x]["Data Investimento"])
+        for x in range(len(titulos))
+    ]
+    vencimentos = [
+        pd.to_datetime(titulos[x]["Vencimento"])
+        for x in range(len(titulos))
+    ]
+
+    investimentos_datas_validas = [
+        _get_valid_date(x, carteira_tesouro_direto) for x in investimentos
+    ]
+
+    for x, idx in enumerate(carteira_tesouro_direto.index[1:], start=1):
+        idx_investimento = [
+            i for i, date in enumerate(investimentos_datas_validas) if idx == date
+        ]
+        idx_vencimento = [
+            i for i, date in enumerate(vencimentos_validos) if idx == date
+        ]
+        if idx_investimento:
+            idx_investimento = idx_investimento[0]
+            dt_investimento = [investimentos_datas_validas[idx_investimento]]
+            ativo = [
+                titulos[x]["Nomeclatura"]
+                + "_"
+                + titulos[x]["Vencimento"][:4]
+                + "_"
+                + str(investimentos[idx_investimento])[:-9]
+                for x in range(len(titulos))
+                if pd.to_datetime(titulos[x]["Data Investimento"])
+                == investimentos[idx_investimento]
+            ]
+            investimento = carteira_tesouro_direto.loc[dt_investimento, ativo].values[
+                0
+            ][0]
+            carteira_tesouro_direto.loc[dt_investimento, "Qde Cotas"] = (
+                carteira_tesouro_direto.iloc[x - 1]["Qde Cotas"]
+                + investimento / carteira_tesouro_direto.iloc[x - 1]["Cotas"]
+            )
+        elif idx_vencimento:
+            idx_vencimento = idx_vencimento[0]
+            dt_vencimento = [vencimentos[idx_vencimento]]
+            ativo = [
+                titulos[x]["Nomeclatura"]
+                + "_"
+                + titulos[x]["Vencimento"][:4]
+                + "_"
+                + titulos[x]["Data Investimento"]
+                for x in range(len(titulos))
+                if pd.to_datetime(titulos[x]["Vencimento"])
+                == dt_vencimento[0]
+            ]
+            dt_vencimento_dia_anterior = carteira_tesouro_direto[ativo].dropna().index[-1]
+            desinvestimento = carteira_tesouro_direto.loc[dt_vencimento_dia_anterior, ativo].values[0]
+            carteira_tesouro_direto.loc[vencimentos_validos[idx_vencimento], "Qde Cotas"] = (
+                carteira_tesouro_direto.iloc[x-1]["Qde Cotas"]
+                - desinvestimento / carteira_tesouro_direto.iloc[x-1]["Cotas"]
+            )
+        else:
+            carteira_tesouro_direto.loc[idx, "Qde Cotas"] = carteira_tesouro_direto.iloc[x - 1]["Qde Cotas"]
+        carteira_tesouro_direto.loc[idx, "Cotas"] = (
+            carteira_tesouro_direto.loc[idx, columns].dropna().sum()
+            / carteira_tesouro_direto.loc[idx, "Qde Cotas"]
+        )
+    carteira_tesouro_direto["Rentabilidade Diária"] = carteira_tesouro_direto[
+        "Cotas"
+    ].pct_change()
+    carteira_tesouro_direto["Rentabilidade Acumulada"] = (
+        1 + carteira_tesouro_direto["Rentabilidade Diária"]
+    ).cumprod() - 1
+    return carteira_tesouro_direto
+
+
+def serie_pu_legado(taxa_agrupada: pd.DataFrame, tipo_titulo: str, vencimento: str) -> pd.DataFrame:
+    """Consulta por título sobre o MultiIndex não ordenado, usada antes de PrecosTesouro."""
+    titulo = taxa_agrupada.loc[(tipo_titulo, vencimento)]
+    return titulo.sort_values("Data Base").set_index("Data Base")[["PU Base Manha"]]
+
+
+def busca_tesouro_direto_legado(url: str) -> pd.DataFrame:
+    """Leitura original de busca_tesouro_direto: texto completo da resposta em memória e conversão de datas coluna a coluna."""
+    import io
+
+    import requests
+
+    data = requests.get(url).text
+    data_str = io.StringIO(data)
+    df = pd.read_csv(data_str, sep=";", decimal=",")
+
+    coluna_datas = [
+        x for x in df.columns if x.startswith("Data") or x.startswith("Vencimento")
+    ]
+    if coluna_datas:
+        for col in coluna_datas:
+            df[col] = pd.to_datetime(df[col], format="%d/%m/%Y")
+    return df
+
+
+def calcula_taxa_b3_legado(serie_mtm: pd.DataFrame) -> pd.DataFrame:
+    """calcula_taxa_b3 original, com o calendário de dias úteis do pyettj."""
+    from datetime import datetime
+
+    import numpy as np
+    import pyettj.ettj as ettj
+
+    datas_b3 = serie_mtm.groupby(pd.Grouper(freq="MS")).first()
+    datas_b3 = datas_b3[
+        (datas_b3.index.month == 1) | (datas_b3.index.month == 7)
+    ]  # meses de pagamento à B3
+
+    ano, mes, dia = str(serie_mtm.index[0])[:-9].split("-")
+    inicio_primeiro_semestre = "/".join([dia, mes, ano])
+    ano, mes, dia = str(datas_b3.index[0])[:-9].split("-")
+    fim_primeiro_semestre = "/".join([dia, mes, ano])
+    if datas_b3.index[0] < serie_mtm.index[0]:
+        datas_b3.drop(datas_b3.index[0], inplace=True)
+        ano, mes, dia = str(datas_b3.index[0])[:-9].split("-")
+        fim_primeiro_semestre = "/".join([dia, mes, ano])
+
+    if serie_mtm.columns.str.contains("LTF"):
+        # incide sobre o excedente de 10000
+        serie_mtm = serie_mtm - 10_000
+        serie_mtm[serie_mtm.columns] = np.where(serie_mtm < 0, 0, serie_mtm)
+
+    hoje = datetime.today().date()
+    if not datas_b3.empty:
+        # custos semestrais:
+        custos_b3 = datas_b3.copy()
+        custos_b3["custo"] = [
+            custos_b3.loc[x, :].values[0] * (0.25 / 2 / 100)
+            if x < pd.to_datetime("2022-01-01")
+            else custos_b3.loc[x, :].values[0] * (0.2 / 2 / 100)
+            for x in custos_b3.index
+        ]  # era 0,25% e a partir de jan/22 é de 0,2%aa ou 0,1%semestre
+
+        # custos proporcionais após completar semestre
+        ano, mes, dia = str(custos_b3.index[-1])[:-9].split("-")
+        inicio = "/".join([dia, mes, ano])
+        ano, mes, dia = str(hoje).split("-")
+        fim = "/".join([dia, mes, ano])
+        datas = ettj.listar_dias_uteis(inicio, fim)
+        custos_b3["custo"] = (
+            custos_b3["custo"]
+            + ((len(datas) * (0.1 / 100)) / 126) * custos_b3["MTM"].values[-1]
+        )
+
+        # custos proporcionais no inicio do semestre
+        datas = ettj.listar_dias_uteis(inicio_primeiro_semestre, fim_primeiro_semestre)
+        custos_b3["custo"] = (
+            custos_b3["custo"]
+            + ((len(datas) * (0.1 / 100)) / 126) * custos_b3["MTM"].values[0]
+        )
+    else:
+        # custos proporcionais antes de completar o semestre (resgate em menos de 6 meses)
+        ano, mes, dia = str(serie_mtm.index[0])[:-9].split("-")
+        inicio = "/".join([dia, mes, ano])
+        ano, mes, dia = str(serie_mtm.index[-1])[:-9].split("-")
+        fim = "/".join([dia, mes, ano])
+        datas = ettj.listar_dias_uteis(inicio, fim)
+        custos_b3 = pd.DataFrame(
+            np.array(
+                [
+                    serie_mtm.iloc[-1].values[0],
+                    serie_mtm.iloc[-1].values[0] * (len(datas) * 0.1 / 100) / 126,
+                ]
+            ),
+            index=["MTM", "custo"],
+            columns=[hoje],
+        ).T
+    return custos_b3
+
+
+def movimentacoes_legado(taxa_agrupada: pd.DataFrame, tipo_movimentacao: str, excluir: List[str], filtrar_data=None) -> pd.DataFrame:
+    """Agregação original de movimentacoes_titulos_publicos, a partir do retorno de busca_tesouro_direto(agrupar=True)."""
+    movimentacao = (
+        taxa_agrupada.reset_index()
+        .groupby(
+            [
+                "Tipo Titulo",
+                "Vencimento do Titulo",
+                f"Data {tipo_movimentacao.title()}",
+            ],
+            as_index=False,
+        )[["Quantidade"]]
+        .sum()
+    )
+    if filtrar_data:
+        dt_investimento = pd.to_datetime(filtrar_data)
+        movimentacao = movimentacao[
+            (movimentacao["Vencimento do Titulo"] > dt_investimento)
+            & (movimentacao[f"Data {tipo_movimentacao.title()}"] > dt_investimento)
+        ]
+    movimentacao = movimentacao.set_index(
+        ["Tipo Titulo", "Vencimento do Titulo"]
+    ).reset_index()
+    movimentacao["Vencimento do Titulo"] = movimentacao["Vencimento do Titulo"].astype(
+        str
+    )
+    if excluir:
+        df1 = pd.DataFrame()
+        for remover in excluir:
+            df = movimentacao[movimentacao["Tipo Titulo"].str.contains(f"{remover}")]
+            df1 = pd.concat([df1, df])
+        movimentacao = movimentacao.drop(df1.index)
+    movimentacao["Titulo"] = (
+        movimentacao["Tipo Titulo"] + "_" + movimentacao["Vencimento do Titulo"]
+    )
+    movimentacao = movimentacao.drop(["Tipo Titulo", "Vencimento do Titulo"], axis=1)
+    movimentacao_pivot = pd.pivot_table(
+        movimentacao.reset_index(),
+        values="Quantidade",
+        index=f"Data {tipo_movimentacao.title()}",
+        columns="Titulo",
+    )
+    return movimentacao_pivot
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+Servidor HTTP local que substitui o Tesouro Transparente em testes e benchmarks.
+Suporta ETag, Last-Modified, requisições condicionais (304) e Range (206).
+"""
+
+import hashlib
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+
+class ServidorTesouro:
+    def __init__(
+        self,
+        arquivos: Optional[Dict[str, bytes]] = None,
+        aceita_range: bool = True,
+        atraso: float = 0.0,
+    ):
+        self.arquivos: Dict[str, bytes] = {}
+        self.versoes: Dict[str, str] = {}
+        self.aceita_range = aceita_range
+        self.atraso = atraso
+        self.falhas: Dict[str, int] = {}  # respostas 503 a devolver antes de atender cada arquivo
+        self._trava = threading.Lock()
+        self.requisicoes: List[dict] = []
+        for nome, conteudo in (arquivos or {}).items():
+            self.publica(nome, conteudo)
+
+        servidor = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                servidor._atende(self)
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    def publica(self, nome: str, conteudo: bytes) -> None:
+        self.arquivos[nome] = conteudo
+        self.versoes[nome] = formatdate(usegmt=True)
+
+    def url(self, nome: str) -> str:
+        host, porta = self._httpd.server_address[:2]
+        return f"http://{host}:{porta}/{nome}"
+
+    def contagem(self, status: Optional[int] = None) -> int:
+        return sum(1 for r in self.requisicoes if status is None or r["status"] == status)
+
+    def __enter__(self) -> "ServidorTesouro":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def _atende(self, handler: BaseHTTPRequestHandler) -> None:
+        nome = handler.path.lstrip("/")
+        if self.atraso:
+            time.sleep(self.atraso)
+        with self._trava:
+            falhar = self.falhas.get(nome, 0) > 0
+            if falhar:
+                self.falhas[nome] -= 1
+        if falhar:
+            self._responde(handler, 503, b"")
+            return
+        if nome not in self.arquivos:
+            self._responde(handler, 404, b"")
+            return
+        conteudo = self.arquivos[nome]
+        etag = '"' + hashlib.md5(conteudo).hexdigest() + '"'
+        cabecalhos = {"ETag": etag, "Last-Modified": self.versoes[nome]}
+        if handler.headers.get("If-None-Match") == etag:
+            self._responde(handler, 304, b"", cabecalhos)
+            return
+        intervalo = handler.headers.get("Range")
+        if intervalo and self.aceita_range and intervalo.startswith("bytes="):
+            inicio = int(intervalo[len("bytes=") :].split("-")[0])
+            if inicio >= len(conteudo):
+                self._responde(handler, 416, b"", {"Content-Range": f"bytes */{len(conteudo)}"})
+                return
+            cabecalhos["Content-Range"] = f"bytes {inicio}-{len(conteudo) - 1}/{len(conteudo)}"
+            self._responde(handler, 206, conteudo[inicio:], cabecalhos)
+            return
+        if self.aceita_range:
+            cabecalhos["Accept-Ranges"] = "bytes"
+        self._responde(handler, 200, conteudo, cabecalhos)
+
+    def _responde(
+        self, handler: BaseHTTPRequestHandler, status: int, corpo: bytes, cabecalhos: Optional[Dict[str, str]] = None
+    ) -> None:
+        self.requisicoes.append(
+            {"caminho": handler.path, "status": status, "cabecalhos": dict(handler.headers), "bytes": len(corpo)}
+        )
+        handler.send_response(status)
+        for chave, valor in (cabecalhos or {}).items():
+            handler.send_header(chave, valor)
+        handler.send_header("Content-Type", "text/csv; charset=utf-8")
+        handler.send_header("Content-Length", str(len(corpo)))
+        handler.end_headers()
+        handler.wfile.write(corpo)
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.tesouro_direto_br import calcula_analitico, calendario
+from tests.dados_sinteticos import gera_taxa
+
+TITULOS = [
+    ("Tesouro Prefixado", "2024-01-01"),
+    ("Tesouro Prefixado com Juros Semestrais", "2031-01-01"),
+    ("Tesouro IPCA+ com Juros Semestrais", "2035-05-15"),
+    ("Tesouro IPCA+", "2026-08-15"),
+    ("Tesouro Selic", "2025-03-01"),
+    ("Tesouro IGPM+ com Juros Semestrais", "2031-01-01"),
+    ("Tesouro Educa+", "2040-12-15"),
+]
+CUPONS = {
+    "Tesouro Prefixado com Juros Semestrais": 1.10**0.5 - 1,
+    "Tesouro IPCA+ com Juros Semestrais": 1.06**0.5 - 1,
+    "Tesouro IGPM+ com Juros Semestrais": 1.12**0.5 - 1,
+}
+
+
+def _cotacao_linha(tipo, vencimento, data, taxa):
+    # um fluxo por vez: cupons a cada 6 meses contados do vencimento, descontados em dias úteis/252
+    vencimento = pd.Timestamp(vencimento)
+    cupom = CUPONS.get(tipo, 0.0)
+    pagamentos = [vencimento]
+    while cupom and pagamentos[-1] - pd.DateOffset(months=6) > data:
+        pagamentos.append(pagamentos[-1] - pd.DateOffset(months=6))
+    cotacao = prazo = 0.0
+    for pagamento in pagamentos:
+        anos = calendario.conta_dias_uteis(data, pagamento, inclusivo=False) / 252
+        valor = (100 * cupom + (100 if pagamento == vencimento else 0)) / (1 + taxa) ** anos
+        cotacao += valor
+        prazo += valor * anos
+    return cotacao, prazo / cotacao
+
+
+@pytest.fixture(scope="module")
+def taxa():
+    return gera_taxa(n_dias=900, titulos=TITULOS, inicio="2021-06-01")
+
+
+def test_igual_ao_calculo_linha_a_linha(taxa):
+    resultado = calcula_analitico(taxa, linhas_por_bloco=777)
+    assert len(resultado) == len(taxa)
+    amostra = resultado[resultado["Tipo Titulo"] != "Tesouro Educa+"].sample(200, random_state=0)
+    for _, linha in amostra.iterrows():
+        cotacao, duration = _cotacao_linha(
+            linha["Tipo Titulo"], linha["Data Vencimento"], linha["Data Base"], linha["Taxa"]
+        )
+        assert linha["Cotação"] == pytest.approx(cotacao, rel=1e-12)
+        assert linha["Duration Macaulay"] == pytest.approx(duration, rel=1e-12)
+        assert linha["Duration Modificada"] == pytest.approx(duration / (1 + linha["Taxa"]), rel=1e-12)
+        assert linha["Dias Uteis"] == calendario.conta_dias_uteis(
+            linha["Data Base"], linha["Data Vencimento"], inclusivo=False
+        )
+
+
+def test_prefixados_e_indexados(taxa):
+    resultado = calcula_analitico(taxa)
+    ltn = resultado[resultado["Tipo Titulo"] == "Tesouro Prefixado"]
+    np.testing.assert_allclose(
+        ltn["PU Teórico"], 1000 / (1 + ltn["Taxa"]) ** (ltn["Dias Uteis"].astype(float) / 252)
+    )
+    np.testing.assert_allclose(ltn["Duration Macaulay"], ltn["Dias Uteis"].astype(float) / 252)
+    assert ltn["VNA Implícito"].isna().all()
+
+    # DV01: variação do PU teórico para 1 ponto-base
+    ntnf = taxa[taxa["Tipo Titulo"] == "Tesouro Prefixado com Juros Semestrais"].copy()
+    base = calcula_analitico(ntnf)
+    ntnf["Taxa Venda Manha"] += 0.01
+    choque = calcula_analitico(ntnf)
+    sem_pu = calcula_analitico(ntnf.assign(**{"PU Venda Manha": 0.0}))
+    np.testing.assert_allclose(base["PU Teórico"] - choque["PU Teórico"], sem_pu["DV01"], rtol=1e-3)
+
+    # indexados: cotação em % do VNA, que vem do PU observado
+    indexados = resultado[resultado["Tipo Titulo"].isin(["Tesouro IPCA+", "Tesouro Selic"])]
+    pu = taxa.loc[indexados.index, "PU Venda Manha"]
+    np.testing.assert_allclose(indexados["VNA Implícito"] * indexados["Cotação"] / 100, pu)
+    np.testing.assert_allclose(indexados["DV01"], pu * indexados["Duration Modificada"] / 10_000)
+    assert indexados["PU Teórico"].isna().all()
+
+
+def test_titulos_sem_convencao_e_agrupado(taxa):
+    agrupado = taxa.set_index(["Tipo Titulo", "Data Vencimento"])
+    resultado = calcula_analitico(agrupado, "Taxa Compra Manha", "PU Compra Manha")
+    pd.testing.assert_frame_equal(
+        resultado, calcula_analitico(taxa, "Taxa Compra Manha", "PU Compra Manha")
+    )
+    educa = resultado[resultado["Tipo Titulo"] == "Tesouro Educa+"]
+    assert educa["Cotação"].isna().all() and educa["Dias Uteis"].isna().all()
+    assert resultado.loc[resultado["Tipo Titulo"] != "Tesouro Educa+", "DV01"].notna().all()
+
+    with pytest.raises(ValueError):
+        calcula_analitico(taxa, coluna_taxa="Taxa")
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.tesouro_direto_br import (
+    Carteira,
+    PrecosTesouro,
+    Titulo,
+    busca_tesouro_direto,
+    calcula_retorno_carteira,
+    carrega_arquivo_colunar,
+    exporta_arquivo_colunar,
+)
+from tests.dados_sinteticos import gera_taxa
+
+
+def _mapeado(valores: np.ndarray) -> bool:
+    while valores is not None:
+        if isinstance(valores, np.memmap):
+            return True
+        valores = valores.base
+    return False
+
+
+def _carteira() -> Carteira:
+    carteira = Carteira(Titulo())
+    carteira.add(Titulo("Tesouro Selic", "2025-03-01", "2020-03-10", 50))
+    carteira.add(Titulo("Tesouro IPCA+", "2026-08-15", "2020-01-02", 33.65))
+    return carteira
+
+
+def _retorno_no_processo(diretorio: str) -> pd.DataFrame:
+    return calcula_retorno_carteira(_carteira(), precos=PrecosTesouro.de_arquivo_colunar(diretorio))
+
+
+@pytest.mark.parametrize("tipo", ["venda", "taxa", "resgate"])
+def test_arquivo_igual_aos_dados_baixados(servidor, tmp_path, tipo):
+    exporta_arquivo_colunar(tmp_path, tipos=(tipo,))
+    esperado = busca_tesouro_direto(tipo, agrupar=False)
+    obtido = carrega_arquivo_colunar(tmp_path, tipo)
+
+    assert isinstance(obtido["Tipo Titulo"].dtype, pd.CategoricalDtype)
+    assert all(_mapeado(obtido[c].to_numpy()) for c in obtido.columns[1:])
+    chaves = esperado.columns[:3].tolist()
+    esperado = esperado.sort_values(chaves, kind="stable").reset_index(drop=True)
+    obtido = obtido.astype({"Tipo Titulo": esperado["Tipo Titulo"].dtype})
+    pd.testing.assert_frame_equal(obtido, esperado)
+    assert carrega_arquivo_colunar(tmp_path, tipo, agrupar=True).index.nlevels == 2
+
+
+def test_precos_usam_colunas_mapeadas_sem_copia(tmp_path):
+    taxa = gera_taxa(n_dias=200).sample(frac=1, random_state=0)
+    exporta_arquivo_colunar(tmp_path, tipos=("taxa",), dados={"taxa": taxa})
+    precos = PrecosTesouro.de_arquivo_colunar(tmp_path)
+    referencia = PrecosTesouro(taxa)
+
+    assert _mapeado(precos.datas) and all(_mapeado(v) for v in precos.valores.values())
+    np.testing.assert_array_equal(precos.datas, referencia.datas)
+    for coluna in referencia.colunas:
+        np.testing.assert_array_equal(precos.valores[coluna], referencia.valores[coluna])
+    pd.testing.assert_frame_equal(precos.titulos, referencia.titulos)
+
+
+def test_nova_exportacao_substitui_arquivos(tmp_path):
+    exporta_arquivo_colunar(tmp_path, tipos=("taxa",), dados={"taxa": gera_taxa(n_dias=50)})
+    aberto = carrega_arquivo_colunar(tmp_path)
+    exporta_arquivo_colunar(tmp_path, tipos=("taxa",), dados={"taxa": gera_taxa(n_dias=80)})
+
+    assert len(carrega_arquivo_colunar(tmp_path)) == len(gera_taxa(n_dias=80))
+    assert aberto["PU Base Manha"].sum() > 0  # versão anterior continua legível enquanto aberta
+    assert len(list((tmp_path / "taxa").glob("*.npy"))) == len(aberto.columns)
+    with pytest.raises(ValueError):
+        carrega_arquivo_colunar(tmp_path, "venda")
+    with pytest.raises(ValueError):
+        exporta_arquivo_colunar(tmp_path, tipos=("precos",), dados={})
+
+
+
+def test_arquivos_em_uso_ficam_para_a_proxima_exportacao(tmp_path, monkeypatch):
+    exporta_arquivo_colunar(tmp_path, tipos=("taxa",), dados={"taxa": gera_taxa(n_dias=50)})
+    pasta = tmp_path / "taxa"
+    primeiros = sorted(pasta.glob("*.npy"))
+
+    def em_uso(self, missing_ok=False):  # como no Windows, com os arquivos mapeados por outro processo
+        raise PermissionError(self)
+
+    with monkeypatch.context() as m:
+        m.setattr(Path, "unlink", em_uso)
+        exporta_arquivo_colunar(tmp_path, tipos=("taxa",), dados={"taxa": gera_taxa(n_dias=60)})
+    assert all(arquivo.exists() for arquivo in primeiros)
+    assert len(carrega_arquivo_colunar(tmp_path)) == len(gera_taxa(n_dias=60))
+
+    antes = (pasta / "manifesto.json").stat().st_mtime - 10
+    for arquivo in primeiros:
+        os.utime(arquivo, (antes, antes))
+    exporta_arquivo_colunar(tmp_path, tipos=("taxa",), dados={"taxa": gera_taxa(n_dias=70)})
+    assert not any(arquivo.exists() for arquivo in primeiros)
+    assert len(list(pasta.glob("*.npy"))) == len(carrega_arquivo_colunar(tmp_path).columns)
+
+def test_processos_compartilham_o_arquivo(servidor, tmp_path):
+    exporta_arquivo_colunar(tmp_path, tipos=("taxa",))
+    esperado = calcula_retorno_carteira(_carteira())
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        resultados = list(executor.map(_retorno_no_processo, [str(tmp_path)] * 2))
+    for resultado in resultados:
+        pd.testing.assert_frame_equal(resultado, esperado)
@@ -0,0 +1,66 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+
+from src.tesouro_direto_br import busca_tesouro_direto, busca_tesouro_direto_em_blocos
+from tests.conftest import ARQUIVOS
+from tests.dados_sinteticos import gera_vendas, para_csv
+
+
+def test_em_blocos_sem_compactar_igual_a_busca(servidor):
+    for tipo in ("venda", "taxa", "resgate"):
+        esperado = busca_tesouro_direto(tipo, agrupar=False, cache=False)
+        obtido = busca_tesouro_direto_em_blocos(tipo, compacto=False, linhas_por_bloco=997)
+        pd.testing.assert_frame_equal(obtido, esperado)
+
+
+def test_em_blocos_compacto(servidor):
+    esperado = busca_tesouro_direto("venda", agrupar=False, cache=False)
+    obtido = busca_tesouro_direto_em_blocos("venda", linhas_por_bloco=1000)
+    assert isinstance(obtido["Tipo Titulo"].dtype, pd.CategoricalDtype)
+    assert obtido["Quantidade"].dtype == np.float32
+    assert obtido.memory_usage(deep=True).sum() < esperado.memory_usage(deep=True).sum() / 2
+    for col in ("PU", "Quantidade", "Valor"):
+        np.testing.assert_array_equal(np.round(obtido[col].to_numpy(np.float64), 2), esperado[col].to_numpy())
+    assert (obtido["Tipo Titulo"].astype(str) == esperado["Tipo Titulo"]).all()
+
+
+
+def test_em_blocos_compacto_com_o_mesmo_tipo_em_todos_os_blocos(servidor):
+    vendas = gera_vendas(n_dias=20).head(200)
+    inteiras = vendas.assign(Quantidade=np.arange(1, 201).astype(str))  # "12": lidas como int64 pelo read_csv
+    mistas = inteiras.copy()
+    mistas.loc[150:, "Quantidade"] = "0,37"
+    for vendas_csv, tipo in ((inteiras, np.int32), (mistas, np.float32)):
+        servidor.publica(ARQUIVOS["venda"], para_csv(vendas_csv))
+        esperado = busca_tesouro_direto("venda", agrupar=False, cache=False)
+        tipos = set()
+        for linhas in (30, 100, 150, 500):
+            obtido = busca_tesouro_direto_em_blocos("venda", linhas_por_bloco=linhas)
+            assert obtido["Quantidade"].dtype == tipo, linhas
+            tipos.add(tuple(obtido.dtypes.astype(str)))
+            assert obtido["PU"].dtype == np.float32
+            for col in ("PU", "Quantidade", "Valor"):
+                np.testing.assert_array_equal(
+                    np.round(obtido[col].to_numpy(np.float64), 2), esperado[col].to_numpy(np.float64)
+                )
+        assert len(tipos) == 1
+
+def test_em_blocos_filtros(servidor):
+    completo = busca_tesouro_direto("taxa", agrupar=False, cache=False)
+    tipos = ["Tesouro Selic", "Tesouro IPCA+"]
+    obtido = busca_tesouro_direto_em_blocos(
+        "taxa", tipos_titulo=tipos, inicio="2020-03-01", fim="2020-06-30", compacto=False, linhas_por_bloco=500
+    )
+    filtro = (
+        completo["Tipo Titulo"].isin(tipos)
+        & (completo["Data Base"] >= "2020-03-01")
+        & (completo["Data Base"] <= "2020-06-30")
+    )
+    pd.testing.assert_frame_equal(obtido, completo[filtro].reset_index(drop=True))
+
+
+def test_em_blocos_agrupado(servidor):
+    df = busca_tesouro_direto_em_blocos("taxa", tipos_titulo=["Tesouro Selic"], agrupar=True)
+    assert df.index.names == ["Tipo Titulo", "Data Vencimento"]
+    assert df["Taxa Compra Manha"].dtype == np.float32
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+from datetime import timedelta
+
+import pandas as pd
+
+from src.tesouro_direto_br import busca_tesouro_direto, limpa_cache
+from tests.conftest import ARQUIVOS
+from tests.dados_sinteticos import gera_taxa, para_csv
+
+
+def test_cache_evita_novo_download(servidor, diretorio_cache):
+    df = busca_tesouro_direto("taxa", agrupar=False)
+    assert servidor.contagem() == 1
+    assert (diretorio_cache / "taxa.pkl").exists()
+
+    df_cache = busca_tesouro_direto("taxa", agrupar=False)
+    assert servidor.contagem() == 1
+    pd.testing.assert_frame_equal(df, df_cache)
+
+
+def test_cache_igual_ao_download_direto(servidor):
+    sem_cache = busca_tesouro_direto("venda", cache=False)
+    busca_tesouro_direto("venda")
+    com_cache = busca_tesouro_direto("venda")
+    pd.testing.assert_frame_equal(sem_cache, com_cache)
+
+
+def test_cache_expirado_revalida_com_etag(servidor):
+    busca_tesouro_direto("taxa")
+    busca_tesouro_direto("taxa", validade_cache=timedelta(0))
+    assert servidor.contagem(200) == 1
+    assert servidor.contagem(304) == 1
+    assert servidor.requisicoes[-1]["cabecalhos"]["If-None-Match"]
+
+
+def test_cache_expirado_baixa_arquivo_alterado(servidor):
+    busca_tesouro_direto("taxa")
+    novo = gera_taxa(n_dias=310)
+    servidor.publica(ARQUIVOS["taxa"], para_csv(novo))
+    df = busca_tesouro_direto("taxa", agrupar=False, validade_cache=timedelta(0))
+    assert servidor.contagem(200) == 2
+    assert len(df) == len(novo)
+
+
+def test_limpa_cache(servidor, diretorio_cache):
+    busca_tesouro_direto("resgate")
+    limpa_cache("resgate")
+    assert not (diretorio_cache / "resgate.pkl").exists()
+    busca_tesouro_direto("resgate")
+    assert servidor.contagem(200) == 2
+
+
+def test_gravacoes_simultaneas_do_cache(diretorio_cache):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from src.tesouro_direto_br.cache import grava_cache, le_cache, le_metadados_cache
+
+    df = gera_taxa(n_dias=20)
+    with ThreadPoolExecutor(8) as executor:
+        list(executor.map(lambda i: grava_cache("taxa", df, {"url": "u", "etag": str(i)}), range(32)))
+    pd.testing.assert_frame_equal(le_cache("taxa"), df)
+    assert le_metadados_cache("taxa")["url"] == "u"
+    assert not list(diretorio_cache.glob("*.tmp"))
@@ -0,0 +1,91 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.tesouro_direto_br import calendario
+from src.tesouro_direto_br.tesouro_direto_br import calcula_taxa_b3
+from tests.dados_sinteticos import datas_pregao
+from tests.legado import _get_valid_date, calcula_taxa_b3_legado
+
+ettj = pytest.importorskip("pyettj.ettj")
+
+
+def test_feriados_iguais_ao_calendario_anbima_do_pyettj():
+    arquivo = os.path.join(os.path.dirname(ettj.__file__), "Feriados.csv")
+    anbima = pd.to_datetime(pd.read_csv(arquivo, header=None)[0]).to_numpy().astype("datetime64[D]")
+    anos = pd.DatetimeIndex(anbima).year
+    np.testing.assert_array_equal(calendario.feriados_nacionais(anos.min(), anos.max()), np.unique(anbima))
+
+
+def test_contagem_igual_a_listar_dias_uteis():
+    rng = np.random.RandomState(0)
+    dias = pd.date_range("2002-01-01", "2040-12-31")
+    for _ in range(50):
+        inicio, fim = np.sort(rng.choice(len(dias), 2))
+        de, ate = dias[inicio].strftime("%d/%m/%Y"), dias[fim].strftime("%d/%m/%Y")
+        esperado = ettj.listar_dias_uteis(de, ate)
+        assert calendario.conta_dias_uteis(de, ate) == len(esperado)
+        assert calendario.dias_uteis(de, ate).strftime("%d/%m/%Y").tolist() == esperado
+
+
+def test_contagem_vetorizada_e_intervalo_semiaberto():
+    inicios = pd.to_datetime(["2024-11-18", "2024-12-24", "2025-03-03"])
+    fins = pd.to_datetime(["2024-11-22", "2025-01-02", "2025-03-05"])
+    feriados = calendario.feriados_nacionais()
+    np.testing.assert_array_equal(
+        calendario.conta_dias_uteis(inicios, fins, inclusivo=False),
+        np.busday_count(inicios.values.astype("datetime64[D]"), fins.values.astype("datetime64[D]"), holidays=feriados),
+    )
+    np.testing.assert_array_equal(calendario.conta_dias_uteis(inicios, fins), [4, 6, 1])
+    assert calendario.conta_dias_uteis("2024-11-20", "2024-11-20") == 0
+    assert calendario.eh_dia_util("21/11/2024")
+
+
+def test_data_fora_do_calendario():
+    with pytest.raises(ValueError):
+        calendario.conta_dias_uteis("1980-01-01", "2020-01-01")
+
+
+@pytest.mark.parametrize("inicio,n_dias", [("2020-03-02", 700), ("2021-08-02", 400)])
+def test_calcula_taxa_b3_igual_a_versao_com_pyettj(inicio, n_dias):
+    datas = datas_pregao(inicio, n_dias)
+    serie_mtm = pd.DataFrame({"MTM": np.linspace(9_000, 15_000, n_dias)}, index=datas)
+    esperado = calcula_taxa_b3_legado(serie_mtm.copy())
+    pd.testing.assert_frame_equal(calcula_taxa_b3(serie_mtm.copy()), esperado)
+
+
+def test_calcula_taxa_b3_resgate_antes_do_semestre():
+    datas = datas_pregao("2023-01-02", 100)
+    serie_mtm = pd.DataFrame({"MTM": np.linspace(9_000, 10_000, 100)}, index=datas)
+    custos = calcula_taxa_b3(serie_mtm)
+    dias = calendario.conta_dias_uteis(datas[0], datas[-1])
+    assert custos["custo"].iloc[0] == pytest.approx(10_000 * dias * 0.1 / 100 / 126)
+
+
+def test_ajusta_datas_igual_a_busca_dia_a_dia():
+    datas = datas_pregao("2021-01-04", 300)
+    carteira = pd.DataFrame({"A": np.arange(300.0)}, index=datas)
+    rng = np.random.RandomState(1)
+    pedidas = pd.DatetimeIndex(rng.choice(pd.date_range(datas[0], datas[-1]), 200))
+    esperado = [_get_valid_date(d, carteira) for d in pedidas]
+    assert calendario.ajusta_datas(pedidas, carteira.index).tolist() == esperado
+
+
+def test_ajusta_datas_anterior_fora_do_intervalo_e_dias_uteis():
+    validas = pd.to_datetime(["2024-01-02", "2024-01-05", "2024-01-09"])
+    pedidas = ["2024-01-01", "2024-01-05", "2024-01-06", "2024-01-10", None]
+    np.testing.assert_array_equal(
+        calendario.ajusta_datas(pedidas, validas),
+        pd.to_datetime(["2024-01-02", "2024-01-05", "2024-01-09", None, None]),
+    )
+    np.testing.assert_array_equal(
+        calendario.ajusta_datas(pedidas, validas, sentido="anterior"),
+        pd.to_datetime([None, "2024-01-05", "2024-01-05", "2024-01-09", None]),
+    )
+    assert calendario.ajusta_datas("15/11/2024") == pd.Timestamp("2024-11-18")
+    assert calendario.ajusta_datas("2024-11-16", sentido="anterior") == pd.Timestamp("2024-11-14")
+    with pytest.raises(ValueError):
+        calendario.ajusta_datas("2024-11-16", sentido="proxima")
+
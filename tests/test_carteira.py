@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.tesouro_direto_br import (
+    CAMPOS_CARTEIRA,
+    COLUNAS_COTIZACAO,
+    Carteira,
+    Titulo,
+    calcula_retorno_carteira,
+    calcula_retorno_carteiras,
+    calcula_retorno_titulo,
+)
+from src.tesouro_direto_br.tesouro_direto_br import _cotiza_tabela_carteira
+from tests.dados_sinteticos import datas_pregao, gera_series_carteira
+from tests.legado import CarteiraLegado, TituloLegado, cotiza_carteira_legado
+
+
+@pytest.mark.parametrize("n_titulos,n_dias", [(1, 50), (2, 120), (6, 400), (25, 600)])
+def test_cotizacao_igual_ao_laco_original(n_titulos, n_dias):
+    titulos, tabela = gera_series_carteira(n_titulos, n_dias)
+    esperado = cotiza_carteira_legado(titulos, tabela)
+    obtido = _cotiza_tabela_carteira(tabela.copy())
+    pd.testing.assert_frame_equal(obtido, esperado, check_exact=False, rtol=1e-12)
+
+
+def test_cotizacao_aplicacoes_e_vencimentos_sem_variacao_de_preco():
+    # com preços constantes a cota não pode variar, mesmo com aplicações no mesmo dia
+    # e vencimento de título aplicado depois do início da carteira
+    datas = datas_pregao(n_dias=10)
+    tabela = pd.DataFrame(
+        {
+            "A": [100.0] * 10,
+            "B": [np.nan, np.nan, 50.0, 50.0, 50.0, 50.0, np.nan, np.nan, np.nan, np.nan],
+            "C": [np.nan, np.nan, 30.0, 30.0, 30.0, 30.0, 30.0, 30.0, 30.0, 30.0],
+            "D": [np.nan] * 4 + [80.0] * 6,
+        },
+        index=datas,
+    )
+    resultado = _cotiza_tabela_carteira(tabela)
+    np.testing.assert_allclose(resultado["Cotas"], 1.0)
+    np.testing.assert_allclose(resultado["Qde Cotas"], resultado["MTM"])
+
+
+def test_calcula_retorno_carteira(servidor):
+    carteira = Carteira(Titulo())
+    carteira.add(Titulo("Tesouro Selic", "2025-03-01", "2020-03-10", 50))
+    carteira.add(Titulo("Tesouro IPCA+", "2026-08-15", "2020-01-02", 33.65))
+    carteira.add(Titulo("Tesouro Prefixado", "2024-01-01", "2020-06-01", 120))
+    resultado = calcula_retorno_carteira(carteira)
+
+    tabela = pd.concat(
+        [
+            calcula_retorno_titulo(t["Tipo"], t["Vencimento"], t["Data Investimento"], t["Investimento"])
+            for t in carteira.titulos
+        ],
+        axis=1,
+    )
+    esperado = cotiza_carteira_legado(carteira.titulos, tabela)
+    pd.testing.assert_frame_equal(resultado, esperado, check_exact=False, rtol=1e-12)
+    assert resultado["Rentabilidade Acumulada"].iloc[-1] != 0
+
+
+def _carteiras_sinteticas():
+    opcoes = [
+        ("Tesouro Selic", "2025-03-01"),
+        ("Tesouro IPCA+", "2026-08-15"),
+        ("Tesouro Prefixado", "2024-01-01"),
+        ("Tesouro Selic", "2029-03-01"),
+    ]
+    datas = datas_pregao(n_dias=250)
+    carteiras = {}
+    for i in range(6):
+        carteira = Carteira(Titulo())
+        for j in range(1 + i % 3):
+            tipo, vencimento = opcoes[(i + j) % len(opcoes)]
+            data = datas[10 * i + 37 * j].strftime("%Y-%m-%d")
+            carteira.add(Titulo(tipo, vencimento, data, 100.0 + 10 * i + j))
+        carteiras[f"cliente_{i}"] = carteira
+    return carteiras
+
+
+def test_calcula_retorno_carteiras_igual_ao_individual(servidor):
+    carteiras = _carteiras_sinteticas()
+    resultados = calcula_retorno_carteiras(carteiras)
+    assert servidor.contagem() == 1
+    for identificador, carteira in carteiras.items():
+        pd.testing.assert_frame_equal(resultados[identificador], calcula_retorno_carteira(carteira))
+
+
+def test_calcula_retorno_carteiras_processos(servidor):
+    carteiras = _carteiras_sinteticas()
+    sequencial = calcula_retorno_carteiras(carteiras, formato_longo=True)
+    paralelo = calcula_retorno_carteiras(carteiras, processos=2, formato_longo=True)
+    pd.testing.assert_frame_equal(sequencial, paralelo)
+    assert sequencial.columns.tolist() == COLUNAS_COTIZACAO
+    assert sequencial.index.names == ["Carteira", "Data Base"]
+    assert set(sequencial.index.get_level_values(0)) == set(carteiras)
+
+
+def _operacoes(n: int) -> pd.DataFrame:
+    rng = np.random.RandomState(0)
+    opcoes = [("Tesouro Selic", "2029-03-01"), ("Tesouro IPCA+", "2026-08-15"), ("Tesouro Prefixado", "2024-01-01")]
+    escolhas = rng.randint(len(opcoes), size=n)
+    datas = datas_pregao(n_dias=60)[rng.randint(60, size=n)]
+    return pd.DataFrame(
+        {
+            "Tipo": [opcoes[i][0] for i in escolhas],
+            "Vencimento": [opcoes[i][1] for i in escolhas],
+            "Data Investimento": datas.strftime("%Y-%m-%d"),
+            "Investimento": rng.uniform(10, 1_000, size=n).round(2),
+        }
+    )
+
+
+def test_titulos_iguais_a_carteira_original():
+    operacoes = _operacoes(200)
+    carteira, legado = Carteira(Titulo()), CarteiraLegado(TituloLegado())
+    for linha in operacoes.itertuples(index=False):
+        carteira.add(Titulo(*linha))
+        legado.add(TituloLegado(*linha))
+    esperado = tuple(sorted(legado.titulos, key=lambda d: d["Data Investimento"]))
+    assert carteira.titulos == esperado
+    assert Carteira.de_dataframe(operacoes).titulos == esperado
+    assert not hasattr(carteira, "__dict__") and not hasattr(Titulo(), "__dict__")
+
+
+def test_carteira_de_csv_com_colunas_e_datas_brasileiras(tmp_path):
+    operacoes = _operacoes(20)
+    arquivo = tmp_path / "operacoes.csv"
+    brasileiro = operacoes.rename(columns={"Tipo": "Tipo Titulo", "Investimento": "Valor"})
+    brasileiro["Data Investimento"] = pd.to_datetime(operacoes["Data Investimento"]).dt.strftime("%d/%m/%Y")
+    brasileiro.to_csv(arquivo, sep=";", decimal=",", index=False)
+
+    carteira = Carteira.de_csv(arquivo, colunas={"Tipo": "Tipo Titulo", "Investimento": "Valor"})
+    assert carteira.titulos == Carteira.de_dataframe(operacoes).titulos
+
+
+def test_titulos_atribuidos_sao_ordenados_e_validados():
+    carteira = Carteira(Titulo("Tesouro Selic", "2025-03-01", "2020-03-10", 50))
+    assert carteira.titulos == () and carteira.titulo["Tipo"] == "Tesouro Selic"
+    titulos = _operacoes(10).to_dict("records")
+    carteira.titulos = titulos
+    assert [t["Data Investimento"] for t in carteira.titulos] == sorted(t["Data Investimento"] for t in titulos)
+    assert list(carteira.titulos[0]) == ["Tipo", "Nomeclatura", *CAMPOS_CARTEIRA[1:]]
+
+    with pytest.raises(ValueError):
+        Carteira.de_dataframe(pd.DataFrame({"Tipo": ["Tesouro Selic"]}))
+    with pytest.raises(ValueError):
+        Carteira.de_dataframe(_operacoes(3).assign(Tipo="Tesouro Inexistente"))
+    with pytest.raises(ValueError):
+        Carteira(Titulo()).add(Titulo())
+
+
+def test_titulo_invalido_rejeitado_no_add():
+    carteira = Carteira(Titulo())
+    carteira.add(Titulo("Tesouro Selic", "2025-03-01", "10/03/2020", 50))
+    for invalido in (
+        Titulo("Tesouro Selic", "2025-03-01", None, 50),
+        Titulo("Tesouro Selic", "2025-03-01", "2021-02-30", 50),
+        Titulo("Tesouro Selic", "2025-03-01", "2020-03-10", None),
+    ):
+        with pytest.raises(ValueError):
+            carteira.add(invalido)
+    carteira.add(Titulo("Tesouro IPCA+", "2026-08-15", "2020-01-02", 33.65))
+    assert [t["Data Investimento"] for t in carteira.titulos] == ["2020-01-02", "2020-03-10"]
+    with pytest.raises(AttributeError):  # posições só mudam por add() ou atribuição
+        carteira.titulos.append({})
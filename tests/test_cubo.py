@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.tesouro_direto_br import CuboMovimentacoes, busca_tesouro_direto, exporta_arquivo_colunar
+from src.tesouro_direto_br.tesouro_direto_br import _agrega_movimentacoes
+from tests.dados_sinteticos import gera_resgates, gera_vendas
+
+
+@pytest.fixture(scope="module")
+def bases():
+    return gera_vendas(n_dias=600), gera_resgates(n_dias=600, operacoes_por_dia=3)
+
+
+@pytest.fixture(scope="module")
+def cubo(bases):
+    return CuboMovimentacoes(*bases)
+
+
+@pytest.mark.parametrize("frequencia", ["diaria", "semanal", "mensal"])
+@pytest.mark.parametrize("medida", ["Quantidade", "Valor"])
+def test_igual_a_agregacao_das_movimentacoes(bases, cubo, frequencia, medida):
+    venda, resgate = bases
+    esperado = {}
+    for movimento, df in zip(["venda", "resgate"], bases):
+        tabela = _agrega_movimentacoes(df.assign(Quantidade=df[medida]), movimento, [], None, frequencia)
+        esperado[movimento] = tabela
+        obtido = cubo.consulta(movimento, medida, frequencia)
+        pd.testing.assert_frame_equal(
+            obtido.loc[tabela.index, tabela.columns], tabela.fillna(0), check_names=False, rtol=1e-9
+        )
+        assert (obtido.drop(index=tabela.index, errors="ignore") == 0).all().all()
+
+    liquido = esperado["venda"].fillna(0).sub(esperado["resgate"].fillna(0), fill_value=0).fillna(0)
+    obtido = cubo.consulta("liquido", medida, frequencia)
+    pd.testing.assert_frame_equal(obtido.loc[liquido.index, liquido.columns], liquido, check_names=False, rtol=1e-9)
+
+
+def test_totais_por_tipo_e_intervalo(bases, cubo):
+    venda, resgate = bases
+    inicio, fim = "2020-03-15", "2021-02-10"
+    tipos = ["Tesouro IPCA+", "Tesouro IPCA+ com Juros Semestrais"]
+
+    def soma(df, coluna_data):
+        filtro = df[(df[coluna_data] >= inicio) & (df[coluna_data] <= fim) & df["Tipo Titulo"].isin(tipos)]
+        return filtro.groupby("Tipo Titulo")["Valor"].sum()
+
+    esperado = soma(venda, "Data Venda").sub(soma(resgate, "Data Resgate"), fill_value=0)
+    obtido = cubo.consulta("liquido", "Valor", inicio=inicio, fim=fim, tipos_titulo=tipos, agrupar_por="tipo")
+    pd.testing.assert_series_equal(obtido.sort_index(), esperado.sort_index(), check_names=False, rtol=1e-9)
+
+    por_titulo = cubo.consulta("venda", inicio=inicio, fim=fim, tipos_titulo=["Tesouro Selic"])
+    assert list(por_titulo.index) == ["Tesouro Selic_2025-03-01", "Tesouro Selic_2029-03-01"]
+    mensal = cubo.consulta("venda", frequencia="mensal", inicio=inicio, fim=fim, tipos_titulo=["Tesouro Selic"])
+    np.testing.assert_allclose(mensal.sum().to_numpy(), por_titulo.to_numpy())
+
+    vazio = cubo.consulta(frequencia="mensal", inicio="2030-01-01")
+    assert vazio.empty and list(vazio.columns) == list(cubo.titulos.index)
+
+
+def test_entradas_e_validacoes(servidor, tmp_path):
+    venda, resgate = busca_tesouro_direto("venda"), busca_tesouro_direto("resgate")  # agrupadas
+    cubo = CuboMovimentacoes.busca()
+    pd.testing.assert_frame_equal(CuboMovimentacoes(venda, resgate).consulta(frequencia="mensal"), cubo.consulta(frequencia="mensal"))
+
+    exporta_arquivo_colunar(tmp_path, tipos=("venda", "resgate"))
+    colunar = CuboMovimentacoes.de_arquivo_colunar(tmp_path)
+    np.testing.assert_array_equal(colunar.acumulado, cubo.acumulado)
+
+    for argumentos in [{"movimento": "compra"}, {"medida": "PU"}, {"frequencia": "anual"}, {"agrupar_por": "mes"}]:
+        with pytest.raises(ValueError):
+            cubo.consulta(**argumentos)
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.tesouro_direto_br.tesouro_direto_br import aliquota_iof, calcula_custos_lote, get_custos
+from tests.dados_sinteticos import datas_pregao
+
+
+def _posicoes(n_posicoes, semente=0):
+    """Tabela larga datas x posições, com prazos de poucos dias a vários anos."""
+    rng = np.random.RandomState(semente)
+    datas = datas_pregao("2019-01-02", 1500)
+    tabela = pd.DataFrame(np.nan, index=datas, columns=[f"posicao_{i}" for i in range(n_posicoes)])
+    for i, coluna in enumerate(tabela.columns):
+        inicio = rng.randint(0, len(datas) - 2)
+        fim = min(len(datas), inicio + (rng.randint(2, 40) if i % 3 == 0 else rng.randint(40, 1500)))
+        n = fim - inicio
+        tabela.iloc[inicio:fim, i] = rng.uniform(1_000, 50_000) * np.cumprod(1 + rng.normal(0.0004, 0.002, n))
+    return tabela
+
+
+@pytest.mark.parametrize("custo_b3", [False, True])
+def test_lote_igual_a_get_custos(capsys, custo_b3):
+    tabela = _posicoes(60)
+    lote = calcula_custos_lote(tabela, custo_b3=custo_b3)
+    for coluna in tabela.columns:
+        serie = tabela[[coluna]].dropna()
+        serie.columns = ["MTM"]
+        custos, detalhamento = get_custos(serie, custo_b3=custo_b3)
+        linha = lote.loc[coluna]
+        assert linha["Custos"] == pytest.approx(custos, rel=1e-12, abs=1e-9)
+        assert linha["IRPF"] == pytest.approx(detalhamento["IRPF"], rel=1e-12)
+        assert linha["IOF"] == pytest.approx(detalhamento["IOF"], rel=1e-12, abs=1e-12)
+        assert linha["Taxa Custódia B3"] == pytest.approx(detalhamento["Taxa Custódia B3"], rel=1e-12, abs=1e-12)
+    assert capsys.readouterr().out  # get_custos imprime; o lote não
+    calcula_custos_lote(tabela, custo_b3=custo_b3)
+    assert not capsys.readouterr().out
+
+
+def test_formato_longo_igual_ao_largo():
+    tabela = _posicoes(10)
+    longo = tabela.rename_axis("Data Base").stack().rename("MTM").swaplevel().sort_index().to_frame()
+    pd.testing.assert_frame_equal(
+        calcula_custos_lote(longo, custo_b3=True, hoje="2025-06-30"),
+        calcula_custos_lote(tabela, custo_b3=True, hoje="2025-06-30"),
+        check_names=False,
+    )
+
+
+def test_aliquota_iof_independe_do_diretorio(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    assert aliquota_iof(1) == 0.96
+    assert aliquota_iof(29) == 0.03
+    np.testing.assert_array_equal(aliquota_iof(np.array([15, 30, 31, 720])), [0.5, 0, 0, 0])
+    with pytest.raises(ValueError):
+        aliquota_iof(-1)
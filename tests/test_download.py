@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+import time
+
+import numpy as np
+import pandas as pd
+import requests
+
+from src.tesouro_direto_br import busca_tesouro_direto, busca_tesouro_direto_todos
+from src.tesouro_direto_br.tesouro_direto_br import URLS_TESOURO, _converte_datas, _le_csv_tesouro
+from tests.conftest import ARQUIVOS
+from tests.legado import busca_tesouro_direto_legado
+
+
+def test_leitura_em_fluxo_igual_ao_texto_completo(servidor):
+    for tipo in ARQUIVOS:
+        esperado = _le_csv_tesouro(requests.get(URLS_TESOURO[tipo]).text)
+        obtido = busca_tesouro_direto(tipo, agrupar=False, cache=False)
+        pd.testing.assert_frame_equal(obtido, esperado)
+
+
+def test_busca_todos_igual_a_busca_individual(servidor):
+    dados = busca_tesouro_direto_todos(cache=False)
+    assert set(dados) == {"venda", "taxa", "resgate"}
+    for tipo, df in dados.items():
+        pd.testing.assert_frame_equal(df, busca_tesouro_direto(tipo, cache=False))
+
+
+def test_busca_todos_simultanea(servidor):
+    servidor.atraso = 0.5
+    inicio = time.perf_counter()
+    busca_tesouro_direto_todos(cache=False)
+    assert time.perf_counter() - inicio < 1.2
+
+
+def test_busca_todos_repete_em_falha_transitoria(servidor):
+    servidor.falhas[ARQUIVOS["taxa"]] = 2
+    dados = busca_tesouro_direto_todos(tipos=("taxa",), cache=False, backoff=0.01)
+    assert not dados["taxa"].empty
+    assert servidor.contagem(503) == 2
+
+
+def test_busca_todos_usa_cache(servidor):
+    busca_tesouro_direto_todos()
+    busca_tesouro_direto_todos()
+    assert servidor.contagem() == 3
+
+
+def test_leitura_igual_a_leitura_original(servidor):
+    for tipo in ARQUIVOS:
+        esperado = busca_tesouro_direto_legado(URLS_TESOURO[tipo])
+        pd.testing.assert_frame_equal(busca_tesouro_direto(tipo, agrupar=False, cache=False), esperado)
+
+
+def test_converte_datas_com_valores_ausentes():
+    coluna = pd.Series(["15/08/2026", None, "01/03/2025", "15/08/2026"], name="Data Vencimento")
+    pd.testing.assert_series_equal(_converte_datas(coluna), pd.to_datetime(coluna, format="%d/%m/%Y"))
+
+
+def test_converte_datas_coluna_sem_datas():
+    coluna = pd.Series([np.nan, None, np.nan], dtype=object, name="Data Resgate")
+    convertida = _converte_datas(coluna)
+    assert convertida.isna().all()
+    pd.testing.assert_series_equal(convertida, pd.to_datetime(coluna, format="%d/%m/%Y"))
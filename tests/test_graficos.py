@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+
+from src.tesouro_direto_br import PrecosTesouro, plota_taxas_titulos, reduz_serie
+from tests.dados_sinteticos import TITULOS_PADRAO, gera_taxa
+
+pytest.importorskip("matplotlib")
+
+
+@pytest.fixture(scope="module")
+def precos():
+    return PrecosTesouro(gera_taxa(n_dias=3_000, titulos=[(t, "2035-05-15") for t, _ in TITULOS_PADRAO[:4]]))
+
+
+def test_reducao_preserva_extremos_de_cada_grupo():
+    rng = np.random.RandomState(0)
+    valores = np.cumsum(rng.normal(0, 1, 10_001))
+    valores[[10, 5_000]] = [1e3, -1e3]
+    valores[7_000:7_010] = np.nan
+    datas = np.arange(len(valores))
+    reduzidas, reduzidos = reduz_serie(datas, valores, pontos=400)
+
+    assert len(reduzidas) <= 400 + 10
+    assert np.all(np.diff(reduzidas) > 0)
+    np.testing.assert_array_equal(reduzidos, valores[reduzidas])
+    assert reduzidas[0] == 0 and reduzidas[-1] == len(valores) - 1
+    assert {10, 5_000} <= set(reduzidas.tolist()) and np.isnan(reduzidos).sum() == 10
+    # em cada grupo de pontos consecutivos, mínimo e máximo iguais aos da série completa
+    tamanho = -(-len(valores) // 100)
+    for inicio in range(0, len(valores), tamanho):
+        grupo = (reduzidas >= inicio) & (reduzidas < inicio + tamanho)
+        assert np.nanmin(reduzidos[grupo]) == np.nanmin(valores[inicio : inicio + tamanho])
+        assert np.nanmax(reduzidos[grupo]) == np.nanmax(valores[inicio : inicio + tamanho])
+
+    np.testing.assert_array_equal(reduz_serie(datas[:50], valores[:50])[1], valores[:50])
+    with pytest.raises(ValueError):
+        reduz_serie(datas, valores, pontos=2)
+
+
+def test_grava_arquivo_sem_pyplot(precos, tmp_path):
+    titulos = [(t, "2035-05-15") for t, _ in TITULOS_PADRAO[:4]]
+    arquivo = tmp_path / "taxas.png"
+    fig = plota_taxas_titulos(titulos, ["Taxa Compra Manha", "Taxa Venda Manha"], arquivo=arquivo, precos=precos)
+
+    assert arquivo.stat().st_size > 0
+    linhas = fig.axes[0].get_lines()
+    assert len(linhas) == 8
+    assert all(len(linha.get_xdata()) <= fig.axes[0].bbox.width + 4 for linha in linhas)
+    assert linhas[0].get_label() == "NTN-B PRINCIPAL 15/05/2035 Taxa Compra Manha"
+    assert fig.canvas.manager is None  # figura fora do pyplot
+
+
+def test_desenha_em_eixos_existentes(precos):
+    from matplotlib.figure import Figure
+
+    ax = Figure().add_subplot()
+    plota_taxas_titulos([("Tesouro Selic", "2035-05-15")], inicio="2025-01-01", pontos=10_000, ax=ax, precos=precos)
+    datas, taxas = precos.arrays("Tesouro Selic", "2035-05-15", "Taxa Compra Manha", inicio="2025-01-01")
+    linha = ax.get_lines()[0]
+    np.testing.assert_array_equal(linha.get_ydata(), taxas)
+    assert linha.get_label() == "LTF 15/05/2035"
@@ -0,0 +1,20 @@
+# -*- coding: utf-8 -*-
+import subprocess
+import sys
+from pathlib import Path
+
+RAIZ = Path(__file__).resolve().parents[1]
+
+
+def test_importacao_nao_carrega_dependencias_pesadas():
+    codigo = (
+        "import sys, warnings\n"
+        "import pandas\n"  # numpy e pandas registram seus próprios filtros
+        "filtros = list(warnings.filters)\n"
+        "import src.tesouro_direto_br\n"
+        "print([m for m in ('matplotlib', 'requests', 'pyettj') if m in sys.modules], warnings.filters == filtros)\n"
+    )
+    saida = subprocess.run(
+        [sys.executable, "-c", codigo], cwd=RAIZ, check=True, capture_output=True, text=True
+    ).stdout
+    assert saida.strip() == "[] True"
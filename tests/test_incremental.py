@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+from datetime import timedelta
+
+import pandas as pd
+
+from src.tesouro_direto_br import busca_novos_registros, busca_tesouro_direto
+from tests.conftest import ARQUIVOS
+from tests.dados_sinteticos import gera_taxa, para_csv
+
+
+def _ordena(df: pd.DataFrame) -> pd.DataFrame:
+    return df.sort_values(df.columns[:3].tolist()).reset_index(drop=True)
+
+
+def _publica_novos_dias(servidor, n_dias_antes=300, n_dias_depois=305):
+    antigo = gera_taxa(n_dias=n_dias_antes)
+    completo = gera_taxa(n_dias=n_dias_depois)
+    novos = completo[completo["Data Base"] > antigo["Data Base"].max()]
+    conteudo = para_csv(antigo) + para_csv(novos, cabecalho=False)
+    servidor.publica(ARQUIVOS["taxa"], conteudo)
+    return antigo, novos
+
+
+def test_incremental_baixa_apenas_trecho_novo(servidor):
+    antigo, novos = _publica_novos_dias(servidor)
+    servidor.publica(ARQUIVOS["taxa"], para_csv(antigo))
+    busca_tesouro_direto("taxa", agrupar=False)
+    tamanho_inicial = servidor.requisicoes[-1]["bytes"]
+
+    _publica_novos_dias(servidor)
+    df = busca_tesouro_direto(
+        "taxa", agrupar=False, incremental=True, validade_cache=timedelta(0)
+    )
+    assert servidor.requisicoes[-1]["status"] == 206
+    assert servidor.requisicoes[-1]["bytes"] < tamanho_inicial / 10
+
+    completo = busca_tesouro_direto("taxa", agrupar=False, cache=False)
+    pd.testing.assert_frame_equal(_ordena(df), _ordena(completo))
+
+
+def test_incremental_sem_suporte_a_range(servidor):
+    servidor.aceita_range = False
+    antigo, _ = _publica_novos_dias(servidor)
+    servidor.publica(ARQUIVOS["taxa"], para_csv(antigo))
+    busca_tesouro_direto("taxa", agrupar=False)
+
+    _publica_novos_dias(servidor)
+    df = busca_tesouro_direto(
+        "taxa", agrupar=False, incremental=True, validade_cache=timedelta(0)
+    )
+    assert servidor.requisicoes[-1]["status"] == 200
+    completo = busca_tesouro_direto("taxa", agrupar=False, cache=False)
+    pd.testing.assert_frame_equal(_ordena(df), _ordena(completo))
+
+
+def test_incremental_arquivo_reescrito(servidor):
+    busca_tesouro_direto("taxa", agrupar=False)
+    reescrito = gera_taxa(n_dias=305, semente=1)
+    servidor.publica(ARQUIVOS["taxa"], para_csv(reescrito))
+    df = busca_tesouro_direto(
+        "taxa", agrupar=False, incremental=True, validade_cache=timedelta(0)
+    )
+    assert df["Data Base"].max() == reescrito["Data Base"].max()
+    assert not df.duplicated(df.columns[:3].tolist()).any()
+
+
+def test_incremental_sem_alteracao(servidor):
+    busca_tesouro_direto("taxa")
+    busca_tesouro_direto("taxa", incremental=True, validade_cache=timedelta(0))
+    assert servidor.requisicoes[-1]["status"] == 304
+
+
+def test_busca_novos_registros(servidor):
+    antigo, novos = _publica_novos_dias(servidor)
+    servidor.publica(ARQUIVOS["taxa"], para_csv(antigo))
+    busca_tesouro_direto("taxa")
+
+    _publica_novos_dias(servidor)
+    df = busca_novos_registros(antigo["Data Base"].max(), validade_cache=timedelta(0))
+    assert len(df) == len(novos)
+    assert df["Data Base"].min() > antigo["Data Base"].max()
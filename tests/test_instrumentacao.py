@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+import logging
+from datetime import timedelta
+
+import numpy as np
+
+from src.tesouro_direto_br import (
+    Carteira,
+    CuboMovimentacoes,
+    PrecosTesouro,
+    ResultadoCarteira,
+    Titulo,
+    aliquota_iof,
+    busca_tesouro_direto,
+    calcula_retorno_carteira,
+    calendario,
+    instrumenta,
+    limpa_cache,
+    nomeclatura_titulos,
+    reduz_serie,
+)
+from src.tesouro_direto_br import instrumentacao
+from tests.dados_sinteticos import gera_resgates, gera_taxa, gera_vendas
+
+
+def test_etapas_e_contadores_da_carteira(servidor):
+    carteira = Carteira(Titulo("Tesouro Selic", "2025-03-01", "2020-03-10", 50))
+    carteira.add(Titulo("Tesouro IPCA+", "2026-08-15", "2020-01-02", 33.65))
+    with instrumenta() as medicoes:
+        calcula_retorno_carteira(carteira)
+    dados = medicoes.como_dict()
+
+    etapas = dados["etapas"]
+    for nome in [
+        "calcula_retorno_carteira",
+        "busca_tesouro_direto",
+        "requisicao",
+        "leitura_csv",
+        "conversao_datas",
+        "cache_gravacao",
+        "indice_precos",
+        "series_pu",
+        "retornos_titulos",
+        "cotizacao",
+    ]:
+        assert etapas[nome]["chamadas"] == 1, nome
+    assert etapas["calcula_retorno_carteira"]["segundos"] >= etapas["leitura_csv"]["segundos"]
+
+    contadores = dados["contadores"]
+    assert contadores["bytes_baixados"] == len(servidor.arquivos["PrecoTaxaTesouroDireto.csv"])
+    assert contadores["linhas_lidas"] > 0
+    assert contadores["cache_falhas"] == 1
+    assert "cache_acertos" not in contadores
+
+
+def test_acertos_do_cache(servidor):
+    busca_tesouro_direto("taxa")
+    with instrumenta() as medicoes:
+        busca_tesouro_direto("taxa")
+        busca_tesouro_direto("taxa", validade_cache=timedelta(0))
+    contadores = medicoes.como_dict()["contadores"]
+    assert contadores["cache_acertos"] == 2
+    assert contadores["requisicoes"] == 1
+    assert "bytes_baixados" not in contadores
+
+
+def test_log_e_callback(servidor, caplog):
+    registros = []
+    with caplog.at_level(logging.INFO, logger="tesouro_direto_br"):
+        with instrumenta(nivel_log=logging.INFO, callback=lambda *r: registros.append(r)):
+            busca_tesouro_direto("resgate", cache=False)
+    assert ("contador", "requisicoes", 1) in registros
+    assert any(tipo == "etapa" and nome == "busca_tesouro_direto" for tipo, nome, _ in registros)
+    assert any("etapa leitura_csv" in r.getMessage() for r in caplog.records)
+
+
+def test_desativada_fora_do_bloco(servidor):
+    with instrumenta() as medicoes:
+        pass
+    busca_tesouro_direto("venda")
+    assert medicoes.como_dict() == {"etapas": {}, "contadores": {}}
+    assert not instrumentacao._MEDICOES
+    assert instrumentacao.etapa("leitura_csv") is instrumentacao._NULO
+
+
+def test_etapas_da_carteira_e_dos_precos(tmp_path):
+    arquivo = tmp_path / "operacoes.csv"
+    arquivo.write_text(
+        "Tipo;Vencimento;Data Investimento;Investimento\nTesouro Selic;2025-03-01;2020-03-10;50,0\n", encoding="utf-8"
+    )
+    precos = PrecosTesouro(gera_taxa(n_dias=20))
+    tipo, vencimento = precos.titulos.iloc[0][["Tipo Titulo", "Data Vencimento"]]
+    with instrumenta() as medicoes:
+        Carteira.de_csv(arquivo)
+        precos.serie(tipo, vencimento)
+    etapas = medicoes.como_dict()["etapas"]
+    for nome in ["carteira_de_csv", "carteira_de_dataframe", "serie_precos"]:
+        assert etapas[nome]["chamadas"] == 1, nome
+
+
+def test_etapas_das_demais_funcoes_publicas(tmp_path, diretorio_cache):
+    cubo = CuboMovimentacoes(gera_vendas(n_dias=20), gera_resgates(n_dias=20))
+    taxa = gera_taxa(n_dias=40)
+    carteira = Carteira(Titulo())
+    carteira.add(Titulo("Tesouro Selic", "2025-03-01", "2020-01-06", 50))
+    resultado = ResultadoCarteira.calcula(carteira, precos=PrecosTesouro(taxa))
+    with instrumenta() as medicoes:
+        cubo.consulta(frequencia="mensal")
+        aliquota_iof(10)
+        nomeclatura_titulos()
+        calendario.feriados_nacionais(2024, 2024)
+        calendario.conta_dias_uteis("2024-01-02", "2024-02-01")
+        calendario.dias_uteis("2024-01-02", "2024-02-01")
+        calendario.eh_dia_util("2024-01-02")
+        calendario.ajusta_datas("2024-01-01")
+        reduz_serie(np.arange(10), np.arange(10.0))
+        resultado.salva(tmp_path / "resultado.pkl")
+        ResultadoCarteira.carrega(tmp_path / "resultado.pkl")
+        limpa_cache("taxa")
+    etapas = medicoes.como_dict()["etapas"]
+    for nome in [
+        "CuboMovimentacoes.consulta",
+        "aliquota_iof",
+        "nomeclatura_titulos",
+        "feriados_nacionais",
+        "conta_dias_uteis",
+        "dias_uteis",
+        "eh_dia_util",
+        "ajusta_datas",
+        "reduz_serie",
+        "ResultadoCarteira.salva",
+        "ResultadoCarteira.carrega",
+        "limpa_cache",
+    ]:
+        assert etapas[nome]["chamadas"] >= 1, nome
@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.tesouro_direto_br import calcula_metricas
+from tests.dados_sinteticos import datas_pregao
+
+
+def _cotas(n_datas=600, n_carteiras=5, semente=0):
+    rng = np.random.RandomState(semente)
+    retornos = rng.normal(0.0004, 0.003, (n_datas, n_carteiras))
+    cotas = np.cumprod(1 + retornos, axis=0)
+    cotas[0] = 1.0
+    inicios = rng.randint(0, n_datas // 3, n_carteiras)
+    inicios[0] = 0
+    for j, inicio in enumerate(inicios):  # carteiras que começam depois: NaN e cota inicial 1
+        cotas[:inicio, j] = np.nan
+        cotas[inicio:, j] /= cotas[inicio, j]
+    return pd.DataFrame(cotas, index=datas_pregao("2020-01-02", n_datas), columns=list("ABCDE")[:n_carteiras])
+
+
+def _referencia(cota, selic_diaria, janelas):
+    # cálculo com pandas, uma métrica e uma janela de cada vez
+    cota = cota.dropna()
+    retorno = cota.pct_change()
+    excesso = retorno - selic_diaria
+    esperado = {
+        "Retorno Acumulado": cota.iloc[-1] / cota.iloc[0] - 1,
+        "Volatilidade Anualizada": retorno.std() * np.sqrt(252),
+        "Drawdown Máximo": (cota / cota.cummax() - 1).min(),
+        "Sharpe": excesso.mean() / excesso.std() * np.sqrt(252),
+    }
+    moveis = pd.DataFrame(index=cota.index)
+    for j in janelas:
+        moveis[f"Retorno {j}d"] = cota / cota.shift(j) - 1
+        moveis[f"Volatilidade {j}d"] = retorno.rolling(j).std() * np.sqrt(252)
+        moveis[f"Sharpe {j}d"] = excesso.rolling(j).mean() / excesso.rolling(j).std() * np.sqrt(252)
+        esperado.update(moveis.iloc[-1][[f"Retorno {j}d", f"Volatilidade {j}d", f"Sharpe {j}d"]].to_dict())
+    moveis["Drawdown"] = cota / cota.cummax() - 1
+    return pd.Series(esperado), moveis
+
+
+def test_igual_ao_calculo_com_pandas_rolling():
+    cotas = _cotas()
+    selic = 0.1
+    resumo, moveis = calcula_metricas(cotas, selic=selic, series_moveis=True)
+    assert list(resumo.index) == list(cotas.columns)
+    for carteira in cotas.columns:
+        esperado, esperado_moveis = _referencia(cotas[carteira], 1.1 ** (1 / 252) - 1, (21, 63, 252))
+        pd.testing.assert_series_equal(
+            resumo.loc[carteira, esperado.index], esperado, check_names=False, rtol=1e-9
+        )
+        obtido = moveis.loc[carteira]
+        assert obtido.index.equals(esperado_moveis.index)
+        pd.testing.assert_frame_equal(
+            obtido[esperado_moveis.columns], esperado_moveis, check_names=False, check_freq=False, rtol=1e-7
+        )
+
+
+def test_formatos_de_entrada():
+    cotas = _cotas(n_carteiras=3)
+    esperado = calcula_metricas(cotas, janelas=(21,))
+
+    tabela = pd.DataFrame({"Cotas": cotas["A"], "Rentabilidade Diária": cotas["A"].pct_change()})
+    pd.testing.assert_series_equal(calcula_metricas(tabela, janelas=(21,)), esperado.loc["A"], check_names=False)
+    pd.testing.assert_series_equal(
+        calcula_metricas(tabela[["Rentabilidade Diária"]], janelas=(21,)), esperado.loc["A"], check_names=False
+    )
+
+    por_carteira = {c: pd.DataFrame({"Cotas": cotas[c].dropna()}) for c in cotas.columns}
+    pd.testing.assert_frame_equal(calcula_metricas(por_carteira, janelas=(21,)), esperado, check_names=False)
+    longo = pd.concat(por_carteira, names=["Carteira"])
+    pd.testing.assert_frame_equal(calcula_metricas(longo, janelas=(21,)), esperado, check_names=False)
+    np.testing.assert_allclose(calcula_metricas(cotas.to_numpy(), janelas=(21,)).to_numpy(), esperado.to_numpy())
+
+
+def test_selic_por_data_e_janela_maior_que_a_serie():
+    cotas = _cotas(n_datas=100, n_carteiras=2)
+    selic = pd.Series(0.0004, index=cotas.index)
+    resumo = calcula_metricas(cotas, selic=selic, janelas=(21, 252))
+    pd.testing.assert_series_equal(
+        resumo["Sharpe"], calcula_metricas(cotas, selic=1.0004**252 - 1, janelas=(21, 252))["Sharpe"]
+    )
+    assert resumo["Retorno 252d"].isna().all() and resumo["Retorno 21d"].notna().all()
+
+    with pytest.raises(ValueError):
+        calcula_metricas(cotas, janelas=(1,))
+    with pytest.raises(ValueError):
+        calcula_metricas(np.ones((3, 2, 2)))
+
+
+def test_selic_ausente_afeta_somente_o_sharpe():
+    cotas = _cotas(n_carteiras=2)
+    selic = pd.Series(1.1 ** (1 / 252) - 1, index=cotas.index)
+    selic.iloc[[50, 400, 590]] = np.nan
+    resumo, moveis = calcula_metricas(cotas, selic=selic, series_moveis=True)
+    sem_lacunas, moveis_sem_lacunas = calcula_metricas(cotas, selic=selic.fillna(0), series_moveis=True)
+
+    sem_sharpe = [c for c in resumo.columns if not c.startswith("Sharpe")]
+    pd.testing.assert_frame_equal(resumo[sem_sharpe], sem_lacunas[sem_sharpe])
+    colunas = [c for c in moveis.columns if not c.startswith("Sharpe")]
+    pd.testing.assert_frame_equal(moveis[colunas], moveis_sem_lacunas[colunas])
+    for carteira in cotas.columns:
+        esperado, esperado_moveis = _referencia(cotas[carteira], selic, (21, 63, 252))
+        pd.testing.assert_series_equal(
+            resumo.loc[carteira, esperado.index], esperado, check_names=False, rtol=1e-9
+        )
+        pd.testing.assert_series_equal(
+            moveis.loc[carteira, "Sharpe 21d"],
+            esperado_moveis["Sharpe 21d"],
+            check_names=False,
+            check_freq=False,
+            rtol=1e-7,
+        )
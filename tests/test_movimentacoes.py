@@ -0,0 +1,31 @@
+import pandas as pd
+import pytest
+
+from src.tesouro_direto_br import busca_tesouro_direto, movimentacoes_titulos_publicos
+from src.tesouro_direto_br.tesouro_direto_br import _agrega_movimentacoes
+from tests.dados_sinteticos import gera_vendas
+from tests.legado import movimentacoes_legado
+
+EXCLUIR = ["Juros Semestrais", "Educa+", "RendA+"]
+
+
+@pytest.mark.parametrize("tipo", ["venda", "resgate"])
+@pytest.mark.parametrize("excluir,filtrar_data", [(EXCLUIR, None), (EXCLUIR, "2020-06-01"), ([], None)])
+def test_igual_a_agregacao_original(servidor, tipo, excluir, filtrar_data):
+    esperado = movimentacoes_legado(busca_tesouro_direto(tipo, agrupar=True), tipo, excluir, filtrar_data)
+    obtido = movimentacoes_titulos_publicos(tipo, excluir=excluir, filtrar_data=filtrar_data)
+    pd.testing.assert_frame_equal(obtido, esperado, check_exact=True)
+
+
+@pytest.mark.parametrize("frequencia,regra", [("semanal", "W"), ("mensal", "ME")])
+def test_frequencia_igual_ao_resample(frequencia, regra):
+    vendas = gera_vendas(n_dias=400)
+    diaria = _agrega_movimentacoes(vendas, "venda", EXCLUIR, None)
+    esperado = diaria.resample(regra).sum(min_count=1).dropna(how="all")
+    obtido = _agrega_movimentacoes(vendas, "venda", EXCLUIR, None, frequencia)
+    pd.testing.assert_frame_equal(obtido, esperado, check_freq=False, rtol=1e-12)
+
+
+def test_frequencia_invalida():
+    with pytest.raises(ValueError):
+        movimentacoes_titulos_publicos("venda", frequencia="anual")
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.tesouro_direto_br import PrecosTesouro, busca_tesouro_direto
+from tests.dados_sinteticos import TITULOS_PADRAO, gera_taxa
+from tests.legado import serie_pu_legado
+
+
+@pytest.fixture(scope="module")
+def taxa():
+    # ordem embaralhada, como no arquivo original
+    return gera_taxa(n_dias=400).sample(frac=1, random_state=0).reset_index(drop=True)
+
+
+@pytest.fixture(scope="module")
+def taxa_agrupada(taxa):
+    return taxa.set_index(pd.MultiIndex.from_frame(taxa.iloc[:, :2])).iloc[:, 2:]
+
+
+@pytest.mark.parametrize("tipo_titulo,vencimento", TITULOS_PADRAO)
+def test_serie_igual_a_consulta_multiindex(taxa, taxa_agrupada, tipo_titulo, vencimento):
+    precos = PrecosTesouro(taxa)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        esperado = serie_pu_legado(taxa_agrupada, tipo_titulo, vencimento)
+    pd.testing.assert_frame_equal(precos.serie(tipo_titulo, vencimento, ["PU Base Manha"]), esperado)
+
+
+def test_aceita_tabela_agrupada(taxa, taxa_agrupada):
+    de_agrupada, de_plana = PrecosTesouro(taxa_agrupada), PrecosTesouro(taxa)
+    np.testing.assert_array_equal(de_agrupada.datas, de_plana.datas)
+    pd.testing.assert_frame_equal(de_agrupada.titulos, de_plana.titulos)
+    assert len(de_plana) == len(taxa)
+
+
+def test_recorte_por_data(taxa):
+    precos = PrecosTesouro(taxa)
+    serie = precos.serie("Tesouro IPCA+", "2026-08-15", inicio="2020-03-02", fim="2020-03-31")
+    assert serie.index.min() == pd.Timestamp("2020-03-02")
+    assert serie.index.max() == pd.Timestamp("2020-03-31")
+    assert serie.index.is_monotonic_increasing
+    assert serie.columns.tolist() == precos.colunas
+
+
+def test_arrays_sem_copia(taxa):
+    precos = PrecosTesouro(taxa)
+    datas, pu = precos.arrays("Tesouro Selic", pd.Timestamp("2025-03-01"))
+    assert np.shares_memory(datas, precos.datas)
+    assert np.shares_memory(pu, precos.valores["PU Base Manha"])
+    assert ("Tesouro Selic", "2025-03-01") in precos
+
+
+def test_titulo_inexistente(taxa):
+    with pytest.raises(KeyError):
+        PrecosTesouro(taxa).serie("Tesouro Selic", "2099-03-01")
+
+
+def test_busca(servidor):
+    precos = PrecosTesouro.busca()
+    assert len(precos) == len(busca_tesouro_direto("taxa", agrupar=False))
@@ -0,0 +1,102 @@
+import pandas as pd
+import pytest
+
+from src.tesouro_direto_br import Carteira, PrecosTesouro, ResultadoCarteira, Titulo, calcula_retorno_carteira
+from tests.dados_sinteticos import gera_taxa
+
+TITULOS = [
+    ("Tesouro Selic", "2025-03-01", "2020-03-10", 50.0),
+    ("Tesouro IPCA+", "2026-08-15", "2020-01-02", 33.65),
+    ("Tesouro Prefixado", "2024-01-01", "2020-06-01", 120.0),
+    ("Tesouro Prefixado com Juros Semestrais", "2031-01-01", "2020-06-01", 80.0),
+]
+
+
+@pytest.fixture(scope="module")
+def taxa():
+    return gera_taxa(n_dias=1100)
+
+
+@pytest.fixture
+def sem_recalculo(monkeypatch):
+    def falha(*args):
+        raise AssertionError("atualização deveria ser incremental")
+
+    monkeypatch.setattr(ResultadoCarteira, "_recalcula", falha)
+
+
+def _carteira(titulos):
+    carteira = Carteira(Titulo())
+    for tpf in titulos:
+        carteira.add(Titulo(*tpf))
+    return carteira
+
+
+def _precos_ate(taxa, data):
+    return PrecosTesouro(taxa[taxa["Data Base"] <= data])
+
+
+def test_atualizacao_diaria_igual_ao_recalculo(taxa, sem_recalculo):
+    # atravessa o vencimento do Tesouro Prefixado 2024 (01/01/2024)
+    datas = sorted(taxa["Data Base"].unique())
+    corte = datas.index(pd.Timestamp("2023-12-01"))
+    resultado = ResultadoCarteira.calcula(_carteira(TITULOS), precos=_precos_ate(taxa, datas[corte]))
+    for data in datas[corte + 1 : corte + 40]:
+        novas = resultado.atualiza(precos=_precos_ate(taxa, data))
+        assert list(novas.index) == [data]
+
+    precos = _precos_ate(taxa, datas[corte + 39])
+    esperado = calcula_retorno_carteira(_carteira(TITULOS), precos=precos)
+    pd.testing.assert_frame_equal(resultado.tabela, esperado, check_exact=True, check_freq=False)
+
+
+def test_atualizacao_com_novo_titulo_e_varios_dias(taxa, sem_recalculo):
+    precos = _precos_ate(taxa, pd.Timestamp("2021-05-31"))
+    resultado = ResultadoCarteira.calcula(_carteira(TITULOS[:2]), precos=precos)
+    novo = _carteira([("Tesouro Selic", "2029-03-01", "2021-07-15", 10.0)]).titulos
+    resultado.atualiza(precos=precos, novos_titulos=novo)
+    assert resultado.tabela.columns[2] == "LTF_2029_2021-07-15"
+
+    precos = _precos_ate(taxa, pd.Timestamp("2021-12-31"))
+    novas = resultado.atualiza(precos=precos)
+    assert novas.index[0] > pd.Timestamp("2021-05-31")
+    esperado = calcula_retorno_carteira(_carteira(TITULOS[:2] + [("Tesouro Selic", "2029-03-01", "2021-07-15", 10.0)]), precos=precos)
+    pd.testing.assert_frame_equal(resultado.tabela, esperado, check_exact=True, check_freq=False)
+
+
+def test_titulo_com_aplicacao_passada_recalcula(taxa):
+    precos = _precos_ate(taxa, pd.Timestamp("2021-05-31"))
+    resultado = ResultadoCarteira.calcula(_carteira(TITULOS[:2]), precos=precos)
+    novo = ("Tesouro Prefixado", "2024-01-01", "2020-09-01", 75.0)
+    resultado.atualiza(precos=precos, novos_titulos=_carteira([novo]).titulos)
+    esperado = calcula_retorno_carteira(_carteira(TITULOS[:2] + [novo]), precos=precos)
+    pd.testing.assert_frame_equal(resultado.tabela, esperado, check_exact=True, check_freq=False)
+
+
+def test_salva_e_carrega(taxa, tmp_path, sem_recalculo):
+    resultado = ResultadoCarteira.calcula(_carteira(TITULOS), precos=_precos_ate(taxa, pd.Timestamp("2022-01-31")))
+    resultado.salva(tmp_path / "carteira.pkl")
+    carregado = ResultadoCarteira.carrega(tmp_path / "carteira.pkl")
+    pd.testing.assert_frame_equal(carregado.tabela, resultado.tabela)
+    assert [p.name for p in tmp_path.iterdir()] == ["carteira.pkl"]
+
+    precos = _precos_ate(taxa, pd.Timestamp("2022-03-31"))
+    carregado.atualiza(precos=precos)
+    pd.testing.assert_frame_equal(
+        carregado.tabela, calcula_retorno_carteira(_carteira(TITULOS), precos=precos), check_exact=True, check_freq=False
+    )
+
+
+def test_salva_com_falha_mantem_arquivo_anterior(taxa, tmp_path, monkeypatch):
+    resultado = ResultadoCarteira.calcula(_carteira(TITULOS[:1]), precos=_precos_ate(taxa, pd.Timestamp("2021-01-29")))
+    resultado.salva(tmp_path / "carteira.pkl")
+
+    def falha(*args, **kwargs):
+        raise OSError("disco cheio")
+
+    monkeypatch.setattr(pd, "to_pickle", falha)
+    with pytest.raises(OSError):
+        resultado.salva(tmp_path / "carteira.pkl")
+    monkeypatch.undo()
+    assert [p.name for p in tmp_path.iterdir()] == ["carteira.pkl"]
+    pd.testing.assert_frame_equal(ResultadoCarteira.carrega(tmp_path / "carteira.pkl").tabela, resultado.tabela)